@@ -0,0 +1,30 @@
+# Multi-worker deployment: gunicorn -c gunicorn.conf.py server:app
+#
+# The app is imported once in the master so the generator tables and the
+# compiled rule packs are built a single time and shared copy-on-write with
+# every worker. Each worker reseeds its random state after fork and opens its
+# own MongoDB client on startup.
+#
+# Everything mutable stays per worker: /api/metrics reports only the worker
+# that served the scrape, MAX_CONCURRENT_GENERATIONS admission slots are
+# counted per worker, and each worker loads its own saved-name set for
+# uniqueNames.
+import multiprocessing
+import os
+
+bind = os.environ.get('BIND', '0.0.0.0:8001')
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+worker_class = 'uvicorn.workers.UvicornWorker'
+preload_app = True
+timeout = int(os.environ.get('WORKER_TIMEOUT', '60'))
+
+
+def pre_fork(server, worker):
+    from services.runtime import freeze_shared_tables
+    freeze_shared_tables()
+
+
+def post_fork(server, worker):
+    from services.runtime import reseed_worker_rngs
+    reseed_worker_rngs()
+    server.log.info(f"Worker {worker.pid} reseeded random state")
@@ -42,6 +42,7 @@ class Monster(BaseModel):
     stats: MonsterStats
     description: str
     specialAbilities: List[str]
+    abilityMask: Optional[int] = None
     encounters: EncounterInfo
     treasure: TreasureInfo
     lair: LairInfo
@@ -91,4 +92,85 @@ class SaveMonsterRequest(BaseModel):
 class ShareMonsterRequest(BaseModel):
     monsterId: str
     shareType: str = "link"
-    expiresIn: int = 7
\ No newline at end of file
+    expiresIn: int = 7
+
+class GenerationJob(BaseModel):
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    status: str = "queued"
+    request: AdvancedGenerationRequest
+    total: int
+    completed: int = 0
+    error: Optional[str] = None
+    createdAt: datetime = Field(default_factory=datetime.utcnow)
+    updatedAt: datetime = Field(default_factory=datetime.utcnow)
+    startedAt: Optional[datetime] = None
+    finishedAt: Optional[datetime] = None
+    workerId: Optional[str] = None
+    leaseExpiresAt: Optional[datetime] = None
+
+class PopulationArea(BaseModel):
+    label: Optional[str] = None
+    environment: str = "any"
+    type: str = "any"
+    minChallengeRating: str = "0"
+    maxChallengeRating: str = "6+"
+    stockingChance: float = 0.33
+
+class PopulationRequest(BaseModel):
+    mapType: str = "dungeon"
+    areas: List[PopulationArea] = []
+    count: int = 0
+    defaults: PopulationArea = PopulationArea()
+    rulePack: Optional[str] = None
+    algorithm: str = "balanced"
+    complexity: str = "moderate"
+    includeTreasure: bool = True
+    includeLair: bool = True
+
+class MonsterSearchQuery(BaseModel):
+    q: Optional[str] = None
+    type: List[str] = []
+    challengeRating: List[str] = []
+    environment: List[str] = []
+    abilities: List[str] = []
+    lairSize: List[str] = []
+    treasureType: List[str] = []
+    sort: str = "relevance"
+    page: int = 1
+    pageSize: int = 50
+
+class EncounterBuildRequest(BaseModel):
+    partyLevels: List[int] = [1, 1, 1, 1]
+    difficulty: str = "medium"
+    xpBudget: Optional[int] = None
+    tolerance: float = 0.25
+    source: str = "saved"
+    filters: GenerationFilters = GenerationFilters()
+    poolSize: int = 200
+    maxGroups: int = 3
+    topK: int = 5
+    useLairNumbers: bool = False
+    rulePack: Optional[str] = None
+
+class PartyMember(BaseModel):
+    level: int = 1
+    ac: int = 4
+    hp: Optional[int] = None
+    damage: str = "1d8"
+    attackBonus: int = 0
+
+class CombatSimulationRequest(BaseModel):
+    monster: Optional[Monster] = None
+    monsterId: Optional[str] = None
+    count: int = 1
+    party: List[PartyMember] = [PartyMember() for _ in range(4)]
+    trials: int = 5000
+    seed: int = 0
+
+class EncounterRollRequest(BaseModel):
+    monster: Optional[Monster] = None
+    monsterId: Optional[str] = None
+    groups: int = 1
+    useLairNumbers: bool = False
+    numberAppearing: Optional[str] = None
+    seed: Optional[int] = None
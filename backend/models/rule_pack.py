@@ -0,0 +1,52 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional, Dict, Tuple
+
+class TemplateSpec(BaseModel):
+    name: str
+    type: str
+    challengeRating: str
+    environment: str
+    ac: int = Field(ge=-10, le=10)
+    hd: str
+    hp: int = Field(ge=1)
+    movement: str
+    attacks: str
+    damage: str
+    save: str
+    morale: int = Field(ge=2, le=12)
+    xp: int = Field(ge=0)
+    description: str
+    specialAbilities: List[str] = []
+
+class TerrainSpec(BaseModel):
+    base: str
+    features: List[str] = Field(min_length=1)
+    defenses: List[str] = Field(min_length=1)
+
+class TreasureTypeSpec(BaseModel):
+    coins: Dict[str, Tuple[int, int]] = {}
+    gems: int = Field(default=0, ge=0, le=100)
+    jewelry: int = Field(default=0, ge=0, le=100)
+    magic: int = Field(default=0, ge=0, le=100)
+
+class SocialStructureSpec(BaseModel):
+    numberAppearing: str
+    wildEncounter: str
+    lairChance: int = Field(ge=0, le=100)
+
+class NameSpec(BaseModel):
+    prefixes: List[str] = []
+    roots: List[str] = []
+    typeBaseNames: Dict[str, List[str]] = {}
+
+class RulePackSpec(BaseModel):
+    name: str = Field(pattern=r"^[a-z0-9][a-z0-9_-]*$")
+    version: str = "1"
+    description: str = ""
+    monsterTemplates: List[TemplateSpec] = []
+    templateStore: Optional[str] = None
+    terrain: Dict[str, TerrainSpec] = {}
+    treasureTypes: Dict[str, TreasureTypeSpec] = {}
+    socialStructures: Dict[str, SocialStructureSpec] = {}
+    names: NameSpec = NameSpec()
+    descriptors: List[str] = []
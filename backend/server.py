@@ -1,30 +1,64 @@
-from fastapi import FastAPI, APIRouter, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, APIRouter, HTTPException, Request, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from dotenv import load_dotenv
+from starlette.background import BackgroundTask
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import DuplicateKeyError
 import os
+import asyncio
 import logging
+import time
 from pathlib import Path
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
+import json
 import uuid
 from datetime import datetime, timedelta
 
 from models.monster import (
     Monster, MonsterLibrary, ShareInfo, 
     AdvancedGenerationRequest, SaveMonsterRequest, ShareMonsterRequest,
-    GenerationFilters
+    GenerationFilters, PopulationRequest, MonsterSearchQuery, EncounterBuildRequest,
+    CombatSimulationRequest, MonsterStats, EncounterRollRequest
 )
 from services.advanced_generator import AdvancedMonsterGenerator
+from services.cr_calibration import CalibrationExhausted
+from services import runtime  # noqa: F401  (registers per-worker RNG reseeding)
+from services.treasure_simulator import TreasureSimulator
+from services.population_generator import PopulationGenerator
+from services.monster_search import MonsterSearch
+from services.monster_migrations import SavedMonsterMigrations
+from services.rule_packs import rule_packs
+from services.dice import dice_distribution
+from services.encounter_builder import EncounterBuilder
+from services.combat_simulator import CombatSimulator
+from services.encounter_roller import EncounterRoller
+from services.monster_import import MonsterImporter, iter_lines
+from services.monster_export import MonsterExporter
+from services.job_manager import job_manager
+from services.name_engine import saved_names
+from services.admission import admission_controller, AdmissionRejected
+from services.profiling import GenerationProfiler, PROFILE_HEADER
+from services.metrics import (
+    REGISTRY, HTTP_REQUESTS, HTTP_REQUEST_SECONDS, MongoCommandMetrics,
+    monitor_event_loop_lag, stage_timer
+)
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
+# MongoDB connection, opened per worker process on startup (Motor clients are not fork-safe)
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+client: Optional[AsyncIOMotorClient] = None
+db = None
+
+def connect_db():
+    """Create this process's MongoDB client"""
+    global client, db
+    client = AsyncIOMotorClient(mongo_url, event_listeners=[MongoCommandMetrics()])
+    db = client[os.environ['DB_NAME']]
 
 # Create the main app without a prefix
 app = FastAPI(title="Labyrinth Lord Monster Generator", version="1.0.0")
@@ -39,6 +73,25 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Background tasks: event loop lag sampling and rule pack hot reload
+event_loop_monitor: Optional[asyncio.Task] = None
+rule_pack_watcher: Optional[asyncio.Task] = None
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Record request count and latency per route template"""
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        route_path = route.path if route is not None else "unmatched"
+        HTTP_REQUESTS.labels(request.method, route_path, status).inc()
+        HTTP_REQUEST_SECONDS.labels(request.method, route_path).observe(time.perf_counter() - start)
+
 # Legacy endpoints
 @api_router.get("/")
 async def root():
@@ -46,28 +99,401 @@ async def root():
 
 # Monster Generation Endpoints
 @api_router.post("/monsters/generate", response_model=Dict[str, List[Monster]])
-async def generate_monsters(request: AdvancedGenerationRequest):
+async def generate_monsters(request: AdvancedGenerationRequest, http_request: Request, response: Response):
     """Generate monsters using advanced algorithms"""
     try:
-        monsters = AdvancedMonsterGenerator.generate_monsters(request)
-        
-        # Store generated monsters in database for potential future reference
-        for monster in monsters:
-            monster_dict = monster.dict()
-            await db.generated_monsters.insert_one(monster_dict)
+        AdvancedMonsterGenerator.validate_rules(request)
+        admission_controller.check_budget(request)
+        async with admission_controller.slot():
+            monsters = await _generate_and_store(request, http_request, response)
         
         logger.info(f"Generated {len(monsters)} monsters")
         return {"monsters": monsters}
         
+    except AdmissionRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail, headers=e.headers)
+    except CalibrationExhausted as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error generating monsters: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Generation failed: {str(e)}")
 
+async def _generate_and_store(request: AdvancedGenerationRequest, http_request: Request, response: Response) -> List[Monster]:
+    """Run generation (optionally profiled) and persist the results"""
+    if GenerationProfiler.is_requested(http_request.headers, http_request.query_params):
+        monsters, report = await asyncio.to_thread(GenerationProfiler.profile, AdvancedMonsterGenerator.generate_monsters, request)
+        profile_record = {
+            "id": str(uuid.uuid4()),
+            "request": request.dict(),
+            "report": report,
+            "createdAt": datetime.utcnow()
+        }
+        await db.generation_profiles.insert_one(profile_record)
+        response.headers[PROFILE_HEADER + "-Id"] = profile_record["id"]
+        logger.info(f"Profiled generation {profile_record['id']} in {report['wallSeconds']}s")
+    else:
+        # Generation runs off the event loop, inside the caller's admission slot
+        monsters = await asyncio.to_thread(AdvancedMonsterGenerator.generate_monsters, request)
+    
+    # Store generated monsters in database for potential future reference
+    with stage_timer("db_write"):
+        await db.generated_monsters.insert_many([monster.dict() for monster in monsters])
+    
+    return monsters
+
 @api_router.post("/monsters/generate-simple")
-async def generate_monsters_simple(filters: GenerationFilters):
+async def generate_monsters_simple(filters: GenerationFilters, http_request: Request, response: Response):
     """Simple generation endpoint for backward compatibility"""
     request = AdvancedGenerationRequest(filters=filters)
-    return await generate_monsters(request)
+    return await generate_monsters(request, http_request, response)
+
+def streaming_response(lines, slot) -> StreamingResponse:
+    """NDJSON response that hands its admission slot back once the response is done"""
+    try:
+        return StreamingResponse(lines, media_type="application/x-ndjson", background=BackgroundTask(slot.release))
+    except Exception:
+        slot.release()
+        raise
+
+@api_router.post("/monsters/generate-stream")
+async def generate_monsters_stream(request: AdvancedGenerationRequest):
+    """Generate large batches as newline-delimited JSON, one chunk at a time"""
+    try:
+        AdvancedMonsterGenerator.validate_rules(request)
+        admission_controller.check_stream(request)
+        # Claim the slot up front so saturation is reported before streaming starts
+        slot = admission_controller.claim()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except AdmissionRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail, headers=e.headers)
+    
+    chunk_size = admission_controller.max_count_per_request(request)
+    # One name batch for the whole stream keeps uniqueNames distinct across chunks
+    names = AdvancedMonsterGenerator.name_batch(request)
+    
+    async def monster_lines():
+        try:
+            remaining = request.filters.count
+            while remaining > 0:
+                chunk_request = request.copy(deep=True)
+                chunk_request.filters.count = min(chunk_size, remaining)
+                monsters = await asyncio.to_thread(AdvancedMonsterGenerator.generate_monsters, chunk_request, names)
+                with stage_timer("db_write"):
+                    await db.generated_monsters.insert_many([monster.dict() for monster in monsters])
+                remaining -= len(monsters)
+                yield "".join(monster.json() + "\n" for monster in monsters)
+            logger.info(f"Streamed {request.filters.count} monsters")
+        except Exception as e:
+            logger.error(f"Error streaming monsters: {str(e)}")
+            yield json.dumps({"error": f"Generation failed: {str(e)}"}) + "\n"
+        finally:
+            slot.release()
+    
+    # The background task releases the slot if the body is never iterated
+    return streaming_response(monster_lines(), slot)
+
+@api_router.post("/monsters/populate")
+async def populate_map(request: PopulationRequest):
+    """Stock every room of a dungeon or hex of a map, streamed as newline-delimited JSON"""
+    try:
+        PopulationGenerator.validate(request)
+        area_count = len(PopulationGenerator.resolve_areas(request))
+        admission_controller.check_stream(request, count=area_count)
+        slot = admission_controller.claim()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except AdmissionRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail, headers=e.headers)
+    
+    chunk_size = admission_controller.max_count_per_request(request)
+    
+    async def area_lines():
+        try:
+            stocked = 0
+            chunks = PopulationGenerator.iter_chunks(request, chunk_size)
+            while True:
+                areas = await asyncio.to_thread(next, chunks, None)
+                if areas is None:
+                    break
+                monsters = [area["monster"] for area in areas if area["monster"]]
+                if monsters:
+                    with stage_timer("db_write"):
+                        await db.generated_monsters.insert_many([monster.dict() for monster in monsters])
+                stocked += len(monsters)
+                yield "".join(
+                    json.dumps(jsonable_encoder(area)) + "\n"
+                    for area in areas
+                )
+            yield json.dumps({"summary": {"mapType": request.mapType, "areas": area_count, "stocked": stocked}}) + "\n"
+            logger.info(f"Populated {stocked} of {area_count} areas")
+        except Exception as e:
+            logger.error(f"Error populating map: {str(e)}")
+            yield json.dumps({"error": f"Population failed: {str(e)}"}) + "\n"
+        finally:
+            slot.release()
+    
+    return streaming_response(area_lines(), slot)
+
+# Background Generation Jobs
+@api_router.post("/monsters/jobs")
+async def submit_generation_job(request: AdvancedGenerationRequest):
+    """Queue a large generation run and return its job id"""
+    try:
+        job = await job_manager.submit(request)
+        logger.info(f"Queued generation job {job.id} for {job.total} monsters")
+        return {"jobId": job.id, "status": job.status, "total": job.total}
+        
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error submitting job: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to submit generation job")
+
+@api_router.get("/monsters/jobs")
+async def list_generation_jobs(status: Optional[str] = None, limit: int = 50):
+    """List recent generation jobs"""
+    try:
+        return {"jobs": await job_manager.list(status, min(max(limit, 1), 500))}
+        
+    except Exception as e:
+        logger.error(f"Error listing jobs: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to list generation jobs")
+
+@api_router.get("/monsters/jobs/{job_id}")
+async def get_generation_job(job_id: str):
+    """Get the status and progress of a generation job"""
+    try:
+        job = await job_manager.get(job_id)
+        if not job:
+            raise HTTPException(status_code=404, detail="Job not found")
+        job["progress"] = round(job["completed"] / job["total"], 4) if job["total"] else 1.0
+        return job
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching job: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to fetch generation job")
+
+@api_router.get("/monsters/jobs/{job_id}/results")
+async def get_generation_job_results(job_id: str, page: int = 1, pageSize: int = 100):
+    """Get one page of a job's generated monsters"""
+    if page < 1 or not 1 <= pageSize <= 1000:
+        raise HTTPException(status_code=400, detail="page must be >= 1 and pageSize between 1 and 1000")
+    try:
+        job = await job_manager.get(job_id)
+        if not job:
+            raise HTTPException(status_code=404, detail="Job not found")
+        monsters = await job_manager.results(job_id, page, pageSize)
+        return {
+            "jobId": job_id,
+            "status": job["status"],
+            "page": page,
+            "pageSize": pageSize,
+            "available": job["completed"],
+            "monsters": monsters
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching job results: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to fetch generation job results")
+
+@api_router.delete("/monsters/jobs/{job_id}")
+async def cancel_generation_job(job_id: str):
+    """Cancel a queued or running generation job"""
+    try:
+        if not await job_manager.cancel(job_id):
+            job = await job_manager.get(job_id)
+            if not job:
+                raise HTTPException(status_code=404, detail="Job not found")
+            raise HTTPException(status_code=409, detail=f"Job already {job['status']}")
+        logger.info(f"Cancelled generation job {job_id}")
+        return {"success": True, "message": "Job cancelled"}
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error cancelling job: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to cancel generation job")
+
+@api_router.get("/monsters/profiles/{profile_id}")
+async def get_generation_profile(profile_id: str):
+    """Get a stored generation profile report"""
+    try:
+        profile_record = await db.generation_profiles.find_one({"id": profile_id}, {"_id": 0})
+        if not profile_record:
+            raise HTTPException(status_code=404, detail="Profile not found")
+        return profile_record
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching profile: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to fetch profile")
+
+# Observability Endpoints
+@api_router.get("/metrics")
+async def get_metrics():
+    """Expose in-process metrics in Prometheus text format"""
+    return Response(content=REGISTRY.render(), media_type=REGISTRY.CONTENT_TYPE)
+
+# Rule Packs
+@api_router.get("/rule-packs")
+async def list_rule_packs():
+    """List loaded rule packs and any files that failed to load"""
+    return {"rulePacks": rule_packs.list(), "errors": rule_packs.errors}
+
+@api_router.post("/rule-packs/reload")
+async def reload_rule_packs():
+    """Recompile rule packs from disk and swap them in without a restart"""
+    try:
+        result = await asyncio.to_thread(rule_packs.reload)
+        return result
+        
+    except Exception as e:
+        logger.error(f"Error reloading rule packs: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to reload rule packs")
+
+@api_router.get("/encounters/table")
+async def get_encounter_table(rulePack: Optional[str] = None):
+    """Export the precomputed encounter table for a rule pack"""
+    try:
+        pack = rule_packs.get(rulePack)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"rulePack": pack.name, "version": pack.version, **pack.encounter_table.export()}
+
+@api_router.get("/encounters/distribution")
+async def get_encounter_distribution(expression: List[str] = Query(default=[])):
+    """Exact size distributions for dice expressions such as a monster's numberAppearing"""
+    if not 1 <= len(expression) <= 20:
+        raise HTTPException(status_code=400, detail="Provide between 1 and 20 expression parameters")
+    try:
+        distributions = [await asyncio.to_thread(dice_distribution, item) for item in expression]
+        return {"distributions": [distribution.to_dict() for distribution in distributions]}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@api_router.post("/encounters/build")
+async def build_encounter(request: EncounterBuildRequest):
+    """Pick monster groups from saved or freshly generated monsters to meet a party's XP budget"""
+    try:
+        EncounterBuilder.validate(request)
+        budget = EncounterBuilder.budget(request)
+        
+        if request.source == "saved":
+            projection = {"_id": 0, "id": 1, "name": 1, "type": 1, "challengeRating": 1, "stats": 1, "encounters": 1}
+            pool = await db.saved_monsters.find(EncounterBuilder.saved_query(request), projection).to_list(request.poolSize)
+        else:
+            generation_request = AdvancedGenerationRequest(
+                filters=request.filters.model_copy(update={"count": request.poolSize}),
+                includeTreasure=False,
+                includeLair=False,
+                customRules={"rulePack": request.rulePack} if request.rulePack else {}
+            )
+            monsters = await asyncio.to_thread(AdvancedMonsterGenerator.generate_monsters, generation_request)
+            pool = [monster.model_dump() for monster in monsters]
+        
+        candidates = EncounterBuilder.candidates(pool, request.useLairNumbers)
+        compositions = await asyncio.to_thread(
+            EncounterBuilder.compose, candidates, budget, request.maxGroups, request.topK, request.tolerance
+        )
+        return {"budget": budget, "poolSize": len(pool), "compositions": compositions}
+        
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error building encounter: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to build encounter")
+
+@api_router.post("/encounters/roll")
+async def roll_encounter(request: EncounterRollRequest):
+    """Roll concrete encounter groups (size, leaders, every member's HP) for a monster"""
+    try:
+        EncounterRoller.validate(request)
+        
+        if request.monster is not None:
+            monster = request.monster.model_dump()
+        else:
+            projection = {"_id": 0, "id": 1, "name": 1, "type": 1, "stats": 1, "encounters": 1, "specialAbilities": 1}
+            monster = await db.saved_monsters.find_one({"id": request.monsterId}, projection)
+            if not monster:
+                raise HTTPException(status_code=404, detail="Monster not found")
+            EncounterRoller.check_hit_dice((monster.get("stats") or {}).get("hd", "1"))
+        
+        result = EncounterRoller.roll(monster, request)
+        return {"monster": monster.get("name"), **result}
+        
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error rolling encounter: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to roll encounter")
+
+@api_router.post("/monsters/simulate-combat")
+async def simulate_combat(request: CombatSimulationRequest):
+    """Estimate how a party fares against a monster group over many simulated fights"""
+    try:
+        CombatSimulator.validate(request)
+        
+        if request.monster is not None:
+            stats = request.monster.stats
+            name = request.monster.name
+        else:
+            monster = await db.saved_monsters.find_one({"id": request.monsterId}, {"_id": 0, "name": 1, "stats": 1})
+            if not monster:
+                raise HTTPException(status_code=404, detail="Monster not found")
+            stats = MonsterStats(**monster["stats"])
+            CombatSimulator.validate_stats(stats)
+            name = monster.get("name")
+        
+        result = await asyncio.to_thread(CombatSimulator.simulate, stats, request)
+        return {"monster": name, "count": request.count, "partySize": len(request.party), **result}
+        
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error simulating combat: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to simulate combat")
+
+# Treasure Analysis Endpoints
+MAX_SIMULATION_TRIALS = int(os.environ.get('TREASURE_SIMULATION_MAX_TRIALS', '5000000'))
+
+@api_router.get("/monsters/treasure/simulate")
+async def simulate_treasure(treasureType: str = "all", trials: int = 100000, seed: int = 0, bins: int = 20,
+                            rulePack: Optional[str] = None):
+    """Monte Carlo value distributions for lair treasure types"""
+    if not 1 <= trials <= MAX_SIMULATION_TRIALS:
+        raise HTTPException(status_code=400, detail=f"trials must be between 1 and {MAX_SIMULATION_TRIALS}")
+    if not 1 <= bins <= 200:
+        raise HTTPException(status_code=400, detail="bins must be between 1 and 200")
+    try:
+        pack = rule_packs.get(rulePack)
+        if treasureType == "all":
+            results = await asyncio.to_thread(TreasureSimulator.simulate_all, trials, seed, bins, pack)
+        else:
+            results = {treasureType: await asyncio.to_thread(TreasureSimulator.simulate, treasureType, trials, seed, bins, pack)}
+        return {
+            "rulePack": pack.name,
+            "rulePackVersion": pack.version,
+            "tableVersion": TreasureSimulator.table_version(pack),
+            "results": results
+        }
+        
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error simulating treasure: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to simulate treasure")
 
 # Monster Library Endpoints
 @api_router.get("/monsters/libraries", response_model=Dict[str, List[MonsterLibrary]])
@@ -108,9 +534,16 @@ async def save_monster(request: SaveMonsterRequest):
         monster_dict = request.monster.dict()
         monster_dict["savedAt"] = datetime.utcnow()
         
-        # Insert monster
-        result = await db.saved_monsters.insert_one(monster_dict)
-        monster_id = str(result.inserted_id)
+        # Libraries list monsters by id; saving one that is already saved just adds it to the library
+        monster_id = request.monster.id
+        try:
+            await db.saved_monsters.insert_one(monster_dict)
+            saved_names.add(request.monster.name)
+            message = "Monster saved successfully"
+        except DuplicateKeyError:
+            if not request.libraryId:
+                raise HTTPException(status_code=409, detail=f"Monster {monster_id} is already saved")
+            message = "Monster already saved; added to library"
         
         # Update library if specified
         if request.libraryId:
@@ -120,12 +553,87 @@ async def save_monster(request: SaveMonsterRequest):
             )
         
         logger.info(f"Saved monster: {request.monster.name}")
-        return {"success": True, "monsterId": monster_id, "message": "Monster saved successfully"}
+        return {"success": True, "monsterId": monster_id, "message": message}
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error saving monster: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to save monster")
 
+@api_router.post("/monsters/import")
+async def import_monsters(http_request: Request, format: str = "jsonl", libraryId: Optional[str] = None,
+                          chunkSize: int = MonsterImporter.DEFAULT_CHUNK_SIZE):
+    """Bulk-save monsters streamed as JSONL or CSV in the request body"""
+    try:
+        importer = MonsterImporter(db, format, libraryId, chunkSize)
+        summary = await importer.run(iter_lines(http_request.stream()))
+        logger.info(f"Imported {summary['imported']} of {summary['rows']} monsters ({summary['failed']} failed)")
+        return summary
+        
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error importing monsters: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to import monsters")
+
+def export_response(collection, query: Dict[str, Any], format: str, name: str) -> StreamingResponse:
+    """Stream a query's monsters straight from the cursor in the requested format"""
+    async def chunks():
+        exported = 0
+        try:
+            async for chunk in MonsterExporter.stream(MonsterExporter.cursor(collection, query), format):
+                exported += len(chunk)
+                yield chunk
+            logger.info(f"Exported {name} ({exported} bytes of {format})")
+        except Exception as e:
+            # Headers are already sent; abort the transfer so the download is not taken as complete
+            logger.error(f"Error exporting {name}: {str(e)}")
+            raise
+    
+    return StreamingResponse(chunks(), media_type=MonsterExporter.media_type(format),
+                             headers=MonsterExporter.headers(format, name))
+
+@api_router.get("/monsters/export")
+async def export_saved_monsters(format: str = "jsonl", type: str = "any", challengeRating: str = "any",
+                                environment: str = "any"):
+    """Export saved monsters as JSONL, gzipped JSONL or CSV"""
+    try:
+        MonsterExporter.validate(format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    query = MonsterExporter.saved_query(type, challengeRating, environment)
+    return export_response(db.saved_monsters, query, format, "saved-monsters")
+
+@api_router.get("/monsters/libraries/{library_id}/export")
+async def export_library(library_id: str, format: str = "jsonl"):
+    """Export the monsters of a library"""
+    try:
+        MonsterExporter.validate(format)
+        library = await db.monster_libraries.find_one({"id": library_id}, {"_id": 0, "monsters": 1})
+        if not library:
+            raise HTTPException(status_code=404, detail="Library not found")
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error exporting library: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to export library")
+    query = {"id": {"$in": library.get("monsters", [])}}
+    return export_response(db.saved_monsters, query, format, f"library-{library_id}")
+
+@api_router.get("/monsters/generated/export")
+async def export_generated_monsters(format: str = "jsonl", start: Optional[datetime] = Query(None, alias="from"),
+                                    end: Optional[datetime] = Query(None, alias="to")):
+    """Export generation history, optionally limited to createdAt in [from, to)"""
+    try:
+        MonsterExporter.validate(format)
+        query = MonsterExporter.history_query(start, end)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return export_response(db.generated_monsters, query, format, "generated-monsters")
+
 @api_router.get("/monsters/my-collection")
 async def get_my_collection():
     """Get user's saved monsters"""
@@ -144,6 +652,33 @@ async def get_my_collection():
         logger.error(f"Error fetching collection: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to fetch collection")
 
+@api_router.get("/monsters/search")
+async def search_monsters(
+    q: Optional[str] = None,
+    type: List[str] = Query(default=[]),
+    challengeRating: List[str] = Query(default=[]),
+    environment: List[str] = Query(default=[]),
+    ability: List[str] = Query(default=[]),
+    lairSize: List[str] = Query(default=[]),
+    treasureType: List[str] = Query(default=[]),
+    sort: str = "relevance",
+    page: int = 1,
+    pageSize: int = 50
+):
+    """Search saved monsters by text and facets, with facet counts"""
+    query = MonsterSearchQuery(
+        q=q, type=type, challengeRating=challengeRating, environment=environment, abilities=ability,
+        lairSize=lairSize, treasureType=treasureType, sort=sort, page=page, pageSize=pageSize
+    )
+    try:
+        return await MonsterSearch.search(db.saved_monsters, query)
+        
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error searching monsters: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to search monsters")
+
 # Monster Sharing Endpoints
 @api_router.post("/monsters/share")
 async def share_monster(request: ShareMonsterRequest):
@@ -284,11 +819,41 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+async def load_saved_names():
+    """Load saved monster names for unique-name generation without per-name queries"""
+    saved_names.clear()
+    async for monster in db.saved_monsters.find({}, {"_id": 0, "name": 1}).batch_size(5000):
+        saved_names.add(monster["name"])
+    logger.info(f"Loaded {len(saved_names)} saved monster names")
+
 @app.on_event("startup")
 async def startup_event():
+    global event_loop_monitor, rule_pack_watcher
+    if db is None:
+        connect_db()
+    # Packs compiled in a preloading master are inherited already built
+    if not rule_packs.loaded:
+        await asyncio.to_thread(rule_packs.reload)
+    reload_interval = float(os.environ.get('RULE_PACK_RELOAD_INTERVAL', '0'))
+    if reload_interval > 0:
+        rule_pack_watcher = asyncio.create_task(rule_packs.watch(reload_interval))
+    await job_manager.start(db)
+    await load_saved_names()
+    await SavedMonsterMigrations.run(db)
+    await MonsterSearch.ensure_indexes(db.saved_monsters)
+    await MonsterExporter.ensure_indexes(db)
+    event_loop_monitor = asyncio.create_task(
+        monitor_event_loop_lag(float(os.environ.get('EVENT_LOOP_LAG_INTERVAL', '0.5')))
+    )
     logger.info("Labyrinth Lord Monster Generator API started")
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    client.close()
+    if event_loop_monitor:
+        event_loop_monitor.cancel()
+    if rule_pack_watcher:
+        rule_pack_watcher.cancel()
+    await job_manager.stop()
+    if client is not None:
+        client.close()
     logger.info("Database connection closed")
@@ -0,0 +1,77 @@
+import random
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+class AbilityRegistry:
+    """Canonical special abilities with stable integer ids and bitmasks.
+
+    An ability's id is its position in ABILITIES and its bit is 1 << id.
+    The tuple is append-only so masks stored with saved monsters stay
+    valid; it must stay within 63 entries to fit a signed 64-bit MongoDB
+    integer. Abilities outside the registry are kept in the string list
+    but have no bit.
+    """
+
+    # Abilities random generation draws from (ids 0..GENERATED_COUNT-1)
+    GENERATED = (
+        "Infravision 60'", "Infravision 90'", "Immune to sleep/charm", "Poison immunity", "Fire immunity", "Cold immunity",
+        "Lightning immunity", "Magic resistance", "Spell turning", "Regeneration", "Flight", "Burrow", "Swim", "Climb walls",
+        "Web", "Paralysis", "Charm", "Fear aura", "Death gaze", "Breath weapon", "Spellcasting", "Pack tactics",
+        "Berserker rage", "Leadership", "Keen scent", "Tracking", "Invisible", "Phase", "Teleport", "Shapeshifting",
+        "Energy drain", "Disease", "Curse", "Dimension door", "Mirror image", "Displacement", "Ethereal", "Astral projection"
+    )
+
+    # Abilities that only appear on templates or in lair rules
+    EXTRA = ("Sunlight Penalty -1", "Berserker Rage +2 to hit", "Magic resistance 50%", "Treasure sense", "Poison")
+
+    ABILITIES = GENERATED + EXTRA
+    GENERATED_COUNT = len(GENERATED)
+    IDS: Dict[str, int] = {name: ability_id for ability_id, name in enumerate(ABILITIES)}
+    GENERATED_MASK = (1 << GENERATED_COUNT) - 1
+
+    @staticmethod
+    def id_of(name: str) -> Optional[int]:
+        return AbilityRegistry.IDS.get(name)
+
+    @staticmethod
+    def to_mask(abilities: Iterable[str]) -> int:
+        """Bitmask of the registered abilities in a list"""
+        ids = AbilityRegistry.IDS
+        mask = 0
+        for name in abilities:
+            ability_id = ids.get(name)
+            if ability_id is not None:
+                mask |= 1 << ability_id
+        return mask
+
+    @staticmethod
+    def iter_ids(mask: int) -> Iterator[int]:
+        """Ids of the set bits, lowest first"""
+        while mask:
+            low_bit = mask & -mask
+            yield low_bit.bit_length() - 1
+            mask ^= low_bit
+
+    @staticmethod
+    def from_mask(mask: int) -> List[str]:
+        return [AbilityRegistry.ABILITIES[ability_id] for ability_id in AbilityRegistry.iter_ids(mask)]
+
+    @staticmethod
+    def sample_generated(k: int, taken: int = 0, rng: Optional[random.Random] = None) -> Tuple[List[str], int]:
+        """Draw k generatable abilities not in `taken`, without replacement.
+
+        Rejection sampling against the mask: with k far below the number of
+        abilities each draw needs about one random number, and nothing is
+        copied. Returns the names and the updated mask.
+        """
+        k = min(k, AbilityRegistry.GENERATED_COUNT - bin(taken & AbilityRegistry.GENERATED_MASK).count("1"))
+        rand = (rng or random).random
+        count = AbilityRegistry.GENERATED_COUNT
+        drawn = []
+        while len(drawn) < k:
+            ability_id = int(rand() * count)
+            bit = 1 << ability_id
+            if not taken & bit:
+                taken |= bit
+                drawn.append(AbilityRegistry.GENERATED[ability_id])
+        return drawn, taken
@@ -0,0 +1,126 @@
+import os
+from contextlib import asynccontextmanager
+
+from models.monster import AdvancedGenerationRequest
+from services.metrics import ADMISSION_REJECTIONS, ACTIVE_GENERATIONS
+
+
+class AdmissionRejected(Exception):
+    """Raised when a generation request cannot be admitted"""
+
+    def __init__(self, status_code: int, detail: str, retry_after: int = None):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+    @property
+    def headers(self):
+        return {"Retry-After": str(self.retry_after)} if self.retry_after is not None else None
+
+
+class AdmissionSlot:
+    """A claimed generation slot; releasing it more than once is harmless.
+
+    Streaming endpoints release from both the body generator and a response
+    background task, so the slot comes back whether or not the body is ever
+    iterated.
+    """
+
+    __slots__ = ("_controller", "_released")
+
+    def __init__(self, controller: "AdmissionController"):
+        self._controller = controller
+        self._released = False
+
+    def release(self) -> None:
+        if not self._released:
+            self._released = True
+            self._controller.release()
+
+
+class AdmissionController:
+    """Work budgets and concurrency limits for generation requests"""
+
+    # Relative cost of generating one monster at each complexity
+    COMPLEXITY_WEIGHTS = {'simple': 1, 'moderate': 2, 'complex': 3}
+
+    def __init__(self, work_budget: int, max_concurrent: int, retry_after: int, max_stream_count: int):
+        self.work_budget = work_budget
+        self.max_concurrent = max_concurrent
+        self.retry_after = retry_after
+        self.max_stream_count = max_stream_count
+        self.active = 0
+
+    @classmethod
+    def from_env(cls) -> "AdmissionController":
+        return cls(
+            work_budget=int(os.environ.get('GENERATION_WORK_BUDGET', '200')),
+            max_concurrent=int(os.environ.get('MAX_CONCURRENT_GENERATIONS', '4')),
+            retry_after=int(os.environ.get('GENERATION_RETRY_AFTER', '2')),
+            max_stream_count=int(os.environ.get('MAX_STREAM_GENERATION_COUNT', '10000'))
+        )
+
+    def work_units(self, request: AdvancedGenerationRequest, count: int = None) -> int:
+        """Estimate the work for a request as count x complexity weight"""
+        count = request.filters.count if count is None else count
+        return max(0, count) * self.COMPLEXITY_WEIGHTS.get(request.complexity, 2)
+
+    def max_count_per_request(self, request: AdvancedGenerationRequest) -> int:
+        """Largest count that fits into a single request's work budget"""
+        return max(1, self.work_budget // self.COMPLEXITY_WEIGHTS.get(request.complexity, 2))
+
+    def check_budget(self, request: AdvancedGenerationRequest) -> None:
+        """Reject requests whose work exceeds the per-request budget"""
+        if request.filters.count < 1:
+            ADMISSION_REJECTIONS.labels("invalid").inc()
+            raise AdmissionRejected(422, "count must be at least 1")
+        units = self.work_units(request)
+        if units > self.work_budget:
+            ADMISSION_REJECTIONS.labels("budget").inc()
+            raise AdmissionRejected(
+                413,
+                f"Request needs {units} work units but the limit is {self.work_budget} "
+                f"(at most {self.max_count_per_request(request)} {request.complexity} monsters). "
+                f"Use /api/monsters/generate-stream or /api/monsters/jobs for larger batches."
+            )
+
+    def check_stream(self, request: AdvancedGenerationRequest, count: int = None) -> None:
+        """Reject streaming requests beyond the streaming count limit"""
+        count = request.filters.count if count is None else count
+        if count < 1:
+            ADMISSION_REJECTIONS.labels("invalid").inc()
+            raise AdmissionRejected(422, "count must be at least 1")
+        if count > self.max_stream_count:
+            ADMISSION_REJECTIONS.labels("stream_limit").inc()
+            raise AdmissionRejected(413, f"Streaming generation is limited to {self.max_stream_count} monsters")
+
+    def acquire(self) -> None:
+        """Claim one of the concurrent generation slots or fail fast with 429"""
+        if self.active >= self.max_concurrent:
+            ADMISSION_REJECTIONS.labels("saturated").inc()
+            raise AdmissionRejected(429, "Generation capacity exhausted, retry later", retry_after=self.retry_after)
+        self.active += 1
+        ACTIVE_GENERATIONS.inc()
+
+    def claim(self) -> AdmissionSlot:
+        """acquire() a slot and return a handle for releasing it exactly once"""
+        self.acquire()
+        return AdmissionSlot(self)
+
+    def release(self) -> None:
+        """Return a slot claimed with acquire()"""
+        self.active -= 1
+        ACTIVE_GENERATIONS.dec()
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold a generation slot for the duration of the block"""
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+
+admission_controller = AdmissionController.from_env()
@@ -1,12 +1,20 @@
 import random
+import time
 import uuid
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Mapping, Optional
 from datetime import datetime
 
 from models.monster import Monster, MonsterStats, AdvancedGenerationRequest
 from services.treasure_generator import TreasureGenerator
 from services.lair_generator import LairGenerator  
 from services.encounter_generator import EncounterGenerator
+from services.sampling import WeightedSampler, cached_sampler
+from services.name_engine import NameBatch, saved_names
+from services.abilities import AbilityRegistry
+from services.rule_packs import CompiledRulePack, rule_packs
+from services.template_variation import TemplateVariant
+from services.cr_calibration import CalibrationExhausted, CRCalibration, OutsideTolerance, cr_surface
+from services.metrics import stage_timer, GENERATION_STAGE_SECONDS, MONSTERS_GENERATED, CR_CALIBRATION_REJECTIONS
 
 class AdvancedMonsterGenerator:
     
@@ -39,13 +47,8 @@ class AdvancedMonsterGenerator:
     ENVIRONMENTS = ["dungeon", "forest", "swamp", "mountain", "desert", "arctic", "coastal", "urban", "underground", "planar"]
     CHALLENGE_RATINGS = ["0", "1", "2", "3", "4", "5", "6+"]
     
-    SPECIAL_ABILITIES = [
-        "Infravision 60'", "Infravision 90'", "Immune to sleep/charm", "Poison immunity", "Fire immunity", "Cold immunity",
-        "Lightning immunity", "Magic resistance", "Spell turning", "Regeneration", "Flight", "Burrow", "Swim", "Climb walls",
-        "Web", "Paralysis", "Charm", "Fear aura", "Death gaze", "Breath weapon", "Spellcasting", "Pack tactics",
-        "Berserker rage", "Leadership", "Keen scent", "Tracking", "Invisible", "Phase", "Teleport", "Shapeshifting",
-        "Energy drain", "Disease", "Curse", "Dimension door", "Mirror image", "Displacement", "Ethereal", "Astral projection"
-    ]
+    # Canonical list lives in the ability registry (ids are positions)
+    SPECIAL_ABILITIES = list(AbilityRegistry.GENERATED)
     
     NAME_PREFIXES = [
         "Ancient", "Dire", "Giant", "Lesser", "Greater", "Elder", "Young", "Feral", "Savage", "Wild",
@@ -64,77 +67,201 @@ class AdvancedMonsterGenerator:
         "crafty", "vicious", "deadly", "fearsome", "monstrous", "otherworldly", "predatory", "aggressive",
         "sinister", "ominous", "menacing", "horrific", "nightmarish", "ghastly", "twisted", "aberrant"
     ]
+    
+    # Base creature names for each monster type
+    TYPE_BASE_NAMES = {
+        'beast': ["Wolf", "Bear", "Spider", "Boar", "Eagle", "Serpent", "Lizard", "Rat", "Hawk", "Panther"],
+        'undead': ["Skeleton", "Zombie", "Wraith", "Specter", "Ghoul", "Wight", "Shade", "Phantom", "Lich", "Revenant"],
+        'humanoid': ["Goblin", "Orc", "Hobgoblin", "Kobold", "Gnoll", "Bugbear", "Troll", "Giant", "Ogre", "Minotaur"],
+        'dragon': ["Drake", "Wyvern", "Dragon", "Wyrm", "Dragonling", "Serpent", "Basilisk", "Hydra"],
+        'fey': ["Sprite", "Pixie", "Dryad", "Satyr", "Brownie", "Will-o'-wisp", "Nymph", "Treant"],
+        'fiend': ["Demon", "Devil", "Imp", "Quasit", "Hellhound", "Incubus", "Succubus", "Balrog"],
+        'construct': ["Golem", "Automaton", "Guardian", "Sentinel", "Statue", "Clockwork", "Homunculus"],
+        'elemental': ["Elemental", "Mephit", "Salamander", "Sylph", "Gnome", "Djinn", "Efreet"],
+        'giant': ["Giant", "Ogre", "Troll", "Ettin", "Cyclops", "Titan", "Colossus"],
+        'aberration': ["Ooze", "Cube", "Horror", "Aberration", "Monstrosity", "Anomaly", "Beholder", "Mind Flayer"]
+    }
+    
+    # Abilities favored by each monster type
+    TYPE_ABILITIES = {
+        'undead': ['Immune to sleep/charm', 'Energy drain'],
+        'dragon': ['Breath weapon', 'Magic resistance', 'Fear aura'],
+        'fey': ['Invisible', 'Charm', 'Teleport'],
+        'fiend': ['Magic resistance', 'Fear aura', 'Teleport'],
+        'elemental': ['Fire immunity', 'Cold immunity', 'Lightning immunity'],
+        'beast': ['Keen scent', 'Pack tactics', 'Tracking']
+    }
+    
+    # Relative weights of the algorithms mixed by the balanced generator
+    # (overridable per request with customRules["algorithmWeights"])
+    ALGORITHM_WEIGHTS = {"template-based": 7, "random": 3}
+    
+    MOVEMENT_RATES = [60, 90, 120, 150]
+    
+    # Precomputed samplers for every choice point
+    ALGORITHM_SAMPLER = WeightedSampler.from_weights(ALGORITHM_WEIGHTS)
+    TYPE_SAMPLER = WeightedSampler(MONSTER_TYPES)
+    ENVIRONMENT_SAMPLER = WeightedSampler(ENVIRONMENTS)
+    CR_SAMPLER = WeightedSampler(CHALLENGE_RATINGS)
+    ABILITY_SAMPLER = WeightedSampler(SPECIAL_ABILITIES)
+    MOVEMENT_SAMPLER = WeightedSampler(MOVEMENT_RATES)
 
     @staticmethod
-    def generate_monsters(request: AdvancedGenerationRequest) -> List[Monster]:
-        """Main generation method using advanced algorithms"""
+    def generate_monsters(request: AdvancedGenerationRequest, names: Optional[NameBatch] = None) -> List[Monster]:
+        """Main generation method using advanced algorithms.
+
+        Pass the same `names` batch to every chunk of a run to keep
+        uniqueNames distinct across chunks.
+        """
         monsters = []
+        pack = AdvancedMonsterGenerator.resolve_rule_pack(request)
+        if names is None:
+            names = AdvancedMonsterGenerator.name_batch(request, pack)
+        
+        calibration = CRCalibration.from_rules(request.customRules)
         
         for _ in range(request.filters.count):
-            if request.algorithm == "template-based":
-                monster = AdvancedMonsterGenerator._generate_from_template(request)
-            elif request.algorithm == "random":
-                monster = AdvancedMonsterGenerator._generate_completely_random(request)
-            else:  # balanced
-                monster = AdvancedMonsterGenerator._generate_balanced(request)
+            if calibration and calibration[0] == "reject":
+                monster = AdvancedMonsterGenerator._generate_within_tolerance(request, names, pack)
+            else:
+                monster = AdvancedMonsterGenerator._generate_one(request, names, pack)
             
             monsters.append(monster)
         
+        MONSTERS_GENERATED.labels(request.algorithm, request.complexity).inc(len(monsters))
         return monsters
 
     @staticmethod
-    def _generate_balanced(request: AdvancedGenerationRequest) -> Monster:
-        """Generate monster using balanced algorithm (70% template, 30% random)"""
-        if random.random() < 0.7:
-            return AdvancedMonsterGenerator._generate_from_template(request)
+    def _generate_one(request: AdvancedGenerationRequest, names: Optional[NameBatch] = None,
+                      pack: Optional[CompiledRulePack] = None) -> Monster:
+        if request.algorithm == "template-based":
+            return AdvancedMonsterGenerator._generate_from_template(request, names, pack)
+        elif request.algorithm == "random":
+            return AdvancedMonsterGenerator._generate_completely_random(request, names, pack)
+        else:  # balanced
+            return AdvancedMonsterGenerator._generate_balanced(request, names, pack)
+
+    @staticmethod
+    def _generate_within_tolerance(request: AdvancedGenerationRequest, names: Optional[NameBatch] = None,
+                                   pack: Optional[CompiledRulePack] = None) -> Monster:
+        """Regenerate monsters rejected by CR calibration; give up if none fits in MAX_ATTEMPTS"""
+        for _ in range(CRCalibration.MAX_ATTEMPTS):
+            try:
+                return AdvancedMonsterGenerator._generate_one(request, names, pack)
+            except OutsideTolerance as e:
+                CR_CALIBRATION_REJECTIONS.inc()
+                rejected = e
+        raise CalibrationExhausted(rejected.label, rejected.effective, CRCalibration.MAX_ATTEMPTS)
+
+    @staticmethod
+    def validate_rules(request: AdvancedGenerationRequest) -> None:
+        """Reject bad customRules before any work is queued or streamed"""
+        AdvancedMonsterGenerator.resolve_rule_pack(request)
+        CRCalibration.from_rules(request.customRules)
+        AdvancedMonsterGenerator._algorithm_sampler(request)
+
+    @staticmethod
+    def resolve_rule_pack(request: AdvancedGenerationRequest) -> CompiledRulePack:
+        """Rule pack selected with customRules["rulePack"] (the core rules by default)"""
+        return rule_packs.get((request.customRules or {}).get("rulePack"))
+
+    @staticmethod
+    def name_batch(request: AdvancedGenerationRequest, pack: Optional[CompiledRulePack] = None) -> Optional[NameBatch]:
+        """Distinct-name source for a run when customRules["uniqueNames"] is set"""
+        rules = request.customRules or {}
+        if not rules.get("uniqueNames"):
+            return None
+        seed = rules.get("nameSeed")
+        pack = pack or AdvancedMonsterGenerator.resolve_rule_pack(request)
+        return NameBatch(pack, seed=int(seed) if seed is not None else None, exclude=saved_names)
+
+    @staticmethod
+    def _generate_balanced(request: AdvancedGenerationRequest, names: Optional[NameBatch] = None,
+                           pack: Optional[CompiledRulePack] = None) -> Monster:
+        """Generate monster using balanced algorithm (weighted template/random mix)"""
+        if AdvancedMonsterGenerator._algorithm_sampler(request).sample() == "template-based":
+            return AdvancedMonsterGenerator._generate_from_template(request, names, pack)
         else:
-            return AdvancedMonsterGenerator._generate_completely_random(request)
+            return AdvancedMonsterGenerator._generate_completely_random(request, names, pack)
+
+    @staticmethod
+    def _algorithm_sampler(request: AdvancedGenerationRequest) -> WeightedSampler:
+        """Sampler for the balanced mix, honoring customRules["algorithmWeights"]"""
+        weights = (request.customRules or {}).get("algorithmWeights")
+        if weights is None:
+            return AdvancedMonsterGenerator.ALGORITHM_SAMPLER
+        known = ", ".join(AdvancedMonsterGenerator.ALGORITHM_WEIGHTS)
+        if not isinstance(weights, Mapping) or not weights:
+            raise ValueError(f"algorithmWeights must map algorithms ({known}) to weights")
+        weighted_items = []
+        for algorithm, weight in weights.items():
+            if algorithm not in AdvancedMonsterGenerator.ALGORITHM_WEIGHTS:
+                raise ValueError(f"Unknown algorithm '{algorithm}' in algorithmWeights, choose from {known}")
+            if isinstance(weight, bool) or not isinstance(weight, (int, float)) or not 0 <= weight < float("inf"):
+                raise ValueError(f"algorithmWeights['{algorithm}'] must be a non-negative number")
+            weighted_items.append((algorithm, float(weight)))
+        if not any(weight > 0 for _, weight in weighted_items):
+            raise ValueError("algorithmWeights needs at least one positive weight")
+        return cached_sampler(tuple(sorted(weighted_items)))
 
     @staticmethod
-    def _generate_from_template(request: AdvancedGenerationRequest) -> Monster:
+    def _generate_from_template(request: AdvancedGenerationRequest, names: Optional[NameBatch] = None,
+                                pack: Optional[CompiledRulePack] = None) -> Monster:
         """Generate monster based on existing templates with variations"""
-        # Filter templates by criteria
-        suitable_templates = [
-            t for t in AdvancedMonsterGenerator.MONSTER_TEMPLATES
-            if (request.filters.challengeRating == "any" or t["challengeRating"] == request.filters.challengeRating) and
-               (request.filters.type == "any" or t["type"] == request.filters.type) and
-               (request.filters.environment == "any" or t["environment"] == request.filters.environment)
-        ]
-        
-        if not suitable_templates:
-            return AdvancedMonsterGenerator._generate_completely_random(request)
-        
-        template = random.choice(suitable_templates)
-        
-        # Create variations of the template
-        monster_data = template.copy()
-        
-        # Add variations based on complexity
-        if request.complexity == "complex":
-            monster_data = AdvancedMonsterGenerator._add_complex_variations(monster_data)
-        elif request.complexity == "moderate":
-            monster_data = AdvancedMonsterGenerator._add_moderate_variations(monster_data)
-        
-        return AdvancedMonsterGenerator._build_complete_monster(monster_data, request)
+        pack = pack or rule_packs.get()
+        with stage_timer("template"):
+            # Pick a matching template from the rule pack's indexes
+            template = pack.pick_template(
+                request.filters.challengeRating, request.filters.type, request.filters.environment
+            )
+            
+            if template is not None:
+                # Variations are recorded on an overlay; the template itself stays untouched
+                monster_data = TemplateVariant(template)
+                
+                # Add variations based on complexity
+                if request.complexity == "complex":
+                    monster_data = AdvancedMonsterGenerator._add_complex_variations(monster_data, pack)
+                elif request.complexity == "moderate":
+                    monster_data = AdvancedMonsterGenerator._add_moderate_variations(monster_data)
+        
+        # The fallback times its own stages, so it runs outside the template stage
+        if template is None:
+            return AdvancedMonsterGenerator._generate_completely_random(request, names, pack)
+        
+        if names is not None:
+            with stage_timer("name"):
+                monster_data["name"] = names.claim(monster_data["name"])
+        
+        return AdvancedMonsterGenerator._build_complete_monster(monster_data, request, pack)
 
     @staticmethod
-    def _generate_completely_random(request: AdvancedGenerationRequest) -> Monster:
+    def _generate_completely_random(request: AdvancedGenerationRequest, names: Optional[NameBatch] = None,
+                                    pack: Optional[CompiledRulePack] = None) -> Monster:
         """Generate completely random monster"""
-        cr = request.filters.challengeRating if request.filters.challengeRating != "any" else random.choice(AdvancedMonsterGenerator.CHALLENGE_RATINGS)
-        monster_type = request.filters.type if request.filters.type != "any" else random.choice(AdvancedMonsterGenerator.MONSTER_TYPES)
-        environment = request.filters.environment if request.filters.environment != "any" else random.choice(AdvancedMonsterGenerator.ENVIRONMENTS)
+        pack = pack or rule_packs.get()
+        cr = request.filters.challengeRating if request.filters.challengeRating != "any" else AdvancedMonsterGenerator.CR_SAMPLER.sample()
+        monster_type = request.filters.type if request.filters.type != "any" else AdvancedMonsterGenerator.TYPE_SAMPLER.sample()
+        environment = request.filters.environment if request.filters.environment != "any" else AdvancedMonsterGenerator.ENVIRONMENT_SAMPLER.sample()
         
         # Generate stats based on CR
-        stats = AdvancedMonsterGenerator._generate_stats_by_cr(cr)
+        with stage_timer("stats"):
+            stats = AdvancedMonsterGenerator._generate_stats_by_cr(cr)
         
         # Generate name
-        name = AdvancedMonsterGenerator._generate_monster_name(monster_type)
+        with stage_timer("name"):
+            if names is not None:
+                name = names.next_name(monster_type)
+            else:
+                name = AdvancedMonsterGenerator._generate_monster_name(monster_type, pack)
         
         # Generate abilities
-        abilities = AdvancedMonsterGenerator._generate_special_abilities(cr, monster_type, request.complexity)
+        with stage_timer("abilities"):
+            abilities = AdvancedMonsterGenerator._generate_special_abilities(cr, monster_type, request.complexity)
         
         # Generate description
-        description = AdvancedMonsterGenerator._generate_description(name, monster_type, environment)
+        with stage_timer("description"):
+            description = AdvancedMonsterGenerator._generate_description(monster_type, environment, pack)
         
         monster_data = {
             "name": name,
@@ -154,13 +281,25 @@ class AdvancedMonsterGenerator:
             "specialAbilities": abilities
         }
         
-        return AdvancedMonsterGenerator._build_complete_monster(monster_data, request)
+        return AdvancedMonsterGenerator._build_complete_monster(monster_data, request, pack)
 
     @staticmethod
-    def _build_complete_monster(monster_data: Dict[str, Any], request: AdvancedGenerationRequest) -> Monster:
+    def _build_complete_monster(monster_data: Mapping[str, Any], request: AdvancedGenerationRequest,
+                                pack: Optional[CompiledRulePack] = None) -> Monster:
         """Build complete monster with all systems"""
+        pack = pack or rule_packs.get()
+        
+        # Check the challenge rating against the simulated difficulty surface
+        calibration = CRCalibration.from_rules(request.customRules)
+        if calibration:
+            mode, tolerance = calibration
+            with stage_timer("calibration"):
+                label = cr_surface().calibrate(monster_data, tolerance, relabel=mode == "relabel")
+            if label != monster_data["challengeRating"]:
+                monster_data["challengeRating"] = label
         
         # Create basic monster stats
+        model_start = time.perf_counter()
         stats = MonsterStats(
             ac=monster_data["ac"],
             hd=monster_data["hd"],
@@ -172,38 +311,48 @@ class AdvancedMonsterGenerator:
             morale=monster_data["morale"],
             xp=monster_data["xp"]
         )
+        ability_mask = AbilityRegistry.to_mask(monster_data["specialAbilities"])
+        model_seconds = time.perf_counter() - model_start
         
         # Generate encounter information
-        encounters = EncounterGenerator.generate_encounter_info(
-            monster_data["type"],
-            monster_data["challengeRating"],
-            monster_data["specialAbilities"],
-            monster_data["environment"]
-        )
+        with stage_timer("encounter"):
+            encounters = EncounterGenerator.generate_encounter_info(
+                monster_data["type"],
+                monster_data["challengeRating"],
+                monster_data["specialAbilities"],
+                monster_data["environment"],
+                ability_mask,
+                pack.encounter_table
+            )
         
         # Generate treasure
-        if request.includeTreasure:
-            individual_treasure = TreasureGenerator.generate_individual_treasure(monster_data["challengeRating"])
-            lair_treasure = TreasureGenerator.generate_lair_treasure(monster_data["challengeRating"], monster_data["type"])
-            # Combine treasures
-            treasure = TreasureGenerator.generate_lair_treasure(monster_data["challengeRating"], monster_data["type"])
-        else:
-            from models.monster import TreasureInfo
-            treasure = TreasureInfo(individual="None", lair="None")
+        with stage_timer("treasure"):
+            if request.includeTreasure:
+                individual_treasure = TreasureGenerator.generate_individual_treasure(monster_data["challengeRating"])
+                lair_treasure = TreasureGenerator.generate_lair_treasure(monster_data["challengeRating"], monster_data["type"], pack.treasure_types)
+                # Combine treasures
+                treasure = TreasureGenerator.generate_lair_treasure(monster_data["challengeRating"], monster_data["type"], pack.treasure_types)
+            else:
+                from models.monster import TreasureInfo
+                treasure = TreasureInfo(individual="None", lair="None")
         
         # Generate lair
-        if request.includeLair:
-            lair = LairGenerator.generate_lair(
-                monster_data["type"],
-                monster_data["environment"],
-                monster_data["challengeRating"],
-                monster_data["specialAbilities"]
-            )
-        else:
-            from models.monster import LairInfo
-            lair = LairInfo(description="No fixed lair", terrain=monster_data["environment"], size="none", defenses=[])
+        with stage_timer("lair"):
+            if request.includeLair:
+                lair = LairGenerator.generate_lair(
+                    monster_data["type"],
+                    monster_data["environment"],
+                    monster_data["challengeRating"],
+                    monster_data["specialAbilities"],
+                    ability_mask,
+                    pack.terrain
+                )
+            else:
+                from models.monster import LairInfo
+                lair = LairInfo(description="No fixed lair", terrain=monster_data["environment"], size="none", defenses=[])
         
-        return Monster(
+        model_start = time.perf_counter()
+        monster = Monster(
             name=monster_data["name"],
             type=monster_data["type"],
             challengeRating=monster_data["challengeRating"],
@@ -211,11 +360,14 @@ class AdvancedMonsterGenerator:
             stats=stats,
             description=monster_data["description"],
             specialAbilities=monster_data["specialAbilities"],
+            abilityMask=ability_mask,
             encounters=encounters,
             treasure=treasure,
             lair=lair,
             source="generated"
         )
+        GENERATION_STAGE_SECONDS.labels("model_build").observe(model_seconds + time.perf_counter() - model_start)
+        return monster
 
     @staticmethod
     def _generate_stats_by_cr(cr: str) -> Dict[str, Any]:
@@ -253,7 +405,7 @@ class AdvancedMonsterGenerator:
             hp = random.randint(1, 8)
         
         # Generate movement
-        base_move = random.choice([60, 90, 120, 150])
+        base_move = AdvancedMonsterGenerator.MOVEMENT_SAMPLER.sample()
         movement = f"{base_move}' ({base_move//3}')"
         
         # Generate damage based on CR
@@ -283,28 +435,16 @@ class AdvancedMonsterGenerator:
         }
 
     @staticmethod
-    def _generate_monster_name(monster_type: str) -> str:
+    def _generate_monster_name(monster_type: str, pack: Optional[CompiledRulePack] = None) -> str:
         """Generate creative monster name"""
+        pack = pack or rule_packs.get()
         use_prefix = random.random() > 0.4
-        prefix = random.choice(AdvancedMonsterGenerator.NAME_PREFIXES) + " " if use_prefix else ""
-        
-        type_base_names = {
-            'beast': ["Wolf", "Bear", "Spider", "Boar", "Eagle", "Serpent", "Lizard", "Rat", "Hawk", "Panther"],
-            'undead': ["Skeleton", "Zombie", "Wraith", "Specter", "Ghoul", "Wight", "Shade", "Phantom", "Lich", "Revenant"],
-            'humanoid': ["Goblin", "Orc", "Hobgoblin", "Kobold", "Gnoll", "Bugbear", "Troll", "Giant", "Ogre", "Minotaur"],
-            'dragon': ["Drake", "Wyvern", "Dragon", "Wyrm", "Dragonling", "Serpent", "Basilisk", "Hydra"],
-            'fey': ["Sprite", "Pixie", "Dryad", "Satyr", "Brownie", "Will-o'-wisp", "Nymph", "Treant"],
-            'fiend': ["Demon", "Devil", "Imp", "Quasit", "Hellhound", "Incubus", "Succubus", "Balrog"],
-            'construct': ["Golem", "Automaton", "Guardian", "Sentinel", "Statue", "Clockwork", "Homunculus"],
-            'elemental': ["Elemental", "Mephit", "Salamander", "Sylph", "Gnome", "Djinn", "Efreet"],
-            'giant': ["Giant", "Ogre", "Troll", "Ettin", "Cyclops", "Titan", "Colossus"],
-            'aberration': ["Ooze", "Cube", "Horror", "Aberration", "Monstrosity", "Anomaly", "Beholder", "Mind Flayer"]
-        }
+        prefix = pack.prefix_sampler.sample() + " " if use_prefix else ""
         
-        base_name = random.choice(type_base_names.get(monster_type, type_base_names['beast']))
+        base_name = pack.base_name_sampler(monster_type).sample()
         
         use_suffix = random.random() > 0.6
-        suffix = " " + random.choice(AdvancedMonsterGenerator.NAME_ROOTS) if use_suffix else ""
+        suffix = " " + pack.root_sampler.sample() if use_suffix else ""
         
         return prefix + base_name + suffix
 
@@ -324,51 +464,31 @@ class AdvancedMonsterGenerator:
         num_abilities += cr_bonus.get(cr, 0)
         
         abilities = []
-        available_abilities = AdvancedMonsterGenerator.SPECIAL_ABILITIES.copy()
+        taken = 0
         
         # Add type-specific abilities
-        type_abilities = {
-            'undead': ['Immune to sleep/charm', 'Energy drain'],
-            'dragon': ['Breath weapon', 'Magic resistance', 'Fear aura'],
-            'fey': ['Invisible', 'Charm', 'Teleport'],
-            'fiend': ['Magic resistance', 'Fear aura', 'Teleport'],
-            'elemental': ['Fire immunity', 'Cold immunity', 'Lightning immunity'],
-            'beast': ['Keen scent', 'Pack tactics', 'Tracking']
-        }
-        
-        if monster_type in type_abilities:
+        if monster_type in AdvancedMonsterGenerator.TYPE_ABILITIES:
             # Higher chance for type-specific abilities
-            for ability in type_abilities[monster_type]:
+            for ability in AdvancedMonsterGenerator.TYPE_ABILITIES[monster_type]:
                 if len(abilities) < num_abilities and random.random() > 0.5:
                     abilities.append(ability)
-                    if ability in available_abilities:
-                        available_abilities.remove(ability)
+                    taken |= 1 << AbilityRegistry.IDS[ability]
         
-        # Fill remaining slots with random abilities
-        while len(abilities) < num_abilities and available_abilities:
-            ability = random.choice(available_abilities)
-            abilities.append(ability)
-            available_abilities.remove(ability)
+        # Fill remaining slots with random abilities (without replacement)
+        remaining = num_abilities - len(abilities)
+        if remaining > 0:
+            abilities.extend(AbilityRegistry.sample_generated(remaining, taken)[0])
         
         return abilities
 
     @staticmethod
-    def _generate_description(name: str, monster_type: str, environment: str) -> str:
-        """Generate monster description"""
-        descriptor1 = random.choice(AdvancedMonsterGenerator.DESCRIPTORS)
-        descriptor2 = random.choice(AdvancedMonsterGenerator.DESCRIPTORS)
-        
-        templates = [
-            f"A {descriptor1} creature that haunts the {environment}. This {monster_type} is known for its {descriptor2} nature and unpredictable behavior in combat.",
-            f"These {descriptor1} beings are commonly found lurking in {environment} regions. They are {descriptor2} predators that strike fear into seasoned adventurers.",
-            f"A {descriptor2} {monster_type} that has claimed the {environment} as its domain. Ancient tales speak of its {descriptor1} appetite and supernatural cunning.",
-            f"This {descriptor1} monstrosity terrorizes the {environment}, leaving behind only whispered legends. Its {descriptor2} reputation is earned through countless deadly encounters."
-        ]
-        
-        return random.choice(templates)
+    def _generate_description(monster_type: str, environment: str, pack: Optional[CompiledRulePack] = None) -> str:
+        """Generate monster description from the rule pack's compiled grammar"""
+        pack = pack or rule_packs.get()
+        return pack.description_grammar.generate(monster_type, environment)
 
     @staticmethod
-    def _add_moderate_variations(monster_data: Dict[str, Any]) -> Dict[str, Any]:
+    def _add_moderate_variations(monster_data: TemplateVariant) -> TemplateVariant:
         """Add moderate variations to template monster"""
         # Slightly modify stats
         monster_data["hp"] = max(1, monster_data["hp"] + random.randint(-2, 2))
@@ -376,15 +496,14 @@ class AdvancedMonsterGenerator:
         
         # Maybe add an ability
         if random.random() > 0.6:
-            new_ability = random.choice(AdvancedMonsterGenerator.SPECIAL_ABILITIES)
-            if new_ability not in monster_data["specialAbilities"]:
-                monster_data["specialAbilities"].append(new_ability)
+            monster_data.add_ability(AdvancedMonsterGenerator.ABILITY_SAMPLER.sample())
         
         return monster_data
 
     @staticmethod
-    def _add_complex_variations(monster_data: Dict[str, Any]) -> Dict[str, Any]:
+    def _add_complex_variations(monster_data: TemplateVariant, pack: Optional[CompiledRulePack] = None) -> TemplateVariant:
         """Add complex variations to template monster"""
+        pack = pack or rule_packs.get()
         # Modify stats more significantly
         monster_data["hp"] = max(1, monster_data["hp"] + random.randint(-3, 5))
         monster_data["ac"] = max(0, min(10, monster_data["ac"] + random.randint(-1, 1)))
@@ -392,13 +511,11 @@ class AdvancedMonsterGenerator:
         
         # Add 1-2 new abilities
         for _ in range(random.randint(1, 2)):
-            new_ability = random.choice(AdvancedMonsterGenerator.SPECIAL_ABILITIES)
-            if new_ability not in monster_data["specialAbilities"]:
-                monster_data["specialAbilities"].append(new_ability)
+            monster_data.add_ability(AdvancedMonsterGenerator.ABILITY_SAMPLER.sample())
         
         # Modify name
         if random.random() > 0.5:
-            prefix = random.choice(AdvancedMonsterGenerator.NAME_PREFIXES)
+            prefix = pack.prefix_sampler.sample()
             monster_data["name"] = f"{prefix} {monster_data['name']}"
         
         return monster_data
\ No newline at end of file
@@ -0,0 +1,219 @@
+import copy
+import re
+from functools import lru_cache
+from typing import Any, Dict, Sequence, Tuple
+
+import numpy as np
+
+from models.monster import CombatSimulationRequest, MonsterStats, PartyMember
+from services.dice import parse_dice
+
+# (count, sides, bonus) per attack
+AttackDice = Tuple[Tuple[int, int, int], ...]
+
+
+class CombatSimulator:
+    """Monte Carlo fights between a monster group and a party, vectorized over trials.
+
+    Every trial runs in lockstep as one row of NumPy arrays; a round is a
+    fixed number of array operations whatever the trial count. Rounds are
+    simultaneous: both sides attack with the combatants standing at the
+    start of the round. To-hit follows the Labyrinth Lord attack tables in
+    simplified form (a d20 roll of 20 - attack level - target AC or more,
+    natural 20 always hits and natural 1 always misses). Monsters check
+    morale (2d6 over their morale flees) when the first of them falls and
+    when half are down, or for a lone monster when first wounded and again
+    at a quarter of its hit points.
+    """
+
+    MAX_ROUNDS = 50
+    MAX_TRIALS = 50_000
+    MAX_MONSTERS = 20
+    MAX_PARTY_SIZE = 10
+    DEFAULT_DAMAGE = (1, 6, 0)
+    # Damage dice are rolled as a (trials, attackers, dice) array
+    MAX_DAMAGE_DICE = 20
+    MAX_DIE_SIDES = 100
+    # Descending armour class: 9 is unarmoured, magic armour reaches below 0
+    MIN_AC = -10
+    MAX_AC = 10
+
+    @staticmethod
+    def validate(request: CombatSimulationRequest) -> None:
+        if request.monster is None and not request.monsterId:
+            raise ValueError("Provide a monster or a saved monsterId")
+        if not 1 <= request.trials <= CombatSimulator.MAX_TRIALS:
+            raise ValueError(f"trials must be between 1 and {CombatSimulator.MAX_TRIALS}")
+        if not 1 <= request.count <= CombatSimulator.MAX_MONSTERS:
+            raise ValueError(f"count must be between 1 and {CombatSimulator.MAX_MONSTERS}")
+        if not 1 <= len(request.party) <= CombatSimulator.MAX_PARTY_SIZE:
+            raise ValueError(f"party must have between 1 and {CombatSimulator.MAX_PARTY_SIZE} members")
+        for member in request.party:
+            if not 1 <= member.level <= 20:
+                raise ValueError("Party member levels must be between 1 and 20")
+            if member.hp is not None and member.hp < 1:
+                raise ValueError("Party member hp must be at least 1")
+            if not CombatSimulator.MIN_AC <= member.ac <= CombatSimulator.MAX_AC:
+                raise ValueError(f"Party member AC must be between {CombatSimulator.MIN_AC} and {CombatSimulator.MAX_AC}")
+            CombatSimulator.check_damage(parse_dice(member.damage), f"Party damage {member.damage}")
+        if request.monster is not None:
+            CombatSimulator.validate_stats(request.monster.stats)
+
+    @staticmethod
+    def validate_stats(stats: MonsterStats) -> None:
+        """Reject monster damage too large to roll, for inline and saved monsters alike"""
+        for dice in CombatSimulator.attack_dice(stats.attacks, stats.damage):
+            CombatSimulator.check_damage(dice, f"Monster damage {stats.damage}")
+
+    @staticmethod
+    def check_damage(dice: Tuple[int, int, int], label: str) -> None:
+        count, sides, _ = dice
+        if count > CombatSimulator.MAX_DAMAGE_DICE or sides > CombatSimulator.MAX_DIE_SIDES:
+            raise ValueError(
+                f"{label} exceeds {CombatSimulator.MAX_DAMAGE_DICE}d{CombatSimulator.MAX_DIE_SIDES} per attack"
+            )
+
+    @staticmethod
+    def hit_dice_level(hd: str) -> int:
+        """Attack level from a hit dice string: "3+1" attacks as 4 HD, "1-1" as 1"""
+        match = re.match(r"\s*(\d+)\s*(\+)?", hd or "")
+        if not match:
+            return 1
+        return max(1, int(match.group(1)) + (1 if match.group(2) else 0))
+
+    @staticmethod
+    def attack_dice(attacks: str, damage: str) -> AttackDice:
+        """One dice tuple per attack, from strings like "2 claws/1 bite" and "1d4/1d4/1d6"""
+        parts = [part.split(" or ")[0].strip() for part in (damage or "").split(" or ")[0].split("/")]
+        dice = []
+        for part in parts:
+            try:
+                dice.append(parse_dice(part))
+            except ValueError:
+                dice.append(CombatSimulator.DEFAULT_DAMAGE)
+        if len(dice) == 1:
+            # A single damage entry is dealt by every listed attack ("2 attacks", "1-2 attacks")
+            counts = [int(n) for n in re.findall(r"\d+", (attacks or "").split(" or ")[0])]
+            dice = dice * max(1, min(max(counts, default=1), 4))
+        return tuple(dice)
+
+    @staticmethod
+    def party_signature(party: Sequence[PartyMember]) -> Tuple[Tuple[int, int, int, Tuple[int, int, int], int], ...]:
+        return tuple(
+            (member.level, member.ac, member.hp or 1 + 5 * member.level, parse_dice(member.damage), member.attackBonus)
+            for member in party
+        )
+
+    @staticmethod
+    def simulate(stats: MonsterStats, request: CombatSimulationRequest) -> Dict[str, Any]:
+        """Simulate the request's fights against a monster's stat block"""
+        result = CombatSimulator._simulate_cached(
+            stats.ac, CombatSimulator.hit_dice_level(stats.hd), max(1, stats.hp),
+            CombatSimulator.attack_dice(stats.attacks, stats.damage), stats.morale, request.count,
+            CombatSimulator.party_signature(request.party), request.trials, request.seed
+        )
+        return copy.deepcopy(result)
+
+    @staticmethod
+    def _roll(rng: np.random.Generator, dice: Tuple[int, int, int], shape: Tuple[int, ...]) -> np.ndarray:
+        count, sides, bonus = dice
+        if not count:
+            return np.full(shape, bonus)
+        return rng.integers(1, sides + 1, shape + (count,)).sum(axis=-1) + bonus
+
+    @staticmethod
+    def _pick_targets(rng: np.random.Generator, alive: np.ndarray, attackers: int) -> np.ndarray:
+        """A random living target per (trial, attacker); alive is (trials, targets)"""
+        keys = rng.random((alive.shape[0], attackers, alive.shape[1]))
+        keys[~np.broadcast_to(alive[:, None, :], keys.shape)] = -1.0
+        return keys.argmax(axis=2)
+
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _simulate_cached(ac: int, hd_level: int, hp: int, attacks: AttackDice, morale: int, count: int,
+                         party: Tuple, trials: int, seed: int) -> Dict[str, Any]:
+        rng = np.random.default_rng(seed)
+        trial_index = np.arange(trials)[:, None]
+        party_size = len(party)
+        party_ac = np.array([member[1] for member in party])
+        party_max_hp = np.array([member[2] for member in party])
+        party_attack_level = np.array([1 + (member[0] - 1) * 2 // 3 + member[4] for member in party])
+
+        monster_hp = np.full((trials, count), hp)
+        party_hp = np.tile(party_max_hp, (trials, 1))
+        # Monster rolls needed against each party member, and party rolls against the monster
+        monster_needs = np.clip(20 - hd_level - party_ac, 2, 20)
+        party_needs = np.clip(20 - party_attack_level - ac, 2, 20)
+
+        active = np.ones(trials, dtype=bool)
+        fled = np.zeros(trials, dtype=bool)
+        rounds = np.zeros(trials, dtype=np.int64)
+        checks_done = np.zeros((trials, 2), dtype=bool)
+
+        for round_number in range(1, CombatSimulator.MAX_ROUNDS + 1):
+            monsters_alive = monster_hp > 0
+            party_alive = party_hp > 0
+            rounds[active] = round_number
+
+            # Monsters attack: each attack picks a living party member
+            party_damage = np.zeros((trials, party_size), dtype=np.int64)
+            attacking = monsters_alive & active[:, None]
+            for dice in attacks:
+                targets = CombatSimulator._pick_targets(rng, party_alive, count)
+                hits = rng.integers(1, 21, (trials, count)) >= monster_needs[targets]
+                damage = np.maximum(CombatSimulator._roll(rng, dice, (trials, count)), 1) * (hits & attacking)
+                np.add.at(party_damage, (np.broadcast_to(trial_index, targets.shape), targets), damage)
+
+            # Party attacks: each member picks a living monster
+            monster_damage = np.zeros((trials, count), dtype=np.int64)
+            targets = CombatSimulator._pick_targets(rng, monsters_alive, party_size)
+            hits = rng.integers(1, 21, (trials, party_size)) >= party_needs
+            for member_index, member in enumerate(party):
+                damage = CombatSimulator._roll(rng, member[3], (trials,))
+                damage = np.maximum(damage, 1) * (hits[:, member_index] & party_alive[:, member_index] & active)
+                np.add.at(monster_damage, (np.arange(trials), targets[:, member_index]), damage)
+
+            monster_hp = monster_hp - monster_damage
+            party_hp = party_hp - party_damage
+
+            # Morale checks, each at most once per fight
+            if morale < 12:
+                down = (monster_hp <= 0).sum(axis=1)
+                if count > 1:
+                    triggers = np.stack([down >= 1, down * 2 >= count], axis=1)
+                else:
+                    triggers = np.stack([monster_hp[:, 0] < hp, monster_hp[:, 0] * 4 <= hp], axis=1)
+                standing = down < count
+                new_checks = triggers & ~checks_done & (active & standing)[:, None]
+                checks_done |= new_checks
+                roll_count = new_checks.sum(axis=1)
+                breaks = np.zeros(trials, dtype=bool)
+                for check in range(2):
+                    rolled = roll_count > check
+                    breaks |= rolled & (rng.integers(1, 7, trials) + rng.integers(1, 7, trials) > morale)
+                fled |= breaks & active
+
+            monsters_down = ((monster_hp <= 0).all(axis=1)) | fled
+            party_down = (party_hp <= 0).all(axis=1)
+            active &= ~(monsters_down | party_down)
+            if not active.any():
+                break
+
+        monsters_down = (monster_hp <= 0).all(axis=1) | fled
+        party_down = (party_hp <= 0).all(axis=1)
+        party_wins = monsters_down & ~party_down
+        monster_wins = party_down & ~monsters_down
+        resolved = monsters_down | party_down
+        party_hp_lost = np.clip(party_max_hp - np.maximum(party_hp, 0), 0, None).sum(axis=1) / party_max_hp.sum()
+        return {
+            "trials": trials,
+            "seed": seed,
+            "winRate": round(float(party_wins.mean()), 4),
+            "lossRate": round(float(monster_wins.mean()), 4),
+            "mutualDefeatRate": round(float((monsters_down & party_down).mean()), 4),
+            "unresolvedRate": round(float((~resolved).mean()), 4),
+            "moraleBreakRate": round(float(fled.mean()), 4),
+            "expectedRounds": round(float(rounds[resolved].mean()) if resolved.any() else float(CombatSimulator.MAX_ROUNDS), 2),
+            "partyDeathsMean": round(float((party_hp <= 0).sum(axis=1).mean()), 3),
+            "partyHpLostFraction": round(float(party_hp_lost.mean()), 4)
+        }
@@ -0,0 +1,144 @@
+import json
+import math
+import os
+from bisect import bisect_right
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, List, Mapping, Optional, Sequence, Tuple
+
+from services.combat_simulator import CombatSimulator
+
+DEFAULT_SURFACE_PATH = Path(__file__).parent.parent / "data" / "cr_surface.json"
+
+
+class OutsideTolerance(Exception):
+    """A monster's effective challenge rating is too far from its label"""
+
+    def __init__(self, label: str, effective: str):
+        super().__init__(f"Challenge rating {label} is effectively {effective}")
+        self.label = label
+        self.effective = effective
+
+
+class CalibrationExhausted(Exception):
+    """Reject-mode calibration found no monster within tolerance of its label"""
+
+    def __init__(self, label: str, effective: str, attempts: int):
+        super().__init__(
+            f"No challenge rating {label} monster within tolerance after {attempts} attempts "
+            f"(the last was effectively {effective})"
+        )
+        self.label = label
+        self.effective = effective
+        self.attempts = attempts
+
+
+class CRSurface:
+    """Effective challenge rating by AC, HP, damage per round and ability count.
+
+    The surface is built offline by ``tools/build_cr_surface.py`` from batch
+    combat simulations and stored as JSON: one list of bucket lower bounds per
+    axis and a nested [ac][hp][damage][abilities] grid of fractional indexes
+    into ``challengeRatings``. Looking a monster up is four bisections and a
+    flat tuple index, so calibration never simulates on the request path.
+    """
+
+    AXES = ("ac", "hp", "damagePerRound", "abilities")
+
+    def __init__(self, surface: Mapping[str, Any]):
+        self.challenge_ratings: Tuple[str, ...] = tuple(surface["challengeRatings"])
+        self.bins: Tuple[Tuple[float, ...], ...] = tuple(tuple(surface["axes"][axis]["bins"]) for axis in self.AXES)
+        self.shape = tuple(len(bins) for bins in self.bins)
+
+        values: List[float] = []
+        self._flatten(surface["effectiveCr"], 0, values)
+        size = math.prod(self.shape)
+        if len(values) != size:
+            raise ValueError(f"CR surface grid has {len(values)} cells, expected {size}")
+        self.values = tuple(values)
+        self.strides = tuple(math.prod(self.shape[axis + 1:]) for axis in range(len(self.shape)))
+        self.index = {label: position for position, label in enumerate(self.challenge_ratings)}
+
+    def _flatten(self, grid: Sequence[Any], depth: int, out: List[float]) -> None:
+        if len(grid) != len(self.bins[depth]):
+            raise ValueError(f"CR surface axis {self.AXES[depth]} has {len(grid)} rows, expected {len(self.bins[depth])}")
+        for row in grid:
+            if depth == len(self.bins) - 1:
+                out.append(float(row))
+            else:
+                self._flatten(row, depth + 1, out)
+
+    @classmethod
+    def load(cls, path: Path) -> "CRSurface":
+        return cls(json.loads(Path(path).read_text(encoding="utf-8")))
+
+    @staticmethod
+    def bucket(bins: Sequence[float], value: float) -> int:
+        """Bucket whose lower bound is the largest not above value (the first below all bounds)"""
+        return max(0, bisect_right(bins, value) - 1)
+
+    def effective_index(self, ac: int, hp: int, damage_per_round: float, abilities: int) -> float:
+        """Fractional position in challengeRatings for a stat block"""
+        position = 0
+        for bins, stride, value in zip(self.bins, self.strides, (ac, hp, damage_per_round, abilities)):
+            position += self.bucket(bins, value) * stride
+        return self.values[position]
+
+    def label(self, index: float) -> str:
+        return self.challenge_ratings[min(len(self.challenge_ratings) - 1, max(0, int(index + 0.5)))]
+
+    def effective_cr(self, monster_data: Mapping[str, Any]) -> Tuple[float, str]:
+        """Effective (index, label) for monster data with stats and specialAbilities"""
+        index = self.effective_index(
+            monster_data["ac"], monster_data["hp"],
+            damage_per_round(monster_data["attacks"], monster_data["damage"]),
+            len(monster_data["specialAbilities"])
+        )
+        return index, self.label(index)
+
+    def calibrate(self, monster_data: Mapping[str, Any], tolerance: float, relabel: bool) -> str:
+        """The label to use: the current one within tolerance, else the effective one (or OutsideTolerance)"""
+        label = monster_data["challengeRating"]
+        index, effective = self.effective_cr(monster_data)
+        current = self.index.get(label)
+        if current is not None and abs(index - current) <= tolerance:
+            return label
+        if not relabel:
+            raise OutsideTolerance(label, effective)
+        return effective
+
+
+class CRCalibration:
+    """Calibration settings from customRules["crCalibration"] and ["crTolerance"]"""
+
+    MODES = ("relabel", "reject")
+    DEFAULT_TOLERANCE = 1.0
+    # Attempts per monster in reject mode before giving up with CalibrationExhausted
+    MAX_ATTEMPTS = 20
+
+    @staticmethod
+    def from_rules(rules: Optional[Mapping[str, Any]]) -> Optional[Tuple[str, float]]:
+        """(mode, tolerance in CR steps), or None when calibration is off"""
+        rules = rules or {}
+        mode = rules.get("crCalibration")
+        if not mode:
+            return None
+        if mode not in CRCalibration.MODES:
+            raise ValueError(f"crCalibration must be one of {', '.join(CRCalibration.MODES)}")
+        tolerance = float(rules.get("crTolerance", CRCalibration.DEFAULT_TOLERANCE))
+        if tolerance < 0:
+            raise ValueError("crTolerance must not be negative")
+        return mode, tolerance
+
+
+@lru_cache(maxsize=512)
+def damage_per_round(attacks: str, damage: str) -> float:
+    """Expected damage of one round in which every attack hits"""
+    return sum(count * (sides + 1) / 2 + bonus for count, sides, bonus in CombatSimulator.attack_dice(attacks, damage))
+
+
+@lru_cache(maxsize=1)
+def cr_surface() -> CRSurface:
+    """The surface at CR_SURFACE_PATH (backend/data/cr_surface.json by default), loaded once"""
+    return CRSurface.load(Path(os.environ.get('CR_SURFACE_PATH', str(DEFAULT_SURFACE_PATH))))
+
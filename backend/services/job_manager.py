@@ -0,0 +1,252 @@
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from models.monster import AdvancedGenerationRequest, GenerationJob
+from services.advanced_generator import AdvancedMonsterGenerator
+from services.metrics import JOBS_FINISHED, JOBS_RUNNING
+
+logger = logging.getLogger(__name__)
+
+
+class JobManager:
+    """Runs large generation jobs on a bounded asyncio worker pool.
+
+    Job state lives in `generation_jobs` and generated monsters in
+    `generation_job_results` (one document per monster, keyed by jobId and
+    jobIndex), so progress survives restarts and continues from the last
+    committed chunk.
+
+    Several processes may share the collections. A running job is owned by
+    one process (`workerId`) for as long as its lease (`leaseExpiresAt`) is
+    renewed by a heartbeat; only jobs left queued or whose lease has run out
+    are picked up by others, on start and then periodically. Cancellation is
+    read back from the job document between chunks, so it reaches whichever
+    process runs the job.
+    """
+
+    ACTIVE_STATUSES = ("queued", "running")
+
+    def __init__(self, workers: int, chunk_size: int, max_count: int, lease_seconds: float = 60.0):
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.max_count = max_count
+        self.lease = timedelta(seconds=lease_seconds)
+        self.worker_id: Optional[str] = None
+        self.db = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+    @classmethod
+    def from_env(cls) -> "JobManager":
+        return cls(
+            workers=int(os.environ.get('GENERATION_JOB_WORKERS', '2')),
+            chunk_size=int(os.environ.get('GENERATION_JOB_CHUNK_SIZE', '500')),
+            max_count=int(os.environ.get('MAX_GENERATION_JOB_COUNT', '1000000')),
+            lease_seconds=float(os.environ.get('GENERATION_JOB_LEASE_SECONDS', '60'))
+        )
+
+    async def start(self, db) -> None:
+        """Start the worker pool and pick up jobs no live process owns"""
+        self.db = db
+        # Set after fork, so every server process gets its own id
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._queue = asyncio.Queue()
+        await db.generation_jobs.create_index("id", unique=True)
+        await db.generation_jobs.create_index([("status", 1), ("leaseExpiresAt", 1)])
+        await db.generation_job_results.create_index([("jobId", 1), ("jobIndex", 1)])
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+        resumed = await self._recover(stale_before=None)
+        if resumed:
+            logger.info(f"Resuming {resumed} generation jobs")
+        self._tasks.append(asyncio.create_task(self._recover_periodically()))
+
+    def _orphaned_query(self, stale_before: Optional[datetime]) -> Dict[str, Any]:
+        """Jobs no live process is working on: expired leases, and queued jobs
+        (all of them on start, otherwise those left waiting longer than a lease)"""
+        queued: Dict[str, Any] = {"status": "queued"}
+        if stale_before is not None:
+            queued["updatedAt"] = {"$lt": stale_before}
+        return {"$or": [queued, {"status": "running", **self._lease_expired(datetime.utcnow())}]}
+
+    @staticmethod
+    def _lease_expired(now: datetime) -> Dict[str, Any]:
+        # Jobs left running before leases existed have none
+        return {"$or": [{"leaseExpiresAt": {"$lt": now}}, {"leaseExpiresAt": None}]}
+
+    async def _recover(self, stale_before: Optional[datetime]) -> int:
+        orphaned = await self.db.generation_jobs.find(
+            self._orphaned_query(stale_before), {"id": 1}
+        ).sort("createdAt", 1).to_list(None)
+        # Claiming is atomic, so a job queued here and elsewhere still runs once
+        for job in orphaned:
+            self._queue.put_nowait(job["id"])
+        return len(orphaned)
+
+    async def _recover_periodically(self) -> None:
+        interval = self.lease.total_seconds()
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                resumed = await self._recover(stale_before=datetime.utcnow() - self.lease)
+                if resumed:
+                    logger.info(f"Picked up {resumed} orphaned generation jobs")
+            except Exception as e:
+                logger.error(f"Generation job recovery failed: {str(e)}")
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(self, request: AdvancedGenerationRequest) -> GenerationJob:
+        """Persist a new job and queue it for the workers"""
+        if not 1 <= request.filters.count <= self.max_count:
+            raise ValueError(f"count must be between 1 and {self.max_count}")
+        AdvancedMonsterGenerator.validate_rules(request)
+        job = GenerationJob(request=request, total=request.filters.count)
+        await self.db.generation_jobs.insert_one(job.dict())
+        self._queue.put_nowait(job.id)
+        return job
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await self.db.generation_jobs.find_one({"id": job_id}, {"_id": 0})
+
+    async def list(self, status: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        query = {"status": status} if status else {}
+        return await self.db.generation_jobs.find(query, {"_id": 0, "request": 0}).sort("createdAt", -1).to_list(limit)
+
+    async def results(self, job_id: str, page: int, page_size: int) -> List[Dict[str, Any]]:
+        """Fetch one page of a job's monsters in generation order"""
+        start = (page - 1) * page_size
+        return await self.db.generation_job_results.find(
+            {"jobId": job_id, "jobIndex": {"$gte": start, "$lt": start + page_size}},
+            {"_id": 0, "jobId": 0, "jobIndex": 0}
+        ).sort("jobIndex", 1).to_list(page_size)
+
+    async def cancel(self, job_id: str) -> bool:
+        """Cancel a queued or running job; returns False if it already finished"""
+        result = await self.db.generation_jobs.update_one(
+            {"id": job_id, "status": {"$in": list(self.ACTIVE_STATUSES)}},
+            {"$set": {"status": "cancelled", "updatedAt": datetime.utcnow(), "finishedAt": datetime.utcnow()}}
+        )
+        if result.modified_count:
+            # The owning process sees the status between chunks and stops
+            JOBS_FINISHED.labels("cancelled").inc()
+            return True
+        return False
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Generation job {job_id} failed: {str(e)}")
+                await self._finish(job_id, "failed", error=str(e))
+            finally:
+                self._queue.task_done()
+
+    async def _claim(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Take ownership of a queued or lease-expired job; None if another process has it"""
+        job = await self.db.generation_jobs.find_one({"id": job_id})
+        if not job or job["status"] not in self.ACTIVE_STATUSES:
+            return None
+        now = datetime.utcnow()
+        owner_filter = {"status": "queued"} if job["status"] == "queued" else {
+            "status": "running", "workerId": job.get("workerId"), **self._lease_expired(now)
+        }
+        claimed = await self.db.generation_jobs.update_one(
+            {"id": job_id, **owner_filter},
+            {"$set": {
+                "status": "running", "workerId": self.worker_id, "leaseExpiresAt": now + self.lease,
+                "startedAt": job.get("startedAt") or now, "updatedAt": now
+            }}
+        )
+        return job if claimed.modified_count else None
+
+    async def _heartbeat(self, job_id: str) -> None:
+        """Renew the lease while the job runs"""
+        while True:
+            await asyncio.sleep(self.lease.total_seconds() / 3)
+            try:
+                await self.db.generation_jobs.update_one(
+                    {"id": job_id, "status": "running", "workerId": self.worker_id},
+                    {"$set": {"leaseExpiresAt": datetime.utcnow() + self.lease}}
+                )
+            except Exception as e:
+                logger.error(f"Lease renewal for generation job {job_id} failed: {str(e)}")
+
+    async def _still_owned(self, job_id: str) -> bool:
+        job = await self.db.generation_jobs.find_one({"id": job_id}, {"status": 1, "workerId": 1})
+        return bool(job) and job["status"] == "running" and job.get("workerId") == self.worker_id
+
+    async def _run(self, job_id: str) -> None:
+        job = await self._claim(job_id)
+        if job is None:
+            return
+        request = AdvancedGenerationRequest(**job["request"])
+        completed = job["completed"]
+
+        # Drop any results written after the last recorded progress (interrupted chunk)
+        await self.db.generation_job_results.delete_many({"jobId": job_id, "jobIndex": {"$gte": completed}})
+
+        # One name batch for the whole job; a resumed job skips the names it already issued
+        names = AdvancedMonsterGenerator.name_batch(request)
+        if names is not None and completed:
+            async for result in self.db.generation_job_results.find({"jobId": job_id}, {"_id": 0, "name": 1}).batch_size(5000):
+                names.reserve((result["name"],))
+
+        JOBS_RUNNING.inc()
+        heartbeat = asyncio.create_task(self._heartbeat(job_id))
+        try:
+            while completed < job["total"]:
+                # Cancelled (from any process) or lease lost to another process
+                if not await self._still_owned(job_id):
+                    logger.info(f"Generation job {job_id} stopped at {completed}/{job['total']}")
+                    return
+                chunk_request = request.copy(deep=True)
+                chunk_request.filters.count = min(self.chunk_size, job["total"] - completed)
+                monsters = await asyncio.to_thread(AdvancedMonsterGenerator.generate_monsters, chunk_request, names)
+
+                documents = []
+                for offset, monster in enumerate(monsters):
+                    document = monster.dict()
+                    document["jobId"] = job_id
+                    document["jobIndex"] = completed + offset
+                    documents.append(document)
+                await self.db.generation_job_results.insert_many(documents)
+
+                completed += len(monsters)
+                await self.db.generation_jobs.update_one(
+                    {"id": job_id, "status": "running", "workerId": self.worker_id},
+                    {"$set": {"completed": completed, "updatedAt": datetime.utcnow()}}
+                )
+        finally:
+            heartbeat.cancel()
+            JOBS_RUNNING.dec()
+
+        await self._finish(job_id, "completed")
+        logger.info(f"Generation job {job_id} completed {completed} monsters")
+
+    async def _finish(self, job_id: str, status: str, error: Optional[str] = None) -> None:
+        update = {"status": status, "updatedAt": datetime.utcnow(), "finishedAt": datetime.utcnow(), "leaseExpiresAt": None}
+        if error:
+            update["error"] = error
+        # Only the owner finishes a job; a cancelled or reassigned job is left alone
+        result = await self.db.generation_jobs.update_one(
+            {"id": job_id, "status": "running", "workerId": self.worker_id}, {"$set": update}
+        )
+        if result.modified_count:
+            JOBS_FINISHED.labels(status).inc()
+
+
+job_manager = JobManager.from_env()
@@ -1,6 +1,8 @@
 import random
-from typing import List, Dict
-from models.monster import LairInfo
+from functools import lru_cache
+from typing import Iterable, List, Dict, Mapping, Optional, Sequence, Tuple
+from models.monster import LairInfo, Monster
+from services.abilities import AbilityRegistry
 
 class LairGenerator:
     
@@ -73,15 +75,82 @@ class LairGenerator:
         'genius': ["Masterful architecture", "Layered security", "Backup plans", "Psychological warfare"]
     }
 
+    # Ability-specific lair features and defenses
+    ABILITY_FEATURES = {
+        'Web': ["Sticky web strands", "Web-wrapped prey"],
+        'Flight': ["High perches", "Aerial approach routes"],
+        'Burrow': ["Underground tunnels", "Hidden entrances"],
+        'Swim': ["Flooded chambers", "Underwater passages"],
+        'Invisible': ["Misleading empty spaces", "Hidden alcoves"],
+        'Regeneration': ["Healing chambers", "Recovery areas"],
+        'Poison': ["Toxic pools", "Venomous plants"],
+        'Fire immunity': ["Lava flows", "Charred surfaces"],
+        'Cold immunity': ["Frozen chambers", "Ice formations"]
+    }
+    
+    ABILITY_DEFENSES = {
+        'Web': ["Web barriers", "Entangling traps"],
+        'Poison': ["Poisoned spikes", "Toxic gas vents"],
+        'Magic resistance': ["Anti-magic zones", "Spell-turning wards"],
+        'Charm': ["Charmed guardians", "Mental compulsions"],
+        'Fear aura': ["Intimidating displays", "Terror triggers"],
+        'Invisible': ["False walls", "Hidden passages"],
+        'Teleport': ["Escape portals", "Dimensional rifts"]
+    }
+    
+    # The same tables keyed by ability id, with a mask of the abilities they cover
+    FEATURES_BY_ID = {AbilityRegistry.IDS[ability]: items for ability, items in ABILITY_FEATURES.items()}
+    DEFENSES_BY_ID = {AbilityRegistry.IDS[ability]: items for ability, items in ABILITY_DEFENSES.items()}
+    FEATURE_ABILITY_MASK = AbilityRegistry.to_mask(ABILITY_FEATURES)
+    DEFENSE_ABILITY_MASK = AbilityRegistry.to_mask(ABILITY_DEFENSES)
+
+    TYPE_FEATURES = {
+        'dragon': ["Treasure chamber", "Royal throne", "Scrying pool"],
+        'undead': ["Burial chambers", "Bone decorations", "Unholy altars"],
+        'beast': ["Feeding areas", "Territory markers", "Sleeping dens"],
+        'giant': ["Oversized furniture", "Trophy displays", "Weapon racks"],
+        'fey': ["Fairy rings", "Glamered illusions", "Nature shrines"]
+    }
+
+    CR_TO_SIZE = {
+        '0': 'tiny',
+        '1': 'small',
+        '2': 'small',
+        '3': 'medium',
+        '4': 'medium',
+        '5': 'large',
+        '6+': 'huge'
+    }
+
+    INTELLIGENCE_BY_TYPE = {
+        'beast': 'animal',
+        'undead': 'low',
+        'construct': 'low',
+        'humanoid': 'average',
+        'giant': 'average',
+        'fey': 'high',
+        'fiend': 'high',
+        'dragon': 'genius',
+        'aberration': 'high',
+        'elemental': 'average'
+    }
+
     @staticmethod
-    def generate_lair(monster_type: str, environment: str, challenge_rating: str, special_abilities: List[str]) -> LairInfo:
+    def generate_lair(monster_type: str, environment: str, challenge_rating: str, special_abilities: List[str],
+                      ability_mask: Optional[int] = None,
+                      terrain_descriptions: Optional[Mapping[str, Mapping]] = None,
+                      rng: Optional[random.Random] = None) -> LairInfo:
         """Generate a complete lair description"""
+        if ability_mask is None:
+            ability_mask = AbilityRegistry.to_mask(special_abilities)
+        rng = rng or random
         
         # Determine lair size based on challenge rating
         size = LairGenerator._determine_lair_size(challenge_rating)
         
         # Get terrain-specific information
-        terrain_info = LairGenerator.TERRAIN_DESCRIPTIONS.get(environment, LairGenerator.TERRAIN_DESCRIPTIONS['dungeon'])
+        terrain_descriptions = terrain_descriptions or LairGenerator.TERRAIN_DESCRIPTIONS
+        terrain_info = terrain_descriptions.get(environment) or terrain_descriptions['dungeon']
         
         # Generate base description
         base_description = terrain_info['base']
@@ -90,10 +159,10 @@ class LairGenerator:
         size_description = LairGenerator.LAIR_SIZES[size]
         
         # Generate additional features based on monster type and abilities
-        features = LairGenerator._generate_features(monster_type, special_abilities, terrain_info['features'])
+        features = LairGenerator._generate_features(monster_type, ability_mask, terrain_info['features'], rng)
         
         # Generate defenses based on intelligence and abilities
-        defenses = LairGenerator._generate_defenses(monster_type, special_abilities, terrain_info['defenses'])
+        defenses = LairGenerator._generate_defenses(monster_type, ability_mask, terrain_info['defenses'], rng)
         
         # Combine into full description
         full_description = f"{base_description}. {size_description}."
@@ -108,102 +177,66 @@ class LairGenerator:
             features=features
         )
 
+    @staticmethod
+    def generate_lairs(monsters: Iterable[Monster], terrain_descriptions: Optional[Mapping[str, Mapping]] = None,
+                       rng: Optional[random.Random] = None) -> List[LairInfo]:
+        """Generate lairs for many monsters, in the order given.
+
+        Monsters sharing a type and ability set share one memoized candidate
+        set; with a seeded `rng` the result is reproducible.
+        """
+        return [
+            LairGenerator.generate_lair(
+                monster.type, monster.environment, monster.challengeRating, monster.specialAbilities,
+                monster.abilityMask, terrain_descriptions, rng
+            )
+            for monster in monsters
+        ]
+
     @staticmethod
     def _determine_lair_size(challenge_rating: str) -> str:
         """Determine lair size based on challenge rating"""
-        cr_to_size = {
-            '0': 'tiny',
-            '1': 'small',
-            '2': 'small', 
-            '3': 'medium',
-            '4': 'medium',
-            '5': 'large',
-            '6+': 'huge'
-        }
-        return cr_to_size.get(challenge_rating, 'medium')
+        return LairGenerator.CR_TO_SIZE.get(challenge_rating, 'medium')
 
     @staticmethod
-    def _generate_features(monster_type: str, special_abilities: List[str], terrain_features: List[str]) -> List[str]:
-        """Generate lair features based on monster characteristics"""
+    @lru_cache(maxsize=1024)
+    def _feature_candidates(monster_type: str, ability_mask: int) -> Tuple[str, ...]:
+        """Ability and type features for a monster, deduplicated in table order"""
         features = []
-        
-        # Add terrain-specific features
-        features.extend(random.sample(terrain_features, min(3, len(terrain_features))))
-        
-        # Add ability-specific features
-        ability_features = {
-            'Web': ["Sticky web strands", "Web-wrapped prey"],
-            'Flight': ["High perches", "Aerial approach routes"],
-            'Burrow': ["Underground tunnels", "Hidden entrances"],
-            'Swim': ["Flooded chambers", "Underwater passages"],
-            'Invisible': ["Misleading empty spaces", "Hidden alcoves"],
-            'Regeneration': ["Healing chambers", "Recovery areas"],
-            'Poison': ["Toxic pools", "Venomous plants"],
-            'Fire immunity': ["Lava flows", "Charred surfaces"],
-            'Cold immunity': ["Frozen chambers", "Ice formations"]
-        }
-        
-        for ability in special_abilities:
-            if ability in ability_features:
-                features.extend(ability_features[ability])
-        
-        # Add type-specific features
-        type_features = {
-            'dragon': ["Treasure chamber", "Royal throne", "Scrying pool"],
-            'undead': ["Burial chambers", "Bone decorations", "Unholy altars"],
-            'beast': ["Feeding areas", "Territory markers", "Sleeping dens"],
-            'giant': ["Oversized furniture", "Trophy displays", "Weapon racks"],
-            'fey': ["Fairy rings", "Glamered illusions", "Nature shrines"]
-        }
-        
-        if monster_type in type_features:
-            features.extend(type_features[monster_type])
-        
-        return list(set(features))  # Remove duplicates
+        for ability_id in AbilityRegistry.iter_ids(ability_mask):
+            features.extend(LairGenerator.FEATURES_BY_ID[ability_id])
+        features.extend(LairGenerator.TYPE_FEATURES.get(monster_type, ()))
+        return tuple(dict.fromkeys(features))
 
     @staticmethod
-    def _generate_defenses(monster_type: str, special_abilities: List[str], terrain_defenses: List[str]) -> List[str]:
-        """Generate lair defenses based on monster intelligence and abilities"""
+    @lru_cache(maxsize=1024)
+    def _defense_candidates(monster_type: str, ability_mask: int) -> Tuple[str, ...]:
+        """Ability and intelligence defenses for a monster, deduplicated in table order"""
         defenses = []
-        
-        # Add terrain-specific defenses
-        defenses.extend(random.sample(terrain_defenses, min(2, len(terrain_defenses))))
-        
-        # Add ability-based defenses
-        ability_defenses = {
-            'Web': ["Web barriers", "Entangling traps"],
-            'Poison': ["Poisoned spikes", "Toxic gas vents"],
-            'Magic resistance': ["Anti-magic zones", "Spell-turning wards"],
-            'Charm': ["Charmed guardians", "Mental compulsions"],
-            'Fear aura': ["Intimidating displays", "Terror triggers"],
-            'Invisible': ["False walls", "Hidden passages"],
-            'Teleport': ["Escape portals", "Dimensional rifts"]
-        }
-        
-        for ability in special_abilities:
-            if ability in ability_defenses:
-                defenses.extend(ability_defenses[ability])
-        
-        # Add intelligence-based defenses
+        for ability_id in AbilityRegistry.iter_ids(ability_mask):
+            defenses.extend(LairGenerator.DEFENSES_BY_ID[ability_id])
         intelligence_level = LairGenerator._determine_intelligence(monster_type)
-        if intelligence_level in LairGenerator.INTELLIGENCE_BASED_FEATURES:
-            defenses.extend(LairGenerator.INTELLIGENCE_BASED_FEATURES[intelligence_level])
-        
-        return list(set(defenses))  # Remove duplicates
+        defenses.extend(LairGenerator.INTELLIGENCE_BASED_FEATURES.get(intelligence_level, ()))
+        return tuple(dict.fromkeys(defenses))
+
+    @staticmethod
+    def _generate_features(monster_type: str, ability_mask: int, terrain_features: Sequence[str],
+                           rng: Optional[random.Random] = None) -> List[str]:
+        """Generate lair features based on monster characteristics"""
+        # Terrain features are drawn fresh; ability and type features come from the memoized set
+        sampled = (rng or random).sample(terrain_features, min(3, len(terrain_features)))
+        candidates = LairGenerator._feature_candidates(monster_type, ability_mask & LairGenerator.FEATURE_ABILITY_MASK)
+        return list(dict.fromkeys([*sampled, *candidates]))
+
+    @staticmethod
+    def _generate_defenses(monster_type: str, ability_mask: int, terrain_defenses: Sequence[str],
+                           rng: Optional[random.Random] = None) -> List[str]:
+        """Generate lair defenses based on monster intelligence and abilities"""
+        sampled = (rng or random).sample(terrain_defenses, min(2, len(terrain_defenses)))
+        candidates = LairGenerator._defense_candidates(monster_type, ability_mask & LairGenerator.DEFENSE_ABILITY_MASK)
+        return list(dict.fromkeys([*sampled, *candidates]))
 
     @staticmethod
     def _determine_intelligence(monster_type: str) -> str:
         """Determine approximate intelligence level from monster type"""
-        intelligence_map = {
-            'beast': 'animal',
-            'undead': 'low',
-            'construct': 'low',
-            'humanoid': 'average',
-            'giant': 'average',
-            'fey': 'high',
-            'fiend': 'high',
-            'dragon': 'genius',
-            'aberration': 'high',
-            'elemental': 'average'
-        }
-        return intelligence_map.get(monster_type, 'average')
\ No newline at end of file
+        return LairGenerator.INTELLIGENCE_BY_TYPE.get(monster_type, 'average')
@@ -0,0 +1,252 @@
+import asyncio
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from pymongo import monitoring
+
+# Default latency buckets in seconds (sub-millisecond up to 10s)
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(labelnames: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """Base class for in-process metrics with optional labels"""
+
+    metric_type = "untyped"
+    # Appended to the name in HELP/TYPE so they name the family the samples belong to
+    family_suffix = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], "_Metric"] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str, **kwargs: str):
+        """Get (or create) the child metric for a label combination"""
+        if kwargs:
+            values = tuple(str(kwargs[name]) for name in self.labelnames)
+        else:
+            values = tuple(str(value) for value in values)
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.get(values)
+                if child is None:
+                    child = self._new_child()
+                    self._children[values] = child
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _samples(self) -> List[Tuple[Tuple[str, ...], "_Metric"]]:
+        if not self.labelnames:
+            return [((), self)]
+        return sorted(self._children.items())
+
+    def render(self) -> List[str]:
+        family = self.name + self.family_suffix
+        lines = [f"# HELP {family} {self.documentation}", f"# TYPE {family} {self.metric_type}"]
+        for values, child in self._samples():
+            lines.extend(child._render_child(self.name, self.labelnames, values))
+        return lines
+
+
+class Counter(_Metric):
+    """Monotonically increasing counter"""
+
+    metric_type = "counter"
+    family_suffix = "_total"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._value = 0.0
+
+    def _new_child(self):
+        return Counter(self.name, self.documentation)
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value += amount
+
+    def _render_child(self, name: str, labelnames, values) -> List[str]:
+        return [f"{name}_total{_format_labels(labelnames, values)} {_format_value(self._value)}"]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down"""
+
+    metric_type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._value = 0.0
+
+    def _new_child(self):
+        return Gauge(self.name, self.documentation)
+
+    def set(self, value: float) -> None:
+        self._value = value
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.inc(-amount)
+
+    def _render_child(self, name: str, labelnames, values) -> List[str]:
+        return [f"{name}{_format_labels(labelnames, values)} {_format_value(self._value)}"]
+
+
+class Histogram(_Metric):
+    """Cumulative histogram with fixed bucket boundaries"""
+
+    metric_type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+
+    def _new_child(self):
+        return Histogram(self.name, self.documentation, buckets=self.buckets)
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    @contextmanager
+    def time(self):
+        """Observe the wall-clock duration of the wrapped block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def _render_child(self, name: str, labelnames, values) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self._counts):
+            cumulative += count
+            le = ("le", _format_value(bound))
+            lines.append(f"{name}_bucket{_format_labels(labelnames, values, le)} {cumulative}")
+        lines.append(f"{name}_sum{_format_labels(labelnames, values)} {_format_value(self._sum)}")
+        lines.append(f"{name}_count{_format_labels(labelnames, values)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered in the Prometheus text exposition format"""
+
+    CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUESTS = REGISTRY.register(Counter(
+    "http_requests", "Total HTTP requests by method, route and status", ["method", "route", "status"]
+))
+HTTP_REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency by method and route", ["method", "route"]
+))
+GENERATION_STAGE_SECONDS = REGISTRY.register(Histogram(
+    "generation_stage_duration_seconds", "Time spent in each monster generation stage", ["stage"]
+))
+MONSTERS_GENERATED = REGISTRY.register(Counter(
+    "monsters_generated", "Monsters generated by algorithm and complexity", ["algorithm", "complexity"]
+))
+CR_CALIBRATION_REJECTIONS = REGISTRY.register(Counter(
+    "cr_calibration_rejections", "Generated monsters discarded for a challenge rating outside tolerance"
+))
+MONGO_OPERATION_SECONDS = REGISTRY.register(Histogram(
+    "mongo_operation_duration_seconds", "MongoDB command latency by command and outcome", ["command", "outcome"]
+))
+ADMISSION_REJECTIONS = REGISTRY.register(Counter(
+    "generation_admission_rejections", "Generation requests rejected by admission control", ["reason"]
+))
+ACTIVE_GENERATIONS = REGISTRY.register(Gauge(
+    "generation_active_jobs", "Generation requests currently holding a concurrency slot"
+))
+JOBS_FINISHED = REGISTRY.register(Counter(
+    "generation_jobs_finished", "Background generation jobs by final status", ["status"]
+))
+JOBS_RUNNING = REGISTRY.register(Gauge(
+    "generation_jobs_running", "Background generation jobs currently running"
+))
+EVENT_LOOP_LAG_SECONDS = REGISTRY.register(Histogram(
+    "event_loop_lag_seconds", "Observed event loop scheduling delay",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+))
+EVENT_LOOP_LAG_CURRENT = REGISTRY.register(Gauge(
+    "event_loop_lag_current_seconds", "Most recent event loop scheduling delay"
+))
+
+
+def stage_timer(stage: str):
+    """Time a generation stage, e.g. `with stage_timer("lair"): ...`"""
+    return GENERATION_STAGE_SECONDS.labels(stage).time()
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """PyMongo command listener recording per-command latency"""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        MONGO_OPERATION_SECONDS.labels(event.command_name, "success").observe(event.duration_micros / 1_000_000)
+
+    def failed(self, event):
+        MONGO_OPERATION_SECONDS.labels(event.command_name, "failure").observe(event.duration_micros / 1_000_000)
+
+
+async def monitor_event_loop_lag(interval: float = 0.5) -> None:
+    """Measure how late the event loop wakes up from a fixed sleep"""
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        lag = max(0.0, loop.time() - start - interval)
+        EVENT_LOOP_LAG_SECONDS.observe(lag)
+        EVENT_LOOP_LAG_CURRENT.set(lag)
@@ -0,0 +1,63 @@
+import json
+from typing import Any, Dict, List, Mapping, Optional
+
+# One column per scalar field; nested fields use dotted names
+CSV_COLUMNS = (
+    "id", "name", "type", "challengeRating", "environment", "description",
+    "stats.ac", "stats.hd", "stats.hp", "stats.movement", "stats.attacks", "stats.damage",
+    "stats.save", "stats.morale", "stats.xp",
+    "specialAbilities", "abilityMask",
+    "encounters.numberAppearing", "encounters.wildEncounter", "encounters.lairChance",
+    "treasure.individual", "treasure.lair", "treasure.coins", "treasure.gems", "treasure.magicItems",
+    "lair.description", "lair.terrain", "lair.size", "lair.defenses", "lair.features",
+    "createdBy", "createdAt", "isTemplate", "source"
+)
+# List cells hold their items joined by this separator
+LIST_COLUMNS = frozenset({"specialAbilities", "treasure.gems", "treasure.magicItems", "lair.defenses", "lair.features"})
+LIST_SEPARATOR = "; "
+# Mapping cells hold JSON
+JSON_COLUMNS = frozenset({"treasure.coins"})
+
+
+def flatten(monster: Mapping[str, Any], columns=CSV_COLUMNS) -> List[str]:
+    """CSV cells for a monster document, in column order"""
+    cells = []
+    for column in columns:
+        value: Any = monster
+        for key in column.split("."):
+            value = value.get(key) if isinstance(value, Mapping) else None
+            if value is None:
+                break
+        if value is None:
+            cells.append("")
+        elif column in LIST_COLUMNS:
+            cells.append(LIST_SEPARATOR.join(str(item) for item in value))
+        elif column in JSON_COLUMNS:
+            cells.append(json.dumps(value, separators=(",", ":")))
+        elif isinstance(value, bool):
+            cells.append("true" if value else "false")
+        elif hasattr(value, "isoformat"):
+            cells.append(value.isoformat())
+        else:
+            cells.append(str(value))
+    return cells
+
+
+def unflatten(row: Mapping[str, Optional[str]]) -> Dict[str, Any]:
+    """Nested monster data from a CSV row keyed by column; empty cells are left out"""
+    monster: Dict[str, Any] = {}
+    for column, cell in row.items():
+        if column is None or cell is None or cell == "":
+            continue
+        if column in LIST_COLUMNS:
+            value: Any = [item.strip() for item in cell.split(LIST_SEPARATOR.strip()) if item.strip()]
+        elif column in JSON_COLUMNS:
+            value = json.loads(cell)
+        else:
+            value = cell
+        target = monster
+        *parents, key = column.split(".")
+        for parent in parents:
+            target = target.setdefault(parent, {})
+        target[key] = value
+    return monster
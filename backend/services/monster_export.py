@@ -0,0 +1,124 @@
+import csv
+import io
+import json
+import os
+import zlib
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, Optional
+
+from services.monster_csv import CSV_COLUMNS, flatten
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+class MonsterExporter:
+    """Streams monster documents from a cursor as JSONL, gzipped JSONL or CSV.
+
+    Documents are read in cursor batches of EXPORT_BATCH_SIZE (default 1000)
+    and encoded into output chunks of about CHUNK_BYTES, so memory use is
+    bounded by one batch and one chunk however many documents are exported.
+    CSV uses the same columns as the bulk importer, so exports re-import as-is.
+    """
+
+    FORMATS = {
+        "jsonl": ("application/x-ndjson", "jsonl"),
+        "jsonl.gz": ("application/gzip", "jsonl.gz"),
+        "csv": ("text/csv; charset=utf-8", "csv")
+    }
+    CHUNK_BYTES = 64 * 1024
+    BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', '1000'))
+    PROJECTION = {"_id": 0}
+
+    @staticmethod
+    async def ensure_indexes(db) -> None:
+        """Index the generation history on createdAt for time-range exports"""
+        await db.generated_monsters.create_index([("createdAt", 1)])
+
+    @staticmethod
+    def validate(fmt: str) -> None:
+        if fmt not in MonsterExporter.FORMATS:
+            raise ValueError(f"format must be one of {', '.join(MonsterExporter.FORMATS)}")
+
+    @staticmethod
+    def media_type(fmt: str) -> str:
+        return MonsterExporter.FORMATS[fmt][0]
+
+    @staticmethod
+    def headers(fmt: str, name: str) -> Dict[str, str]:
+        return {"Content-Disposition": f'attachment; filename="{name}.{MonsterExporter.FORMATS[fmt][1]}"'}
+
+    @staticmethod
+    def saved_query(monster_type: str = "any", challenge_rating: str = "any", environment: str = "any") -> Dict[str, Any]:
+        return {
+            field: value
+            for field, value in (("type", monster_type), ("challengeRating", challenge_rating), ("environment", environment))
+            if value and value != "any"
+        }
+
+    @staticmethod
+    def history_query(start: Optional[datetime], end: Optional[datetime]) -> Dict[str, Any]:
+        """Generated monsters created in [start, end); timestamps are stored as naive UTC"""
+        if start and end and MonsterExporter._utc(start) >= MonsterExporter._utc(end):
+            raise ValueError("from must be before to")
+        created: Dict[str, Any] = {}
+        if start:
+            created["$gte"] = MonsterExporter._utc(start)
+        if end:
+            created["$lt"] = MonsterExporter._utc(end)
+        return {"createdAt": created} if created else {}
+
+    @staticmethod
+    def _utc(value: datetime) -> datetime:
+        if value.tzinfo is None:
+            return value
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+    @staticmethod
+    def cursor(collection, query: Dict[str, Any]):
+        return collection.find(query, MonsterExporter.PROJECTION).batch_size(MonsterExporter.BATCH_SIZE)
+
+    @staticmethod
+    async def stream(cursor, fmt: str) -> AsyncIterator[bytes]:
+        """Encoded output chunks for every document of the cursor"""
+        encoded = MonsterExporter._encode_csv(cursor) if fmt == "csv" else MonsterExporter._encode_jsonl(cursor)
+        if fmt != "jsonl.gz":
+            async for chunk in encoded:
+                yield chunk
+            return
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+        async for chunk in encoded:
+            compressed = compressor.compress(chunk)
+            if compressed:
+                yield compressed
+        yield compressor.flush()
+
+    @staticmethod
+    async def _encode_jsonl(cursor) -> AsyncIterator[bytes]:
+        lines = []
+        size = 0
+        async for document in cursor:
+            line = json.dumps(document, default=_json_default, separators=(",", ":"))
+            lines.append(line)
+            size += len(line) + 1
+            if size >= MonsterExporter.CHUNK_BYTES:
+                yield ("\n".join(lines) + "\n").encode()
+                lines, size = [], 0
+        if lines:
+            yield ("\n".join(lines) + "\n").encode()
+
+    @staticmethod
+    async def _encode_csv(cursor) -> AsyncIterator[bytes]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(CSV_COLUMNS)
+        async for document in cursor:
+            writer.writerow(flatten(document))
+            if buffer.tell() >= MonsterExporter.CHUNK_BYTES:
+                yield buffer.getvalue().encode()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue().encode()
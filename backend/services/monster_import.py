@@ -0,0 +1,212 @@
+import codecs
+import csv
+import json
+import time
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+from pymongo import InsertOne
+from pymongo.errors import BulkWriteError
+
+from models.monster import Monster
+from services.abilities import AbilityRegistry
+from services.monster_csv import unflatten
+from services.name_engine import saved_names
+
+# Sub-documents homebrew monsters often lack, filled in before validation
+IMPORT_DEFAULTS = {
+    "description": "",
+    "specialAbilities": [],
+    "encounters": {"numberAppearing": "1", "wildEncounter": "1", "lairChance": 0},
+    "treasure": {"individual": "None", "lair": "None"},
+    "lair": {"description": "No fixed lair", "terrain": "", "size": "none", "defenses": []},
+    "source": "imported"
+}
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """UTF-8 text lines (without line endings) from a stream of byte chunks"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+
+class MonsterImporter:
+    """Streams JSONL or CSV monsters into the saved collection.
+
+    Rows are parsed and validated one at a time as lines arrive and written
+    in chunks: one unordered ``bulk_write`` of inserts per chunk plus one
+    ``$addToSet: {$each: [...]}`` per library referenced in the chunk. A row
+    that fails to parse or validate is reported with its line number and
+    skipped; the rest of the import carries on.
+
+    Rows may name their own library with a ``libraryId`` field or column;
+    otherwise the import's default library (if any) is used.
+    """
+
+    FORMATS = ("jsonl", "csv")
+    DEFAULT_CHUNK_SIZE = 1000
+    MAX_CHUNK_SIZE = 10_000
+    MAX_REPORTED_ERRORS = 100
+
+    def __init__(self, db, fmt: str, library_id: Optional[str] = None, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        if fmt not in self.FORMATS:
+            raise ValueError(f"format must be one of {', '.join(self.FORMATS)}")
+        if not 1 <= chunk_size <= self.MAX_CHUNK_SIZE:
+            raise ValueError(f"chunkSize must be between 1 and {self.MAX_CHUNK_SIZE}")
+        self.db = db
+        self.fmt = fmt
+        self.library_id = library_id
+        self.chunk_size = chunk_size
+
+        self.rows = 0
+        self.imported = 0
+        self.failed = 0
+        self.errors: List[Dict[str, Any]] = []
+        self.libraries: Dict[str, int] = {}
+        self.unknown_libraries: List[str] = []
+
+    async def run(self, lines: AsyncIterator[str]) -> Dict[str, Any]:
+        """Import every row and return the summary"""
+        started = time.perf_counter()
+        documents: List[Dict[str, Any]] = []
+        row_numbers: List[int] = []
+        libraries: List[Optional[str]] = []
+        async for row_number, record in self._records(lines):
+            self.rows += 1
+            try:
+                document, library_id = self._document(record)
+            except (ValueError, ValidationError) as e:
+                self._fail(row_number, e)
+                continue
+            documents.append(document)
+            row_numbers.append(row_number)
+            libraries.append(library_id)
+            if len(documents) >= self.chunk_size:
+                await self._flush(documents, row_numbers, libraries)
+                documents, row_numbers, libraries = [], [], []
+        if documents:
+            await self._flush(documents, row_numbers, libraries)
+        return self.summary(time.perf_counter() - started)
+
+    def summary(self, seconds: float) -> Dict[str, Any]:
+        return {
+            "format": self.fmt,
+            "rows": self.rows,
+            "imported": self.imported,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errorsTruncated": self.failed > len(self.errors),
+            "libraries": self.libraries,
+            "unknownLibraries": self.unknown_libraries,
+            "seconds": round(seconds, 3),
+            "monstersPerSecond": round(self.imported / seconds) if seconds > 0 else None
+        }
+
+    async def _records(self, lines: AsyncIterator[str]) -> AsyncIterator[Tuple[int, Any]]:
+        """(line number, parsed row or the parse error) for every non-blank row"""
+        if self.fmt == "jsonl":
+            line_number = 0
+            async for line in lines:
+                line_number += 1
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                    if not isinstance(record, dict):
+                        raise ValueError("Expected a JSON object")
+                except ValueError as e:
+                    record = ValueError(f"Invalid JSON: {e}")
+                yield line_number, record
+            return
+
+        header: Optional[List[str]] = None
+        line_number = 0
+        record_start = 0
+        pending: List[str] = []
+        async for line in lines:
+            line_number += 1
+            if not pending:
+                record_start = line_number
+            pending.append(line)
+            # A record continues while a quoted cell is still open
+            if sum(part.count('"') for part in pending) % 2:
+                continue
+            text = "\n".join(pending)
+            pending = []
+            if not text.strip():
+                continue
+            try:
+                cells = next(csv.reader([text]))
+                if header is None:
+                    header = [cell.strip() for cell in cells]
+                    continue
+                if len(cells) > len(header):
+                    raise ValueError(f"Expected {len(header)} cells, found {len(cells)}")
+                record = unflatten(dict(zip(header, cells)))
+            except (ValueError, csv.Error) as e:
+                record = ValueError(str(e))
+            yield record_start, record
+        if pending:
+            yield record_start, ValueError("Unterminated quoted cell")
+
+    def _document(self, record: Any) -> Tuple[Dict[str, Any], Optional[str]]:
+        if isinstance(record, Exception):
+            raise record
+        library_id = record.pop("libraryId", None) or self.library_id
+        for key, default in IMPORT_DEFAULTS.items():
+            record.setdefault(key, default)
+        monster = Monster.model_validate(record)
+        if monster.abilityMask is None:
+            monster.abilityMask = AbilityRegistry.to_mask(monster.specialAbilities)
+        document = monster.model_dump()
+        document["savedAt"] = datetime.utcnow()
+        return document, library_id
+
+    def _fail(self, row_number: int, error: Exception) -> None:
+        self.failed += 1
+        if len(self.errors) < self.MAX_REPORTED_ERRORS:
+            if isinstance(error, ValidationError):
+                message = "; ".join(
+                    f"{'.'.join(str(part) for part in detail['loc'])}: {detail['msg']}" for detail in error.errors()[:3]
+                )
+            else:
+                message = str(error)
+            self.errors.append({"row": row_number, "error": message})
+
+    async def _flush(self, documents: List[Dict[str, Any]], row_numbers: List[int],
+                     libraries: List[Optional[str]]) -> None:
+        failed_indexes = set()
+        try:
+            await self.db.saved_monsters.bulk_write([InsertOne(document) for document in documents], ordered=False)
+        except BulkWriteError as e:
+            for write_error in e.details.get("writeErrors", []):
+                failed_indexes.add(write_error["index"])
+                self._fail(row_numbers[write_error["index"]], ValueError(write_error.get("errmsg", "Write failed")))
+
+        members: Dict[str, List[str]] = {}
+        for index, (document, library_id) in enumerate(zip(documents, libraries)):
+            if index in failed_indexes:
+                continue
+            self.imported += 1
+            saved_names.add(document["name"])
+            if library_id:
+                members.setdefault(library_id, []).append(document["id"])
+
+        for library_id, monster_ids in members.items():
+            result = await self.db.monster_libraries.update_one(
+                {"id": library_id},
+                {"$addToSet": {"monsters": {"$each": monster_ids}}, "$set": {"updatedAt": datetime.utcnow()}}
+            )
+            if result.matched_count:
+                self.libraries[library_id] = self.libraries.get(library_id, 0) + len(monster_ids)
+            elif library_id not in self.unknown_libraries:
+                self.unknown_libraries.append(library_id)
@@ -0,0 +1,81 @@
+import logging
+import uuid
+from typing import Dict
+
+from bson import ObjectId
+
+logger = logging.getLogger(__name__)
+
+
+class SavedMonsterMigrations:
+    """Brings saved monsters and library membership up to the current schema.
+
+    Runs on startup and before offline imports. Every step is a no-op once
+    applied and picks the same survivors whichever process runs it, so
+    workers starting together may all run it.
+
+    Saved monsters without an id get one. Library members recorded as the
+    stringified ObjectId of a saved document (what /monsters/save used to
+    store) are replaced by that monster's id. Then ids saved more than once
+    are collapsed to their earliest save before the unique index on `id` is
+    built.
+    """
+
+    @staticmethod
+    async def run(db) -> None:
+        assigned = await SavedMonsterMigrations.assign_missing_ids(db.saved_monsters)
+        migrated = await SavedMonsterMigrations.migrate_library_members(db)
+        removed = await SavedMonsterMigrations.dedupe_ids(db)
+        if assigned or migrated or removed:
+            logger.info(f"Saved monster migration: assigned {assigned} ids, migrated {migrated} libraries, "
+                        f"removed {removed} duplicates")
+        await db.saved_monsters.create_index("id", unique=True)
+
+    @staticmethod
+    async def assign_missing_ids(collection) -> int:
+        assigned = 0
+        async for document in collection.find({"id": None}, {"_id": 1}):
+            await collection.update_one({"_id": document["_id"]}, {"$set": {"id": str(uuid.uuid4())}})
+            assigned += 1
+        return assigned
+
+    @staticmethod
+    async def migrate_library_members(db) -> int:
+        """Replace library members that are saved-document ObjectIds with the monster id"""
+        object_ids = set()
+        async for library in db.monster_libraries.find({}, {"_id": 0, "monsters": 1}):
+            object_ids.update(member for member in library.get("monsters", []) if ObjectId.is_valid(member))
+        if not object_ids:
+            return 0
+        replacements = {}
+        async for monster in db.saved_monsters.find({"_id": {"$in": [ObjectId(member) for member in object_ids]}},
+                                                    {"_id": 1, "id": 1}):
+            replacements[str(monster["_id"])] = monster["id"]
+        return await SavedMonsterMigrations.repoint_members(db, replacements)
+
+    @staticmethod
+    async def dedupe_ids(db) -> int:
+        """Keep the earliest save of every repeated id and delete the rest"""
+        repeated = await db.saved_monsters.aggregate([
+            {"$sortByCount": "$id"},
+            {"$match": {"count": {"$gt": 1}}}
+        ]).to_list(None)
+        removed = 0
+        for group in repeated:
+            copies = await db.saved_monsters.find({"id": group["_id"]}, {"_id": 1}).sort("_id", 1).to_list(None)
+            extra = [copy["_id"] for copy in copies[1:]]
+            result = await db.saved_monsters.delete_many({"_id": {"$in": extra}})
+            removed += result.deleted_count
+        return removed
+
+    @staticmethod
+    async def repoint_members(db, replacements: Dict[str, str]) -> int:
+        """Replace library members by key, keeping their order and dropping repeats"""
+        if not replacements:
+            return 0
+        updated = 0
+        async for library in db.monster_libraries.find({"monsters": {"$in": list(replacements)}}, {"_id": 1, "monsters": 1}):
+            members = list(dict.fromkeys(replacements.get(member, member) for member in library["monsters"]))
+            await db.monster_libraries.update_one({"_id": library["_id"]}, {"$set": {"monsters": members}})
+            updated += 1
+        return updated
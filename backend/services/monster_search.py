@@ -0,0 +1,109 @@
+from typing import Any, Dict, List
+
+from models.monster import MonsterSearchQuery
+
+
+class MonsterSearch:
+    """Faceted and full-text search over saved monsters.
+
+    Filtering, paging and every facet count run in a single aggregation:
+    one $match (using the text index when `q` is given, the compound and
+    multikey indexes otherwise) followed by a $facet stage.
+    """
+
+    # Facet name -> document field
+    FACET_FIELDS = {
+        "type": "type",
+        "challengeRating": "challengeRating",
+        "environment": "environment",
+        "abilities": "specialAbilities",
+        "lairSize": "lair.size",
+        "treasureType": "treasure.lair"
+    }
+
+    SORTS = {
+        "name": {"name": 1},
+        "newest": {"savedAt": -1},
+        "challengeRating": {"challengeRating": 1, "name": 1}
+    }
+
+    MAX_PAGE_SIZE = 200
+
+    @staticmethod
+    async def ensure_indexes(collection) -> None:
+        """Create the indexes the search pipeline relies on"""
+        await collection.create_index(
+            [("name", "text"), ("description", "text")],
+            weights={"name": 10, "description": 1},
+            name="monster_text"
+        )
+        await collection.create_index([("type", 1), ("challengeRating", 1), ("environment", 1)])
+        await collection.create_index([("environment", 1), ("challengeRating", 1)])
+        await collection.create_index([("challengeRating", 1), ("name", 1)])
+        await collection.create_index("specialAbilities")
+        await collection.create_index("lair.size")
+        await collection.create_index("treasure.lair")
+        await collection.create_index([("savedAt", -1)])
+
+    @staticmethod
+    def validate(query: MonsterSearchQuery) -> None:
+        if query.page < 1 or not 1 <= query.pageSize <= MonsterSearch.MAX_PAGE_SIZE:
+            raise ValueError(f"page must be >= 1 and pageSize between 1 and {MonsterSearch.MAX_PAGE_SIZE}")
+        if query.sort != "relevance" and query.sort not in MonsterSearch.SORTS:
+            raise ValueError(f"sort must be one of relevance, {', '.join(MonsterSearch.SORTS)}")
+
+    @staticmethod
+    def build_match(query: MonsterSearchQuery) -> Dict[str, Any]:
+        match: Dict[str, Any] = {}
+        if query.q:
+            match["$text"] = {"$search": query.q}
+        for facet, field in MonsterSearch.FACET_FIELDS.items():
+            values = getattr(query, facet)
+            if not values:
+                continue
+            # Abilities narrow the result (monster has all of them), other facets widen within themselves
+            if facet == "abilities":
+                match[field] = {"$all": values}
+            else:
+                match[field] = values[0] if len(values) == 1 else {"$in": values}
+        return match
+
+    @staticmethod
+    def build_pipeline(query: MonsterSearchQuery) -> List[Dict[str, Any]]:
+        """Single aggregation returning a page of results, the total and all facet counts"""
+        if query.sort == "relevance" and query.q:
+            sort = {"score": {"$meta": "textScore"}, "name": 1}
+        else:
+            sort = MonsterSearch.SORTS.get(query.sort, MonsterSearch.SORTS["newest"])
+        results_stage = [
+            {"$sort": sort},
+            {"$skip": (query.page - 1) * query.pageSize},
+            {"$limit": query.pageSize},
+            {"$project": {"_id": 0}}
+        ]
+        if query.q:
+            results_stage.insert(0, {"$addFields": {"score": {"$meta": "textScore"}}})
+
+        facets: Dict[str, List[Dict[str, Any]]] = {"results": results_stage, "total": [{"$count": "count"}]}
+        for facet, field in MonsterSearch.FACET_FIELDS.items():
+            stages = [{"$unwind": f"${field}"}] if facet == "abilities" else []
+            facets[facet] = stages + [{"$sortByCount": f"${field}"}]
+
+        return [{"$match": MonsterSearch.build_match(query)}, {"$facet": facets}]
+
+    @staticmethod
+    async def search(collection, query: MonsterSearchQuery) -> Dict[str, Any]:
+        MonsterSearch.validate(query)
+        documents = await collection.aggregate(MonsterSearch.build_pipeline(query)).to_list(1)
+        facet_result = documents[0] if documents else {}
+        total = facet_result.get("total") or [{"count": 0}]
+        return {
+            "total": total[0]["count"],
+            "page": query.page,
+            "pageSize": query.pageSize,
+            "monsters": facet_result.get("results", []),
+            "facets": {
+                facet: [{"value": bucket["_id"], "count": bucket["count"]} for bucket in facet_result.get(facet, [])]
+                for facet in MonsterSearch.FACET_FIELDS
+            }
+        }
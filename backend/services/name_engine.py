@@ -0,0 +1,234 @@
+import hashlib
+import math
+import os
+import random
+import zlib
+from functools import lru_cache
+from typing import Dict, Iterable, Optional, Sequence, Set, Tuple
+
+MASK_64 = (1 << 64) - 1
+
+
+def _mix64(value: int) -> int:
+    """SplitMix64 finalizer, used as the Feistel round function"""
+    value = (value + 0x9E3779B97F4A7C15) & MASK_64
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & MASK_64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & MASK_64
+    return value ^ (value >> 31)
+
+
+class FeistelPermutation:
+    """Keyed pseudo-random permutation of range(size) in O(1) memory.
+
+    A balanced Feistel network permutes the smallest power-of-four domain
+    covering `size`; indices that land outside the range are re-encrypted
+    (cycle walking) until they fall inside it, which keeps the mapping a
+    bijection on range(size). The domain is under 4x the size, so the
+    expected number of walks per lookup is small.
+    """
+
+    ROUNDS = 4
+
+    def __init__(self, size: int, key: int):
+        if size < 1:
+            raise ValueError("FeistelPermutation needs a positive size")
+        self.size = size
+        self._half_bits = max(1, ((size - 1).bit_length() + 1) // 2)
+        self._mask = (1 << self._half_bits) - 1
+        self._round_keys = [_mix64(key + round_index) for round_index in range(self.ROUNDS)]
+
+    def _encrypt(self, value: int) -> int:
+        left, right = value >> self._half_bits, value & self._mask
+        for round_key in self._round_keys:
+            left, right = right, left ^ (_mix64(right ^ round_key) & self._mask)
+        return (left << self._half_bits) | right
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __getitem__(self, index: int) -> int:
+        if not 0 <= index < self.size:
+            raise IndexError("permutation index out of range")
+        value = self._encrypt(index)
+        while value >= self.size:
+            value = self._encrypt(value)
+        return value
+
+
+class NameSpace:
+    """One shape of name (e.g. prefix + base) as an indexed product space"""
+
+    def __init__(self, prefixes: Sequence[str], bases: Sequence[str], roots: Sequence[str]):
+        # Empty parts contribute a single empty choice
+        self.prefixes = tuple(prefixes) or ("",)
+        self.bases = tuple(bases)
+        self.roots = tuple(roots) or ("",)
+        self.size = len(self.prefixes) * len(self.bases) * len(self.roots)
+
+    def name_at(self, index: int) -> str:
+        """Decode a mixed-radix index into its name"""
+        index, root = divmod(index, len(self.roots))
+        prefix, base = divmod(index, len(self.bases))
+        return " ".join(part for part in (self.prefixes[prefix], self.bases[base], self.roots[root]) if part)
+
+
+class NameFilter:
+    """Membership filter for names already in use.
+
+    Exact (a set) by default; with `use_bloom` a Bloom filter sized for
+    `expected_items` at `false_positive_rate`, which keeps memory flat for
+    very large libraries at the cost of occasionally skipping a free name.
+    """
+
+    def __init__(self, use_bloom: bool = False, expected_items: int = 1_000_000, false_positive_rate: float = 0.001):
+        self.use_bloom = use_bloom
+        self.count = 0
+        self._names: Set[str] = set()
+        if use_bloom:
+            self._bits_size = max(8, int(-expected_items * math.log(false_positive_rate) / math.log(2) ** 2))
+            self._hash_count = max(1, round(self._bits_size / expected_items * math.log(2)))
+            self._bits = bytearray((self._bits_size + 7) // 8)
+
+    @classmethod
+    def from_env(cls) -> "NameFilter":
+        return cls(
+            use_bloom=os.environ.get('SAVED_NAME_FILTER', 'set') == 'bloom',
+            expected_items=int(os.environ.get('SAVED_NAME_FILTER_CAPACITY', '1000000')),
+            false_positive_rate=float(os.environ.get('SAVED_NAME_FILTER_FP_RATE', '0.001'))
+        )
+
+    def _positions(self, name: str) -> Iterable[int]:
+        # Double hashing: k positions from two 64-bit halves of one digest
+        digest = hashlib.blake2b(name.encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+        return ((first + i * second) % self._bits_size for i in range(self._hash_count))
+
+    def add(self, name: str) -> None:
+        if self.use_bloom:
+            for position in self._positions(name):
+                self._bits[position >> 3] |= 1 << (position & 7)
+        else:
+            self._names.add(name)
+        self.count += 1
+
+    def update(self, names: Iterable[str]) -> None:
+        for name in names:
+            self.add(name)
+
+    def clear(self) -> None:
+        self.count = 0
+        self._names.clear()
+        if self.use_bloom:
+            self._bits = bytearray(len(self._bits))
+
+    def __contains__(self, name: str) -> bool:
+        if self.use_bloom:
+            return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(name))
+        return name in self._names
+
+    def __len__(self) -> int:
+        return self.count
+
+
+class NameBatch:
+    """Hands out distinct names for one batch, stream or job without storing the space.
+
+    Each monster type's names in the rule pack are split into four shapes
+    (base, prefix + base, base + root, prefix + base + root) picked with
+    the generator's usual prefix/suffix odds. Every shape is walked through
+    its own seeded permutation, so names repeat only once a shape is
+    exhausted; exhausted shapes fall through to the full three-part space,
+    and when that runs out too the cycle restarts with a roman numeral
+    epoch ("Dire Wolf II"). Fixed names such as a template's are claimed
+    through the same batch and numbered the same way when already taken.
+
+    Reuse one batch for every chunk of a run: the permutation cursors carry
+    on where the previous chunk stopped.
+    """
+
+    PREFIX_CHANCE = 0.6
+    SUFFIX_CHANCE = 0.4
+
+    def __init__(self, pack=None, seed: Optional[int] = None, exclude: Optional[NameFilter] = None):
+        if pack is None:
+            from services.rule_packs import rule_packs
+            pack = rule_packs.get()
+        self.pack = pack
+        self.seed = random.getrandbits(64) if seed is None else seed
+        self.exclude = exclude
+        self._rng = random.Random(self.seed)
+        self._cursors: Dict[Tuple[str, int], int] = {}
+        self._claims: Dict[str, int] = {}
+        self._issued: Set[str] = set()
+
+    def next_name(self, monster_type: str) -> str:
+        """Next name for a monster type not yet issued in this batch or excluded"""
+        monster_type = monster_type if monster_type in self.pack.name_spaces else 'beast'
+        shape = (self._rng.random() < self.PREFIX_CHANCE) << 1 | (self._rng.random() < self.SUFFIX_CHANCE)
+        while True:
+            space, permutation, key = self._next_slot(monster_type, shape)
+            cursor = self._cursors[key]
+            self._cursors[key] = cursor + 1
+            epoch, index = divmod(cursor, space.size)
+            name = space.name_at(permutation[index])
+            if epoch:
+                name = f"{name} {NameEngine.roman(epoch + 1)}"
+            if self._taken(name):
+                continue
+            self._issued.add(name)
+            return name
+
+    def claim(self, name: str) -> str:
+        """Issue a fixed name, with the next free roman numeral if it is taken"""
+        epoch = self._claims.get(name, 1)
+        candidate = name if epoch == 1 else f"{name} {NameEngine.roman(epoch)}"
+        while self._taken(candidate):
+            epoch += 1
+            candidate = f"{name} {NameEngine.roman(epoch)}"
+        self._claims[name] = epoch
+        self._issued.add(candidate)
+        return candidate
+
+    def reserve(self, names: Iterable[str]) -> None:
+        """Mark names as issued, e.g. those of a resumed job's finished chunks"""
+        self._issued.update(names)
+
+    def _taken(self, name: str) -> bool:
+        return name in self._issued or (self.exclude is not None and name in self.exclude)
+
+    def _next_slot(self, monster_type: str, shape: int):
+        full_shape = NameEngine.FULL_SHAPE
+        if self._cursors.get((monster_type, shape), 0) >= self.pack.name_space(monster_type, shape).size:
+            shape = full_shape
+        key = (monster_type, shape)
+        self._cursors.setdefault(key, 0)
+        space = self.pack.name_space(monster_type, shape)
+        return space, NameEngine.permutation(monster_type, shape, self.seed, space.size), key
+
+
+class NameEngine:
+    """Keyed permutations over rule pack name spaces"""
+
+    # Shape bits: 2 = prefix, 1 = root suffix
+    FULL_SHAPE = 3
+
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def permutation(monster_type: str, shape: int, seed: int, size: int) -> FeistelPermutation:
+        # crc32 rather than hash() so the same seed gives the same names in every process
+        key = (seed ^ (zlib.crc32(f"{monster_type}:{shape}".encode()) << 32)) & MASK_64
+        return FeistelPermutation(size, key)
+
+    @staticmethod
+    def roman(number: int) -> str:
+        numerals = [(1000, "M"), (900, "CM"), (500, "D"), (400, "CD"), (100, "C"), (90, "XC"),
+                    (50, "L"), (40, "XL"), (10, "X"), (9, "IX"), (5, "V"), (4, "IV"), (1, "I")]
+        result = ""
+        for value, numeral in numerals:
+            count, number = divmod(number, value)
+            result += numeral * count
+        return result
+
+
+# Names of saved monsters, loaded on startup and kept current on save
+saved_names = NameFilter.from_env()
@@ -0,0 +1,130 @@
+import random
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional
+
+from models.monster import AdvancedGenerationRequest, GenerationFilters, PopulationArea, PopulationRequest, TreasureInfo
+from services.advanced_generator import AdvancedMonsterGenerator
+from services.dice import roll_dice
+from services.lair_generator import LairGenerator
+from services.metrics import stage_timer
+from services.rule_packs import rule_packs
+from services.sampling import WeightedSampler
+from services.treasure_generator import TreasureGenerator
+
+
+class PopulationGenerator:
+    """Stocks every room of a dungeon or hex of a map in a single pass.
+
+    Each stocked area gets a monster, a rolled group size and, depending on
+    whether the group is found in its lair, either a lair with its hoard or
+    the individual treasure carried by wandering monsters. Samplers and
+    generation requests are shared by every area with the same settings.
+    """
+
+    MAP_TYPES = {"dungeon": "Room", "hex": "Hex"}
+
+    @staticmethod
+    def resolve_areas(request: PopulationRequest) -> List[PopulationArea]:
+        """Explicit areas, or `count` copies of the defaults"""
+        return request.areas or [request.defaults] * request.count
+
+    @staticmethod
+    def validate(request: PopulationRequest) -> None:
+        """Reject map descriptions the generator cannot stock"""
+        if request.mapType not in PopulationGenerator.MAP_TYPES:
+            raise ValueError(f"mapType must be one of {', '.join(PopulationGenerator.MAP_TYPES)}")
+        areas = PopulationGenerator.resolve_areas(request)
+        if not areas:
+            raise ValueError("Provide at least one area, or a count of areas to stock from the defaults")
+        ratings = AdvancedMonsterGenerator.CHALLENGE_RATINGS
+        for index, area in enumerate(areas):
+            if area.minChallengeRating not in ratings or area.maxChallengeRating not in ratings:
+                raise ValueError(f"Area {index}: challenge ratings must be one of {', '.join(ratings)}")
+            if ratings.index(area.minChallengeRating) > ratings.index(area.maxChallengeRating):
+                raise ValueError(f"Area {index}: minChallengeRating is above maxChallengeRating")
+            if not 0 <= area.stockingChance <= 1:
+                raise ValueError(f"Area {index}: stockingChance must be between 0 and 1")
+        rule_packs.get(request.rulePack)
+
+    @staticmethod
+    def generate(request: PopulationRequest, start: int = 0, stop: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Stock areas[start:stop] of the map"""
+        areas = PopulationGenerator.resolve_areas(request)
+        label = PopulationGenerator.MAP_TYPES[request.mapType]
+        stop = len(areas) if stop is None else min(stop, len(areas))
+        return [
+            PopulationGenerator._stock_area(request, index, areas[index], label)
+            for index in range(start, stop)
+        ]
+
+    @staticmethod
+    def iter_chunks(request: PopulationRequest, chunk_size: int) -> Iterator[List[Dict[str, Any]]]:
+        """Stock the map chunk by chunk, for streaming"""
+        total = len(PopulationGenerator.resolve_areas(request))
+        for start in range(0, total, chunk_size):
+            yield PopulationGenerator.generate(request, start, start + chunk_size)
+
+    @staticmethod
+    def _stock_area(request: PopulationRequest, index: int, area: PopulationArea, label: str) -> Dict[str, Any]:
+        result = {
+            "index": index,
+            "label": area.label or f"{label} {index + 1}",
+            "stocked": random.random() < area.stockingChance,
+            "monster": None,
+            "group": None
+        }
+        if not result["stocked"]:
+            return result
+
+        cr = PopulationGenerator._cr_band_sampler(area.minChallengeRating, area.maxChallengeRating).sample()
+        environment = area.environment
+        if environment == "any" and request.mapType == "dungeon":
+            environment = "dungeon"
+        generation_request = PopulationGenerator._generation_request(
+            cr, area.type, environment, request.algorithm, request.complexity, request.rulePack
+        )
+        pack = rule_packs.get(request.rulePack)
+        monster = AdvancedMonsterGenerator.generate_monsters(generation_request)[0]
+
+        # Groups found in their lair use the lair numbers, wanderers the wilderness ones
+        in_lair = random.randint(1, 100) <= monster.encounters.lairChance
+        expression = monster.encounters.numberAppearing if in_lair else monster.encounters.wildEncounter
+        group_size = max(1, roll_dice(expression))
+
+        if in_lair and request.includeLair:
+            with stage_timer("lair"):
+                monster.lair = LairGenerator.generate_lair(
+                    monster.type, monster.environment, monster.challengeRating, monster.specialAbilities,
+                    monster.abilityMask, pack.terrain
+                )
+        with stage_timer("treasure"):
+            if not request.includeTreasure:
+                monster.treasure = TreasureInfo(individual="None", lair="None")
+            elif in_lair:
+                monster.treasure = TreasureGenerator.generate_lair_treasure(monster.challengeRating, monster.type, pack.treasure_types)
+            else:
+                monster.treasure = TreasureGenerator.generate_individual_treasure(monster.challengeRating)
+
+        result["monster"] = monster
+        result["group"] = {"size": group_size, "dice": expression, "inLair": in_lair}
+        return result
+
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def _cr_band_sampler(min_cr: str, max_cr: str) -> WeightedSampler:
+        ratings = AdvancedMonsterGenerator.CHALLENGE_RATINGS
+        return WeightedSampler(ratings[ratings.index(min_cr):ratings.index(max_cr) + 1])
+
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _generation_request(cr: str, monster_type: str, environment: str, algorithm: str, complexity: str,
+                            rule_pack: Optional[str]) -> AdvancedGenerationRequest:
+        # Lair and treasure are rolled per area once the group's situation is known
+        return AdvancedGenerationRequest(
+            filters=GenerationFilters(challengeRating=cr, type=monster_type, environment=environment, count=1),
+            algorithm=algorithm,
+            complexity=complexity,
+            customRules={"rulePack": rule_pack} if rule_pack else {},
+            includeTreasure=False,
+            includeLair=False
+        )
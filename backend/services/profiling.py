@@ -0,0 +1,120 @@
+import cProfile
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+from services.admission import AdmissionRejected
+
+# Profiling is opt-in per deployment and then per request
+PROFILING_ENABLED = os.environ.get('ENABLE_GENERATION_PROFILING', 'false').lower() in ('1', 'true', 'yes')
+PROFILE_HEADER = 'X-Profile-Generation'
+PROFILE_QUERY_PARAM = 'profile'
+
+# Functions defined under the services package are reported as hot spots
+SERVICES_DIR = os.path.dirname(os.path.abspath(__file__)) + os.sep
+
+
+class GenerationProfiler:
+    """Run a generation call under cProfile and tracemalloc.
+
+    tracemalloc is process-wide: it traces (and slows) every thread, and one
+    call's stop would break another's snapshot. So one profile runs at a time
+    per process; a request arriving while one runs is rejected with 429.
+    """
+
+    BUSY_RETRY_AFTER = 1
+    _lock = threading.Lock()
+
+    @staticmethod
+    def is_requested(headers: Dict[str, str], query_params: Dict[str, str]) -> bool:
+        """Check whether profiling is enabled and asked for by the request"""
+        if not PROFILING_ENABLED:
+            return False
+        flag = headers.get(PROFILE_HEADER) or query_params.get(PROFILE_QUERY_PARAM) or ''
+        return flag.lower() in ('1', 'true', 'yes')
+
+    @staticmethod
+    def profile(func: Callable, *args, top_n: int = 25, **kwargs) -> Tuple[Any, Dict[str, Any]]:
+        """Call func and return its result together with a profile report"""
+        if not GenerationProfiler._lock.acquire(blocking=False):
+            raise AdmissionRejected(429, "Another generation is being profiled", retry_after=GenerationProfiler.BUSY_RETRY_AFTER)
+        try:
+            return GenerationProfiler._profile(func, args, kwargs, top_n)
+        finally:
+            GenerationProfiler._lock.release()
+
+    @staticmethod
+    def _profile(func: Callable, args: tuple, kwargs: Dict[str, Any], top_n: int) -> Tuple[Any, Dict[str, Any]]:
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.take_snapshot()
+
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            result = func(*args, **kwargs)
+        finally:
+            profiler.disable()
+            wall_seconds = time.perf_counter() - start
+            snapshot = tracemalloc.take_snapshot()
+            current_bytes, peak_bytes = tracemalloc.get_traced_memory()
+            if started_tracing:
+                tracemalloc.stop()
+
+        report = {
+            'wallSeconds': round(wall_seconds, 6),
+            'hotFunctions': GenerationProfiler._hot_functions(profiler, top_n),
+            'allocations': {
+                'currentBytes': current_bytes,
+                'peakBytes': peak_bytes,
+                'topSites': GenerationProfiler._allocation_sites(snapshot, baseline, top_n),
+            },
+        }
+        return result, report
+
+    @staticmethod
+    def _is_generator_file(filename: str) -> bool:
+        return os.path.abspath(filename).startswith(SERVICES_DIR)
+
+    @staticmethod
+    def _hot_functions(profiler: cProfile.Profile, top_n: int) -> List[Dict[str, Any]]:
+        """Summarize generator functions ordered by cumulative time"""
+        stats = pstats.Stats(profiler)
+        rows = []
+        for (filename, line, function), (_, calls, total_time, cumulative_time, _) in stats.stats.items():
+            if not GenerationProfiler._is_generator_file(filename):
+                continue
+            rows.append({
+                'function': function,
+                'module': os.path.basename(filename),
+                'line': line,
+                'calls': calls,
+                'totalSeconds': round(total_time, 6),
+                'cumulativeSeconds': round(cumulative_time, 6),
+            })
+        rows.sort(key=lambda row: row['cumulativeSeconds'], reverse=True)
+        return rows[:top_n]
+
+    @staticmethod
+    def _allocation_sites(snapshot: tracemalloc.Snapshot, baseline: tracemalloc.Snapshot, top_n: int) -> List[Dict[str, Any]]:
+        """Summarize allocations made by generator code during the call"""
+        sites = []
+        for diff in snapshot.compare_to(baseline, 'lineno'):
+            frame = diff.traceback[0]
+            if diff.size_diff <= 0 or not GenerationProfiler._is_generator_file(frame.filename):
+                continue
+            sites.append({
+                'module': os.path.basename(frame.filename),
+                'line': frame.lineno,
+                'sizeBytes': diff.size_diff,
+                'count': diff.count_diff,
+            })
+            if len(sites) >= top_n:
+                break
+        return sites
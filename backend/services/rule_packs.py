@@ -0,0 +1,345 @@
+import asyncio
+import json
+import logging
+import os
+import random
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from pydantic import ValidationError
+
+from models.rule_pack import RulePackSpec
+from services.description_grammar import DescriptionGrammar
+from services.dice import parse_dice
+from services.encounter_generator import EncounterTable
+from services.name_engine import NameSpace
+from services.sampling import WeightedSampler
+from services.template_store import TemplateStore
+
+logger = logging.getLogger(__name__)
+
+ANY = "any"
+
+
+class RulePackError(ValueError):
+    """A rule pack failed validation or compilation"""
+
+
+class UnknownRulePack(ValueError):
+    """A request selected a rule pack that is not loaded"""
+
+
+def _freeze(value: Any) -> Any:
+    """Recursively turn dicts into read-only mappings and lists into tuples"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+@dataclass(frozen=True)
+class CompiledRulePack:
+    """Immutable, indexed content used by the generators for one rule pack"""
+
+    name: str
+    version: str
+    description: str
+    source: Optional[str]
+    templates: Tuple[Mapping[str, Any], ...]
+    # (challengeRating, type, environment), each possibly "any" -> matching templates
+    template_index: Mapping[Tuple[str, str, str], Tuple[Mapping[str, Any], ...]]
+    terrain: Mapping[str, Mapping[str, Any]]
+    treasure_types: Mapping[str, Mapping[str, Any]]
+    social_structures: Mapping[str, Mapping[str, Any]]
+    encounter_table: EncounterTable
+    prefix_sampler: WeightedSampler
+    root_sampler: WeightedSampler
+    description_grammar: DescriptionGrammar
+    base_name_samplers: Mapping[str, WeightedSampler]
+    # Monster type -> its name space for each shape (2 = prefix, 1 = root suffix)
+    name_spaces: Mapping[str, Tuple[NameSpace, ...]]
+    loaded_at: datetime
+    template_store: Optional[TemplateStore] = None
+
+    def templates_for(self, challenge_rating: str, monster_type: str, environment: str) -> Tuple[Mapping[str, Any], ...]:
+        """Inline templates matching the filters, where "any" matches everything"""
+        return self.template_index.get((challenge_rating, monster_type, environment), ())
+
+    def pick_template(self, challenge_rating: str, monster_type: str, environment: str) -> Optional[Mapping[str, Any]]:
+        """One random matching template, inline or from the store (treat as read-only)"""
+        inline = self.templates_for(challenge_rating, monster_type, environment)
+        stored = self.template_store.candidates(challenge_rating, monster_type, environment) if self.template_store else ()
+        total = len(inline) + len(stored)
+        if not total:
+            return None
+        index = int(random.random() * total)
+        if index >= len(inline):
+            return self.template_store.template_at(int(stored[index - len(inline)]))
+        return inline[index]
+
+    def base_name_sampler(self, monster_type: str) -> WeightedSampler:
+        return self.base_name_samplers.get(monster_type) or self.base_name_samplers['beast']
+
+    def name_space(self, monster_type: str, shape: int) -> NameSpace:
+        return (self.name_spaces.get(monster_type) or self.name_spaces['beast'])[shape]
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "version": self.version,
+            "description": self.description,
+            "source": self.source,
+            "templates": len(self.templates) + (len(self.template_store) if self.template_store else 0),
+            "terrains": len(self.terrain),
+            "treasureTypes": len(self.treasure_types),
+            "loadedAt": self.loaded_at
+        }
+
+
+class RulePackCompiler:
+    """Validates rule pack files and compiles them over the core content"""
+
+    CORE = "core"
+    # Largest coin amount a treasure type may roll, per coin type
+    MAX_COINS = 1_000_000
+
+    @staticmethod
+    def core_spec() -> RulePackSpec:
+        """The built-in content of the generator classes as a rule pack"""
+        from services.advanced_generator import AdvancedMonsterGenerator
+        from services.encounter_generator import EncounterGenerator
+        from services.lair_generator import LairGenerator
+        from services.treasure_generator import TreasureGenerator
+
+        return RulePackSpec(
+            name=RulePackCompiler.CORE,
+            description="Built-in Labyrinth Lord content",
+            monsterTemplates=AdvancedMonsterGenerator.MONSTER_TEMPLATES,
+            terrain=LairGenerator.TERRAIN_DESCRIPTIONS,
+            treasureTypes=TreasureGenerator.TREASURE_TYPES,
+            socialStructures=EncounterGenerator.SOCIAL_STRUCTURES,
+            names={
+                "prefixes": AdvancedMonsterGenerator.NAME_PREFIXES,
+                "roots": AdvancedMonsterGenerator.NAME_ROOTS,
+                "typeBaseNames": AdvancedMonsterGenerator.TYPE_BASE_NAMES
+            },
+            descriptors=AdvancedMonsterGenerator.DESCRIPTORS
+        )
+
+    @staticmethod
+    def load_spec(path: Path) -> RulePackSpec:
+        """Parse and validate a JSON or YAML rule pack file"""
+        text = path.read_text(encoding="utf-8")
+        if path.suffix in (".yaml", ".yml"):
+            try:
+                import yaml
+            except ImportError:
+                raise RulePackError("PyYAML is required to load YAML rule packs")
+            data = yaml.safe_load(text)
+        else:
+            data = json.loads(text)
+        try:
+            return RulePackSpec(**(data or {}))
+        except ValidationError as e:
+            raise RulePackError(str(e))
+
+    @staticmethod
+    def compile(spec: RulePackSpec, base: Optional[RulePackSpec] = None, source: Optional[str] = None,
+                directory: Optional[Path] = None) -> CompiledRulePack:
+        """Layer a pack over the core content and build its lookup structures.
+
+        Lists (templates, names, descriptors) are appended to the core ones;
+        keyed tables (terrain, treasure types, social structures, base names
+        per type) override or add entries by key.
+        """
+        from services.advanced_generator import AdvancedMonsterGenerator
+
+        if base is not None and spec.name == RulePackCompiler.CORE:
+            raise RulePackError(f"'{RulePackCompiler.CORE}' is reserved for the built-in rules")
+        base_data = base.model_dump() if base is not None else {}
+        data = spec.model_dump()
+
+        templates = base_data.get("monsterTemplates", []) + data["monsterTemplates"]
+        terrain = {**base_data.get("terrain", {}), **data["terrain"]}
+        treasure_types = {**base_data.get("treasureTypes", {}), **data["treasureTypes"]}
+        social_structures = {**base_data.get("socialStructures", {}), **data["socialStructures"]}
+        base_names = base_data.get("names", {"prefixes": [], "roots": [], "typeBaseNames": {}})
+        prefixes = list(dict.fromkeys(base_names["prefixes"] + data["names"]["prefixes"]))
+        roots = list(dict.fromkeys(base_names["roots"] + data["names"]["roots"]))
+        type_base_names = {
+            monster_type: list(dict.fromkeys(base_names["typeBaseNames"].get(monster_type, []) + names))
+            for monster_type, names in data["names"]["typeBaseNames"].items()
+        }
+        type_base_names = {**base_names["typeBaseNames"], **type_base_names}
+        descriptors = list(dict.fromkeys(base_data.get("descriptors", []) + data["descriptors"]))
+
+        # Semantic checks the schema cannot express
+        ratings = AdvancedMonsterGenerator.CHALLENGE_RATINGS
+        for template in data["monsterTemplates"]:
+            if template["challengeRating"] not in ratings:
+                raise RulePackError(f"Template '{template['name']}': challengeRating must be one of {', '.join(ratings)}")
+        if base_data:
+            unknown = set(data["socialStructures"]) - set(base_data["socialStructures"])
+            if unknown:
+                raise RulePackError(f"Unknown social structures: {', '.join(sorted(unknown))}")
+        for structure_name, structure in data["socialStructures"].items():
+            for field in ("numberAppearing", "wildEncounter"):
+                try:
+                    parse_dice(structure[field])
+                except ValueError as e:
+                    raise RulePackError(f"Social structure '{structure_name}' {field}: {e}")
+        for treasure_name, treasure in data["treasureTypes"].items():
+            for coin, (low, high) in treasure["coins"].items():
+                if coin not in ("cp", "sp", "ep", "gp", "pp") or not 0 <= low <= high <= RulePackCompiler.MAX_COINS:
+                    raise RulePackError(f"Treasure type '{treasure_name}': invalid coins entry {coin}: {low}-{high} "
+                                       f"(amounts range from 0 to {RulePackCompiler.MAX_COINS})")
+        if 'beast' not in type_base_names or not prefixes or not roots or not descriptors:
+            raise RulePackError("A rule pack needs name prefixes, roots, descriptors and beast base names")
+
+        template_store = None
+        if spec.templateStore:
+            try:
+                template_store = TemplateStore((directory or Path(".")) / spec.templateStore)
+            except (OSError, ValueError, KeyError) as e:
+                raise RulePackError(f"Template store '{spec.templateStore}' could not be opened: {e}")
+            invalid = set(template_store.dictionaries["challengeRating"]) - set(ratings)
+            if invalid:
+                raise RulePackError(f"Template store has invalid challenge ratings: {', '.join(sorted(invalid))}")
+
+        frozen_templates = tuple(_freeze(template) for template in templates)
+        template_index: Dict[Tuple[str, str, str], list] = {}
+        for template in frozen_templates:
+            keys = (template["challengeRating"], template["type"], template["environment"])
+            # Register under every combination of concrete value and "any"
+            for mask in range(8):
+                key = tuple(ANY if mask & (1 << position) else value for position, value in enumerate(keys))
+                template_index.setdefault(key, []).append(template)
+
+        return CompiledRulePack(
+            name=spec.name,
+            version=spec.version,
+            description=spec.description,
+            source=source,
+            templates=frozen_templates,
+            template_index=MappingProxyType({key: tuple(items) for key, items in template_index.items()}),
+            terrain=_freeze(terrain),
+            treasure_types=_freeze(treasure_types),
+            social_structures=_freeze(social_structures),
+            encounter_table=EncounterTable(social_structures),
+            prefix_sampler=WeightedSampler(prefixes),
+            root_sampler=WeightedSampler(roots),
+            description_grammar=DescriptionGrammar(descriptors),
+            base_name_samplers=MappingProxyType({
+                monster_type: WeightedSampler(names) for monster_type, names in type_base_names.items() if names
+            }),
+            name_spaces=MappingProxyType({
+                monster_type: tuple(
+                    NameSpace(prefixes if shape & 2 else (), names, roots if shape & 1 else ()) for shape in range(4)
+                )
+                for monster_type, names in type_base_names.items() if names
+            }),
+            loaded_at=datetime.utcnow(),
+            template_store=template_store
+        )
+
+
+class RulePackRegistry:
+    """Loaded rule packs, replaced as a whole on reload.
+
+    Readers take a reference to the current mapping, so a reload never
+    exposes a half-built state: the new mapping is compiled off to the side
+    and swapped in with a single assignment. A pack file that fails to
+    load keeps its previously compiled version.
+    """
+
+    PACK_SUFFIXES = (".json", ".yaml", ".yml")
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.errors: Dict[str, str] = {}
+        self._packs: Mapping[str, CompiledRulePack] = MappingProxyType({})
+        self._files: Dict[str, str] = {}
+        self._fingerprint: Optional[tuple] = None
+        self._core_spec: Optional[RulePackSpec] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "RulePackRegistry":
+        default_directory = Path(__file__).parent.parent / "rule_packs"
+        return cls(Path(os.environ.get('RULE_PACK_DIR', str(default_directory))))
+
+    def get(self, name: Optional[str] = None) -> CompiledRulePack:
+        """Compiled pack by name; the core pack when no name is given"""
+        packs = self._packs
+        if not packs:
+            self.reload()
+            packs = self._packs
+        pack = packs.get(name or RulePackCompiler.CORE)
+        if pack is None:
+            raise UnknownRulePack(f"Unknown rule pack: {name}")
+        return pack
+
+    @property
+    def loaded(self) -> bool:
+        return bool(self._packs)
+
+    def list(self):
+        return [pack.summary() for pack in self._packs.values()]
+
+    def _pack_files(self):
+        if not self.directory.is_dir():
+            return []
+        return sorted(path for path in self.directory.iterdir() if path.suffix in self.PACK_SUFFIXES and path.is_file())
+
+    def fingerprint(self) -> tuple:
+        return tuple((path.name, path.stat().st_mtime_ns, path.stat().st_size) for path in self._pack_files())
+
+    def reload(self) -> Dict[str, Any]:
+        """Recompile every pack on disk and swap them in atomically"""
+        with self._lock:
+            if self._core_spec is None:
+                self._core_spec = RulePackCompiler.core_spec()
+            current = self._packs
+            packs = {RulePackCompiler.CORE: current.get(RulePackCompiler.CORE) or RulePackCompiler.compile(self._core_spec)}
+            files: Dict[str, str] = {}
+            errors: Dict[str, str] = {}
+            fingerprint = self.fingerprint()
+            for path in self._pack_files():
+                try:
+                    spec = RulePackCompiler.load_spec(path)
+                    if spec.name in packs:
+                        raise RulePackError(f"Duplicate rule pack name '{spec.name}'")
+                    packs[spec.name] = RulePackCompiler.compile(spec, self._core_spec, source=path.name, directory=path.parent)
+                    files[path.name] = spec.name
+                except (RulePackError, OSError, ValueError) as e:
+                    errors[path.name] = str(e)
+                    previous = self._files.get(path.name)
+                    if previous in current and previous not in packs:
+                        packs[previous] = current[previous]
+                        files[path.name] = previous
+                    logger.error(f"Rule pack {path.name} failed to load: {e}")
+
+            self._packs = MappingProxyType(packs)
+            self._files = files
+            self._fingerprint = fingerprint
+            self.errors = errors
+        logger.info(f"Loaded rule packs: {', '.join(packs)}")
+        return {"loaded": list(packs), "errors": errors}
+
+    async def watch(self, interval: float) -> None:
+        """Reload whenever a pack file is added, changed or removed"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                if await asyncio.to_thread(self.fingerprint) != self._fingerprint:
+                    await asyncio.to_thread(self.reload)
+            except Exception as e:
+                logger.error(f"Rule pack reload failed: {e}")
+
+
+rule_packs = RulePackRegistry.from_env()
@@ -0,0 +1,57 @@
+import gc
+import logging
+import os
+import random
+import sys
+from typing import List
+
+logger = logging.getLogger(__name__)
+
+# Random generators owned by services that must not be shared across workers
+_worker_rngs: List[random.Random] = []
+_tables_frozen = False
+
+
+def register_rng(rng: random.Random) -> random.Random:
+    """Register a Random instance to be reseeded in each forked worker"""
+    _worker_rngs.append(rng)
+    return rng
+
+
+def reseed_worker_rngs() -> None:
+    """Give the current process fresh random state after a fork"""
+    random.seed()
+    for rng in _worker_rngs:
+        rng.seed()
+    numpy = sys.modules.get('numpy')
+    if numpy is not None:
+        numpy.random.seed()
+
+
+def freeze_shared_tables() -> None:
+    """Build generator tables in the master and keep them out of GC scans.
+
+    Objects frozen before fork are never touched by the collector in the
+    workers, so their pages stay shared copy-on-write instead of being
+    dirtied by reference-count and GC bookkeeping. This covers the class
+    level tables and the compiled rule packs (encounter tables, samplers,
+    description grammars); a worker only recompiles packs on a reload.
+
+    Mutable state is not shared: metrics, admission slots and the saved
+    name set are per worker.
+    """
+    global _tables_frozen
+    if _tables_frozen:
+        return
+    # Importing the generators builds every class-level table once
+    from services.advanced_generator import AdvancedMonsterGenerator  # noqa: F401
+    from services.rule_packs import rule_packs
+    rule_packs.reload()
+    gc.collect()
+    gc.freeze()
+    _tables_frozen = True
+    logger.info(f"Froze {gc.get_freeze_count()} objects for copy-on-write sharing")
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=reseed_worker_rngs)
@@ -0,0 +1,89 @@
+import random
+from functools import lru_cache
+from typing import Any, Dict, Generic, List, Optional, Sequence, Tuple, TypeVar
+
+T = TypeVar('T')
+
+
+class WeightedSampler(Generic[T]):
+    """Precomputed weighted sampler using Vose's alias method.
+
+    Construction is O(n); every draw is O(1) (two uniform numbers and a
+    table lookup). With no weights the sampler degenerates to a uniform
+    draw over the options.
+    """
+
+    def __init__(self, options: Sequence[T], weights: Optional[Sequence[float]] = None, rng: Optional[random.Random] = None):
+        if not options:
+            raise ValueError("WeightedSampler needs at least one option")
+        self.options: Tuple[T, ...] = tuple(options)
+        self._random = (rng or random).random
+        self._n = len(self.options)
+        self.weights: Optional[Tuple[float, ...]] = None
+        self._prob: Optional[List[float]] = None
+        self._alias: Optional[List[int]] = None
+        if weights is not None:
+            if len(weights) != self._n:
+                raise ValueError("WeightedSampler needs one weight per option")
+            if any(w < 0 for w in weights) or not sum(weights):
+                raise ValueError("WeightedSampler weights must be non-negative with a positive total")
+            self.weights = tuple(float(w) for w in weights)
+            if len(set(self.weights)) > 1:
+                self._prob, self._alias = self._build_alias_table(self.weights)
+
+    @classmethod
+    def from_weights(cls, weights: Dict[T, float], rng: Optional[random.Random] = None) -> "WeightedSampler[T]":
+        """Build a sampler from an {option: weight} mapping"""
+        return cls(list(weights), list(weights.values()), rng)
+
+    @staticmethod
+    def _build_alias_table(weights: Sequence[float]) -> Tuple[List[float], List[int]]:
+        n = len(weights)
+        total = sum(weights)
+        scaled = [w * n / total for w in weights]
+        prob = [0.0] * n
+        alias = [0] * n
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            prob[s] = scaled[s]
+            alias[s] = l
+            scaled[l] = scaled[l] + scaled[s] - 1.0
+            (small if scaled[l] < 1.0 else large).append(l)
+        # Leftovers are 1.0 up to floating point error
+        for i in large + small:
+            prob[i] = 1.0
+        return prob, alias
+
+    def __len__(self) -> int:
+        return self._n
+
+    def sample(self) -> T:
+        """Draw one option"""
+        u = self._random() * self._n
+        i = int(u)
+        if self._prob is None or u - i < self._prob[i]:
+            return self.options[i]
+        return self.options[self._alias[i]]
+
+    def sample_many(self, k: int) -> List[T]:
+        """Draw k options with replacement"""
+        rand = self._random
+        n = self._n
+        options = self.options
+        if self._prob is None:
+            return [options[int(rand() * n)] for _ in range(k)]
+        prob, alias = self._prob, self._alias
+        draws = []
+        for _ in range(k):
+            u = rand() * n
+            i = int(u)
+            draws.append(options[i] if u - i < prob[i] else options[alias[i]])
+        return draws
+
+
+@lru_cache(maxsize=256)
+def cached_sampler(weighted_items: Tuple[Tuple[Any, float], ...]) -> WeightedSampler:
+    """Shared sampler for an ad-hoc weight table, e.g. request-supplied weights"""
+    return WeightedSampler([item for item, _ in weighted_items], [weight for _, weight in weighted_items])
@@ -0,0 +1,159 @@
+import json
+import random
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+ANY = "any"
+
+
+class TemplateStore:
+    """Read-only columnar monster template store backed by memory-mapped files.
+
+    Layout of a store directory:
+
+    - ``manifest.json``: row count, column kinds and string dictionaries
+    - ``<column>.npy``: numeric columns and dictionary codes for
+      low-cardinality strings (type, CR, hit dice, ...)
+    - ``<column>.heap`` + ``<column>.offsets.npy``: free text (name,
+      description) as one UTF-8 heap with row offsets
+    - ``specialAbilities.codes.npy`` + ``specialAbilities.offsets.npy``:
+      ability lists as dictionary codes with row offsets
+    - ``filters.npy``: one packed bitmap per CR / type / environment value
+
+    Every array is opened with ``mmap_mode='r'``, so workers share the pages
+    through the OS page cache instead of each holding the templates as
+    Python objects; only the template that is picked is materialized.
+    """
+
+    FORMAT_VERSION = 1
+    NUMERIC_COLUMNS = {"ac": "int8", "hp": "int32", "morale": "int8", "xp": "int32"}
+    CATEGORICAL_COLUMNS = ("type", "challengeRating", "environment", "hd", "movement", "attacks", "damage", "save")
+    TEXT_COLUMNS = ("name", "description")
+    FILTER_COLUMNS = ("challengeRating", "type", "environment")
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        manifest = json.loads((self.directory / "manifest.json").read_text(encoding="utf-8"))
+        if manifest.get("formatVersion") != self.FORMAT_VERSION:
+            raise ValueError(f"Unsupported template store format: {manifest.get('formatVersion')}")
+        self.count: int = manifest["count"]
+        self.dictionaries: Dict[str, List[str]] = manifest["dictionaries"]
+        self.bitmap_rows: Dict[str, Dict[str, int]] = manifest["bitmaps"]
+
+        def load(name: str) -> np.ndarray:
+            return np.load(self.directory / f"{name}.npy", mmap_mode="r")
+
+        self.numeric = {column: load(column) for column in self.NUMERIC_COLUMNS}
+        self.codes = {column: load(column) for column in self.CATEGORICAL_COLUMNS}
+        self.text_offsets = {column: load(f"{column}.offsets") for column in self.TEXT_COLUMNS}
+        self.heaps = {
+            column: np.memmap(self.directory / f"{column}.heap", dtype=np.uint8, mode="r")
+            if self.text_offsets[column][-1] else np.zeros(0, dtype=np.uint8)
+            for column in self.TEXT_COLUMNS
+        }
+        self.ability_codes = load("specialAbilities.codes")
+        self.ability_offsets = load("specialAbilities.offsets")
+        self.bitmaps = load("filters")
+        self._candidates = lru_cache(maxsize=512)(self._compute_candidates)
+
+    @staticmethod
+    def write(templates: Iterable[Dict[str, Any]], directory: Path) -> int:
+        """Write templates (dicts shaped like MONSTER_TEMPLATES entries) as a store"""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        templates = list(templates)
+        count = len(templates)
+
+        dictionaries: Dict[str, Dict[str, int]] = {}
+        for column in TemplateStore.CATEGORICAL_COLUMNS + ("specialAbilities",):
+            dictionaries[column] = {}
+        for column, dtype in TemplateStore.NUMERIC_COLUMNS.items():
+            np.save(directory / f"{column}.npy", np.array([t[column] for t in templates], dtype=dtype))
+        for column in TemplateStore.CATEGORICAL_COLUMNS:
+            values = dictionaries[column]
+            codes = [values.setdefault(t[column], len(values)) for t in templates]
+            np.save(directory / f"{column}.npy", np.array(codes, dtype=TemplateStore._code_dtype(len(values))))
+        for column in TemplateStore.TEXT_COLUMNS:
+            encoded = [t[column].encode("utf-8") for t in templates]
+            offsets = np.zeros(count + 1, dtype=np.int64)
+            np.cumsum([len(value) for value in encoded], out=offsets[1:])
+            (directory / f"{column}.heap").write_bytes(b"".join(encoded))
+            np.save(directory / f"{column}.offsets.npy", offsets)
+
+        abilities = dictionaries["specialAbilities"]
+        ability_codes = [abilities.setdefault(a, len(abilities)) for t in templates for a in t["specialAbilities"]]
+        ability_offsets = np.zeros(count + 1, dtype=np.int64)
+        np.cumsum([len(t["specialAbilities"]) for t in templates], out=ability_offsets[1:])
+        np.save(directory / "specialAbilities.codes.npy", np.array(ability_codes, dtype=TemplateStore._code_dtype(len(abilities))))
+        np.save(directory / "specialAbilities.offsets.npy", ability_offsets)
+
+        # One packed bitmap row per filterable value
+        bitmap_rows: Dict[str, Dict[str, int]] = {}
+        rows = []
+        for column in TemplateStore.FILTER_COLUMNS:
+            bitmap_rows[column] = {}
+            column_values = np.array([t[column] for t in templates], dtype=object)
+            for value in dictionaries[column]:
+                bitmap_rows[column][value] = len(rows)
+                rows.append(np.packbits(column_values == value))
+        packed_width = (count + 7) // 8
+        np.save(directory / "filters.npy", np.array(rows, dtype=np.uint8).reshape(len(rows), packed_width))
+
+        manifest = {
+            "formatVersion": TemplateStore.FORMAT_VERSION,
+            "count": count,
+            "dictionaries": {column: list(values) for column, values in dictionaries.items()},
+            "bitmaps": bitmap_rows
+        }
+        (directory / "manifest.json").write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+        return count
+
+    @staticmethod
+    def _code_dtype(cardinality: int) -> str:
+        return "uint8" if cardinality <= 1 << 8 else "uint16" if cardinality <= 1 << 16 else "uint32"
+
+    def _compute_candidates(self, challenge_rating: str, monster_type: str, environment: str) -> np.ndarray:
+        selected = None
+        for column, value in zip(self.FILTER_COLUMNS, (challenge_rating, monster_type, environment)):
+            if value == ANY:
+                continue
+            row = self.bitmap_rows[column].get(value)
+            if row is None:
+                return np.zeros(0, dtype=np.int64)
+            selected = self.bitmaps[row] if selected is None else selected & self.bitmaps[row]
+        if selected is None:
+            return np.arange(self.count)
+        return np.flatnonzero(np.unpackbits(selected, count=self.count))
+
+    def candidates(self, challenge_rating: str, monster_type: str, environment: str) -> np.ndarray:
+        """Row indices matching the filters, where "any" matches everything"""
+        return self._candidates(challenge_rating, monster_type, environment)
+
+    def pick(self, challenge_rating: str, monster_type: str, environment: str,
+             rng: Optional[random.Random] = None) -> Optional[Dict[str, Any]]:
+        """Materialize one random matching template, or None"""
+        rows = self.candidates(challenge_rating, monster_type, environment)
+        if not len(rows):
+            return None
+        return self.template_at(int(rows[int((rng or random).random() * len(rows))]))
+
+    def template_at(self, row: int) -> Dict[str, Any]:
+        """Build a fresh template dict for one row"""
+        template: Dict[str, Any] = {}
+        for column in self.TEXT_COLUMNS:
+            offsets = self.text_offsets[column]
+            template[column] = self.heaps[column][offsets[row]:offsets[row + 1]].tobytes().decode("utf-8")
+        for column in self.CATEGORICAL_COLUMNS:
+            template[column] = self.dictionaries[column][int(self.codes[column][row])]
+        for column in self.NUMERIC_COLUMNS:
+            template[column] = int(self.numeric[column][row])
+        start, end = self.ability_offsets[row], self.ability_offsets[row + 1]
+        abilities = self.dictionaries["specialAbilities"]
+        template["specialAbilities"] = [abilities[int(code)] for code in self.ability_codes[start:end]]
+        return template
+
+    def __len__(self) -> int:
+        return self.count
@@ -0,0 +1,50 @@
+from typing import Any, Dict, Iterator, List, Mapping, Tuple
+
+
+class TemplateVariant(Mapping):
+    """A read-only template plus the changes made to it for one monster.
+
+    Assignments are recorded in a small overlay and new abilities in a
+    separate tuple; the base template is shared, never copied and never
+    modified, so every monster derived from it starts from the same data
+    however long the process has been running.
+    """
+
+    __slots__ = ("base", "overlay", "added_abilities")
+
+    def __init__(self, base: Mapping[str, Any]):
+        self.base = base
+        self.overlay: Dict[str, Any] = {}
+        self.added_abilities: Tuple[str, ...] = ()
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "specialAbilities":
+            return self.abilities
+        if key in self.overlay:
+            return self.overlay[key]
+        return self.base[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key == "specialAbilities":
+            raise KeyError("Use add_ability() to extend a template's abilities")
+        self.overlay[key] = value
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.base)
+
+    def __len__(self) -> int:
+        return len(self.base)
+
+    @property
+    def abilities(self) -> List[str]:
+        return list(self.base["specialAbilities"]) + list(self.added_abilities)
+
+    def has_ability(self, ability: str) -> bool:
+        return ability in self.added_abilities or ability in self.base["specialAbilities"]
+
+    def add_ability(self, ability: str) -> bool:
+        """Add an ability unless the monster already has it"""
+        if self.has_ability(ability):
+            return False
+        self.added_abilities += (ability,)
+        return True
@@ -1,6 +1,7 @@
 import random
-from typing import Dict, List, Tuple
+from typing import Dict, List, Mapping, Optional, Tuple
 from models.monster import TreasureInfo
+from services.sampling import WeightedSampler
 
 class TreasureGenerator:
     
@@ -24,6 +25,16 @@ class TreasureGenerator:
         'I': {'coins': {'pp': (200, 1200)}, 'gems': 30, 'jewelry': 50, 'magic': 15}
     }
     
+    # Coin values in gold pieces
+    COIN_VALUES = {'cp': 0.01, 'sp': 0.1, 'ep': 0.5, 'gp': 1.0, 'pp': 5.0}
+    
+    # Chance that each coin type listed for a treasure type is present
+    COIN_CHANCE = 60
+    
+    # Number of gems / magic items rolled when a hoard has them
+    GEMS_PER_HOARD = (1, 4)
+    MAGIC_ITEMS_PER_HOARD = (1, 2)
+    
     INDIVIDUAL_TREASURE = {
         '0': 'None',
         '1': 'P (1d6 cp)',
@@ -65,6 +76,12 @@ class TreasureGenerator:
         "Silver tiara", "Ornate belt", "Jeweled brooch", "Golden chain",
         "Platinum necklace", "Bejeweled crown", "Golden scepter", "Ornate chalice"
     ]
+    
+    MAGIC_ITEM_TYPES = ["Potion", "Scroll", "Ring", "Wand", "Sword", "Armor", "Shield"]
+    
+    GEM_VALUE_SAMPLER = WeightedSampler(GEM_VALUES)
+    GEM_SAMPLER = WeightedSampler(GEMS)
+    MAGIC_ITEM_SAMPLER = WeightedSampler(MAGIC_ITEM_TYPES)
 
     @staticmethod
     def generate_individual_treasure(challenge_rating: str) -> TreasureInfo:
@@ -91,40 +108,39 @@ class TreasureGenerator:
         )
 
     @staticmethod
-    def generate_lair_treasure(challenge_rating: str, monster_type: str) -> TreasureInfo:
+    def generate_lair_treasure(challenge_rating: str, monster_type: str,
+                               treasure_types: Optional[Mapping[str, Mapping]] = None) -> TreasureInfo:
         """Generate lair treasure hoard"""
+        treasure_types = treasure_types or TreasureGenerator.TREASURE_TYPES
         base_treasure_type = TreasureGenerator.LAIR_TREASURE_BY_CR.get(challenge_rating, 'C')
         
         # Modify treasure type based on monster type
         treasure_type = TreasureGenerator._modify_treasure_by_type(base_treasure_type, monster_type)
         
-        if treasure_type not in TreasureGenerator.TREASURE_TYPES:
+        if treasure_type not in treasure_types:
             treasure_type = 'C'
             
-        treasure_data = TreasureGenerator.TREASURE_TYPES[treasure_type]
+        treasure_data = treasure_types[treasure_type]
         
         # Generate coins
         coins = {}
         for coin_type, (min_val, max_val) in treasure_data['coins'].items():
-            if random.randint(1, 100) <= 60:  # 60% chance for each coin type
+            if random.randint(1, 100) <= TreasureGenerator.COIN_CHANCE:
                 coins[coin_type] = random.randint(min_val, max_val)
         
         # Generate gems
         gems = []
         if random.randint(1, 100) <= treasure_data['gems']:
-            num_gems = random.randint(1, 4)
-            for _ in range(num_gems):
-                gem_value = random.choice(TreasureGenerator.GEM_VALUES)
-                gem_name = random.choice(TreasureGenerator.GEMS)
-                gems.append(f"{gem_name} ({gem_value} gp)")
+            num_gems = random.randint(*TreasureGenerator.GEMS_PER_HOARD)
+            gem_values = TreasureGenerator.GEM_VALUE_SAMPLER.sample_many(num_gems)
+            gem_names = TreasureGenerator.GEM_SAMPLER.sample_many(num_gems)
+            gems = [f"{gem_name} ({gem_value} gp)" for gem_name, gem_value in zip(gem_names, gem_values)]
         
         # Generate magic items (simplified)
         magic_items = []
         if random.randint(1, 100) <= treasure_data['magic']:
-            num_items = random.randint(1, 2)
-            magic_types = ["Potion", "Scroll", "Ring", "Wand", "Sword", "Armor", "Shield"]
-            for _ in range(num_items):
-                magic_items.append(f"Magic {random.choice(magic_types)}")
+            num_items = random.randint(*TreasureGenerator.MAGIC_ITEMS_PER_HOARD)
+            magic_items = [f"Magic {item}" for item in TreasureGenerator.MAGIC_ITEM_SAMPLER.sample_many(num_items)]
         
         return TreasureInfo(
             individual="None",
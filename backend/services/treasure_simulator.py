@@ -0,0 +1,202 @@
+import copy
+import hashlib
+import json
+from functools import lru_cache
+from typing import Any, Dict, List, Mapping, Optional
+
+import numpy as np
+
+from services.rule_packs import CompiledRulePack, rule_packs
+from services.treasure_generator import TreasureGenerator
+
+
+class _StreamingDistribution:
+    """Exact distribution of values fed in chunks, tallied in fixed units.
+
+    Values are counted per unit (1 cp for coins), so percentiles are exact
+    while memory stays bounded by the value range rather than the number
+    of trials. Ranges wider than MAX_BINS units (possible with rule-pack
+    coin tables) get a coarser unit, so percentiles are exact to that unit.
+    """
+
+    MAX_BINS = 5_000_000
+
+    def __init__(self, upper: float, unit: float):
+        self.unit = max(unit, upper / (self.MAX_BINS - 1))
+        self.counts = np.zeros(int(round(upper / self.unit)) + 1, dtype=np.int64)
+        self.total = 0
+        self.sum = 0.0
+        self.sum_squares = 0.0
+
+    def add(self, values: np.ndarray) -> None:
+        units = np.rint(values / self.unit).astype(np.int64)
+        self.counts += np.bincount(units, minlength=len(self.counts))
+        self.total += values.size
+        self.sum += float(values.sum())
+        self.sum_squares += float(np.square(values).sum())
+
+    def summary(self, bins: int, percentiles) -> Dict[str, Any]:
+        mean = self.sum / self.total
+        variance = max(0.0, self.sum_squares / self.total - mean * mean)
+        cumulative = np.cumsum(self.counts)
+        observed = np.flatnonzero(self.counts)
+        group_edges = np.unique(np.round(np.linspace(0, len(self.counts), bins + 1)).astype(int))
+        histogram_counts = np.add.reduceat(self.counts, group_edges[:-1])
+
+        def value_at(fraction: float) -> float:
+            # Nearest-rank percentile
+            rank = max(1, int(np.ceil(fraction * self.total)))
+            return round(float(np.searchsorted(cumulative, rank)) * self.unit, 2)
+
+        return {
+            "mean": round(mean, 2),
+            "std": round(float(np.sqrt(variance)), 2),
+            "min": round(float(observed[0]) * self.unit, 2),
+            "max": round(float(observed[-1]) * self.unit, 2),
+            "percentiles": {f"p{p}": value_at(p / 100) for p in percentiles},
+            "histogram": {
+                "edges": [round(float(edge) * self.unit, 2) for edge in group_edges],
+                "counts": histogram_counts.tolist()
+            }
+        }
+
+
+class TreasureSimulator:
+    """Monte Carlo estimates of lair hoard values, mirroring TreasureGenerator"""
+
+    CHUNK_SIZE = 250_000
+    # Coins are tallied per copper piece, gems per gold piece
+    COIN_UNIT_GP = 0.01
+    GEM_UNIT_GP = 1.0
+    PERCENTILES = (5, 25, 50, 75, 95, 99)
+    # Individual treasure, simulated as hoards for comparison but never rolled
+    # as a lair hoard by TreasureGenerator; a pack entry of the same key wins
+    INDIVIDUAL_TREASURE_TYPES = {
+        'P': {'coins': {'cp': (3, 24)}, 'gems': 0, 'jewelry': 0, 'magic': 0},
+        'Q': {'coins': {'sp': (3, 18)}, 'gems': 0, 'jewelry': 0, 'magic': 0}
+    }
+
+    @staticmethod
+    def treasure_types(pack: CompiledRulePack) -> Dict[str, Mapping[str, Any]]:
+        """The pack's hoard tables plus the individual treasure types"""
+        return {**TreasureSimulator.INDIVIDUAL_TREASURE_TYPES, **pack.treasure_types}
+
+    @staticmethod
+    def table_version(pack: Optional[CompiledRulePack] = None) -> str:
+        """Fingerprint of the rule pack and every table the simulation depends on"""
+        pack = pack or rule_packs.get()
+        tables = {
+            "rulePack": [pack.name, pack.version],
+            "treasureTypes": TreasureSimulator.treasure_types(pack),
+            "coinValues": TreasureGenerator.COIN_VALUES,
+            "coinChance": TreasureGenerator.COIN_CHANCE,
+            "gemValues": TreasureGenerator.GEM_VALUES,
+            "gemsPerHoard": TreasureGenerator.GEMS_PER_HOARD,
+            "magicItemsPerHoard": TreasureGenerator.MAGIC_ITEMS_PER_HOARD,
+        }
+        # Pack tables are read-only mappings
+        return hashlib.sha1(json.dumps(tables, sort_keys=True, default=dict).encode()).hexdigest()[:12]
+
+    @staticmethod
+    def simulate_all(trials: int = 100_000, seed: int = 0, bins: int = 20,
+                     pack: Optional[CompiledRulePack] = None) -> Dict[str, Dict[str, Any]]:
+        """Simulate every treasure type of a rule pack (the core rules by default)"""
+        pack = pack or rule_packs.get()
+        return {
+            treasure_type: TreasureSimulator.simulate(treasure_type, trials, seed, bins, pack)
+            for treasure_type in sorted(TreasureSimulator.treasure_types(pack))
+        }
+
+    @staticmethod
+    def simulate(treasure_type: str, trials: int = 100_000, seed: int = 0, bins: int = 20,
+                 pack: Optional[CompiledRulePack] = None) -> Dict[str, Any]:
+        """Simulate `trials` hoards of a treasure type and summarize their value"""
+        pack = pack or rule_packs.get()
+        treasure_types = TreasureSimulator.treasure_types(pack)
+        if treasure_type not in treasure_types:
+            raise ValueError(f"Unknown treasure type: {treasure_type}")
+        # The table travels as JSON so the cache key covers its exact contents
+        table = json.dumps(treasure_types[treasure_type], sort_keys=True, default=dict)
+        result = TreasureSimulator._simulate_cached(
+            TreasureSimulator.table_version(pack), treasure_type, table, trials, seed, bins
+        )
+        return copy.deepcopy(result)
+
+    @staticmethod
+    @lru_cache(maxsize=128)
+    def _simulate_cached(version: str, treasure_type: str, table_json: str, trials: int, seed: int,
+                         bins: int) -> Dict[str, Any]:
+        table: Mapping[str, Any] = json.loads(table_json)
+        rng = np.random.default_rng(seed)
+        coin_chance = TreasureGenerator.COIN_CHANCE / 100
+        gem_values = np.asarray(TreasureGenerator.GEM_VALUES, dtype=np.float64)
+        min_gems, max_gems = TreasureGenerator.GEMS_PER_HOARD
+        min_items, max_items = TreasureGenerator.MAGIC_ITEMS_PER_HOARD
+
+        coin_upper = sum(high * TreasureGenerator.COIN_VALUES[coin] for coin, (_, high) in table['coins'].items())
+        gem_upper = max_gems * gem_values.max() if table['gems'] > 0 else 0.0
+        coins = _StreamingDistribution(coin_upper, TreasureSimulator.COIN_UNIT_GP)
+        gems = _StreamingDistribution(gem_upper, TreasureSimulator.GEM_UNIT_GP)
+        total = _StreamingDistribution(coin_upper + gem_upper, TreasureSimulator.COIN_UNIT_GP)
+        coin_totals = {coin: 0 for coin in table['coins']}
+        coin_hits = {coin: 0 for coin in table['coins']}
+        gem_counts = np.zeros(max_gems + 1, dtype=np.int64)
+        magic_counts = np.zeros(max_items + 1, dtype=np.int64)
+
+        remaining = trials
+        while remaining > 0:
+            n = min(TreasureSimulator.CHUNK_SIZE, remaining)
+            remaining -= n
+
+            # Coins: each listed coin type appears independently
+            coin_value = np.zeros(n)
+            for coin, (low, high) in table['coins'].items():
+                present = rng.random(n) < coin_chance
+                amounts = rng.integers(low, high + 1, n) * present
+                coin_value += amounts * TreasureGenerator.COIN_VALUES[coin]
+                coin_totals[coin] += int(amounts.sum())
+                coin_hits[coin] += int(present.sum())
+
+            # Gems: percentage chance, then 1..N gems of random value
+            has_gems = rng.integers(1, 101, n) <= table['gems']
+            num_gems = rng.integers(min_gems, max_gems + 1, n) * has_gems
+            values = gem_values[rng.integers(0, len(gem_values), (n, max_gems))]
+            gem_value = (values * (np.arange(max_gems) < num_gems[:, None])).sum(axis=1)
+            gem_counts += np.bincount(num_gems, minlength=max_gems + 1)
+
+            # Magic items: percentage chance, then 1..N items
+            has_magic = rng.integers(1, 101, n) <= table['magic']
+            num_items = rng.integers(min_items, max_items + 1, n) * has_magic
+            magic_counts += np.bincount(num_items, minlength=max_items + 1)
+
+            coins.add(coin_value)
+            gems.add(gem_value)
+            total.add(coin_value + gem_value)
+
+        return {
+            "treasureType": treasure_type,
+            "trials": trials,
+            "seed": seed,
+            "tableVersion": version,
+            "coins": {
+                "valueGp": coins.summary(bins, TreasureSimulator.PERCENTILES),
+                "byType": {
+                    coin: {"presentRate": round(coin_hits[coin] / trials, 4), "meanAmount": round(coin_totals[coin] / trials, 2)}
+                    for coin in table['coins']
+                }
+            },
+            "gems": {
+                "valueGp": gems.summary(bins, TreasureSimulator.PERCENTILES),
+                "countDistribution": TreasureSimulator._distribution(gem_counts, trials)
+            },
+            "magicItems": {
+                "mean": round(float((np.arange(len(magic_counts)) * magic_counts).sum()) / trials, 4),
+                "countDistribution": TreasureSimulator._distribution(magic_counts, trials)
+            },
+            "totalValueGp": total.summary(bins, TreasureSimulator.PERCENTILES)
+        }
+
+    @staticmethod
+    def _distribution(counts: np.ndarray, trials: int) -> List[Dict[str, float]]:
+        return [{"count": int(k), "probability": round(float(c) / trials, 6)} for k, c in enumerate(counts)]
+
@@ -0,0 +1,144 @@
+"""Build the effective challenge rating surface from batch combat simulations.
+
+    cd backend && python -m tools.build_cr_surface data/cr_surface.json --trials 400
+
+Every (AC, HP, damage per round, ability count) bucket is fought against a
+ladder of reference parties; the monster's threat is its summed chance of
+not losing across the ladder. The threat of the stat blocks the generator
+produces for each challenge rating anchors the scale, and every bucket is
+stored as its interpolated position between those anchors. Rebuild after
+changing the stat tables in the generator or the combat rules.
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from models.monster import CombatSimulationRequest, MonsterStats, PartyMember
+from services.advanced_generator import AdvancedMonsterGenerator
+from services.combat_simulator import CombatSimulator
+from services.cr_calibration import CRSurface, damage_per_round
+
+# Bucket lower bounds per axis, with the value simulated for each bucket
+AXES = {
+    "ac": {"bins": [-10, 2, 4, 6, 8], "points": [1, 3, 5, 7, 9]},
+    "hp": {"bins": [0, 5, 9, 14, 20, 28, 38, 50, 65, 85, 110], "points": [3, 7, 11, 17, 24, 33, 44, 57, 75, 97, 130]},
+    "damagePerRound": {"bins": [0, 3, 4.5, 6, 8, 11, 15, 20, 28], "points": [2, 3.5, 5, 7, 9.5, 13, 17.5, 24, 34]},
+    "abilities": {"bins": [0, 1, 3, 5, 7], "points": [0, 2, 4, 6, 8]}
+}
+# Special abilities count as this much extra HP and damage each
+ABILITY_WEIGHT = 0.1
+# Reference parties from weakest to strongest: (members, level)
+LADDER = [(1, 1), (2, 1), (3, 1)] + [(4, level) for level in range(1, 13)]
+NOMINAL_SAMPLES = 400
+
+
+def stat_block(ac: int, hp: float, damage: float, abilities: int) -> MonsterStats:
+    """A monster with the given stats; abilities are folded into HP and damage"""
+    scale = 1 + ABILITY_WEIGHT * abilities
+    hp = max(1, round(hp * scale))
+    damage = damage * scale
+    attacks = min(4, max(1, int(-(-damage // 10))))
+    sides = max(1, round(2 * damage / attacks - 1))
+    return MonsterStats(
+        ac=ac, hd=str(max(1, round(hp / 4.5))), hp=hp, movement="120' (40')",
+        attacks=f"{attacks} attacks", damage="/".join([f"1d{sides}"] * attacks),
+        save="Fighter 1", morale=8, xp=0
+    )
+
+
+def threat(stats: MonsterStats, trials: int, seed: int) -> float:
+    """Summed chance of the monster not losing against each reference party"""
+    total = 0.0
+    for members, level in LADDER:
+        request = CombatSimulationRequest(party=[PartyMember(level=level)] * members, trials=trials, seed=seed)
+        win_rate = CombatSimulator.simulate(stats, request)["winRate"]
+        total += 1 - win_rate
+        if win_rate >= 0.995:
+            # Stronger parties win too
+            break
+    return total
+
+
+def raw_surface(trials: int, seed: int) -> np.ndarray:
+    shape = tuple(len(axis["points"]) for axis in AXES.values())
+    surface = np.zeros(shape)
+    for position in np.ndindex(*shape):
+        values = [axis["points"][index] for axis, index in zip(AXES.values(), position)]
+        surface[position] = threat(stat_block(*values), trials, seed)
+    return surface
+
+
+def nominal_threats(surface: np.ndarray, seed: int) -> List[float]:
+    """Mean threat of generated stat blocks for each challenge rating"""
+    random.seed(seed)
+    bins = [axis["bins"] for axis in AXES.values()]
+    nominal = []
+    for cr in AdvancedMonsterGenerator.CHALLENGE_RATINGS:
+        threats = []
+        for sample in range(NOMINAL_SAMPLES):
+            stats = AdvancedMonsterGenerator._generate_stats_by_cr(cr)
+            complexity = ("simple", "moderate", "complex")[sample % 3]
+            abilities = AdvancedMonsterGenerator._generate_special_abilities(
+                cr, AdvancedMonsterGenerator.TYPE_SAMPLER.sample(), complexity
+            )
+            values = (stats["ac"], stats["hp"], damage_per_round(stats["attacks"], stats["damage"]), len(abilities))
+            threats.append(surface[tuple(CRSurface.bucket(axis_bins, value) for axis_bins, value in zip(bins, values))])
+        nominal.append(float(np.mean(threats)))
+    return nominal
+
+
+def calibrate(surface: np.ndarray, nominal: Sequence[float]) -> np.ndarray:
+    """Threat to fractional challenge rating index, interpolating between the nominal threats.
+
+    A rating whose generated stat blocks are no stronger than the one below
+    (hit dice "6+" currently rolls a single d8) is anchored by extending the
+    previous step instead.
+    """
+    anchors = list(nominal[:1])
+    for value in nominal[1:]:
+        step = anchors[-1] - anchors[-2] if len(anchors) > 1 else anchors[-1]
+        anchors.append(value if value > anchors[-1] else anchors[-1] + max(step, 1e-3))
+    return np.interp(surface, anchors, np.arange(len(anchors)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build the effective challenge rating surface")
+    parser.add_argument("output", type=Path, help="JSON file to write")
+    parser.add_argument("--trials", type=int, default=400, help="Simulated fights per bucket and party")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    surface = raw_surface(args.trials, args.seed)
+    nominal = nominal_threats(surface, args.seed)
+    effective = calibrate(surface, nominal)
+
+    document: Dict[str, object] = {
+        "version": 1,
+        "trials": args.trials,
+        "seed": args.seed,
+        "challengeRatings": AdvancedMonsterGenerator.CHALLENGE_RATINGS,
+        "abilityWeight": ABILITY_WEIGHT,
+        "ladder": [{"members": members, "level": level} for members, level in LADDER],
+        "axes": AXES,
+        "nominalThreat": dict(zip(AdvancedMonsterGenerator.CHALLENGE_RATINGS, (round(value, 3) for value in nominal))),
+        "effectiveCr": np.round(effective, 2).tolist()
+    }
+    CRSurface(document)
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(document, separators=(",", ":")) + "\n", encoding="utf-8")
+    cells = effective.size
+    print(f"Wrote {cells} cells to {args.output} in {time.perf_counter() - started:.1f}s")
+    print("Nominal threat: " + ", ".join(f"{cr}={value:.2f}" for cr, value in document["nominalThreat"].items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Build a memory-mapped template store from a JSON or JSONL compendium.
+
+    cd backend && python -m tools.build_template_store compendium.jsonl rule_packs/compendium-store
+
+Every template is validated against the rule pack template schema. Point a
+rule pack at the output with "templateStore": "compendium-store".
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from models.rule_pack import TemplateSpec
+from services.template_store import TemplateStore
+
+
+def read_templates(path: Path):
+    with path.open(encoding="utf-8") as source:
+        if path.suffix == ".jsonl":
+            for line_number, line in enumerate(source, 1):
+                if line.strip():
+                    yield line_number, json.loads(line)
+        else:
+            for index, template in enumerate(json.load(source), 1):
+                yield index, template
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build a columnar monster template store")
+    parser.add_argument("source", type=Path, help="JSON array or JSONL file of templates")
+    parser.add_argument("output", type=Path, help="Store directory to write")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    templates = []
+    for position, template in read_templates(args.source):
+        try:
+            templates.append(TemplateSpec(**template).model_dump())
+        except Exception as e:
+            sys.exit(f"{args.source}:{position}: invalid template: {e}")
+
+    count = TemplateStore.write(templates, args.output)
+    print(f"Wrote {count} templates to {args.output} in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
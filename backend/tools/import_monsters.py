@@ -0,0 +1,82 @@
+"""Bulk-import monsters from JSONL or CSV files into the saved collection.
+
+    cd backend && python -m tools.import_monsters bestiary.jsonl --library <library id>
+
+Uses MONGO_URL and DB_NAME like the server (loaded from backend/.env) and
+the same streaming importer as POST /api/monsters/import. The saved-monster
+migration the server runs on startup (which builds the unique index on
+monster ids) runs first. The format is taken from the file suffix unless
+--format is given. Invalid rows are reported and skipped; the exit status
+is 1 if any row failed.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+from pathlib import Path
+from typing import AsyncIterator
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.monster_import import MonsterImporter, iter_lines
+from services.monster_migrations import SavedMonsterMigrations
+
+READ_SIZE = 1 << 20
+
+
+async def file_chunks(path: Path) -> AsyncIterator[bytes]:
+    with path.open("rb") as source:
+        while True:
+            chunk = await asyncio.to_thread(source.read, READ_SIZE)
+            if not chunk:
+                return
+            yield chunk
+
+
+async def import_file(db, path: Path, fmt: str, library_id, chunk_size: int) -> dict:
+    importer = MonsterImporter(db, fmt, library_id, chunk_size)
+    return await importer.run(iter_lines(file_chunks(path)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Bulk-import monsters from JSONL or CSV")
+    parser.add_argument("files", type=Path, nargs="+", help="JSONL or CSV files to import")
+    parser.add_argument("--format", choices=MonsterImporter.FORMATS, help="File format (default: from the suffix)")
+    parser.add_argument("--library", help="Library id to add the monsters to")
+    parser.add_argument("--chunk-size", type=int, default=MonsterImporter.DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    load_dotenv(Path(__file__).resolve().parent.parent / ".env")
+    client = AsyncIOMotorClient(os.environ["MONGO_URL"])
+    db = client[os.environ["DB_NAME"]]
+
+    async def run() -> bool:
+        await SavedMonsterMigrations.run(db)
+        ok = True
+        for path in args.files:
+            fmt = args.format or ("csv" if path.suffix.lower() == ".csv" else "jsonl")
+            summary = await import_file(db, path, fmt, args.library, args.chunk_size)
+            print(f"{path}: imported {summary['imported']} of {summary['rows']} rows "
+                  f"in {summary['seconds']}s ({summary['monstersPerSecond']}/s)")
+            for error in summary["errors"]:
+                print(f"{path}:{error['row']}: {error['error']}", file=sys.stderr)
+            if summary["errorsTruncated"]:
+                print(f"{path}: {summary['failed'] - len(summary['errors'])} more errors not shown", file=sys.stderr)
+            if summary["unknownLibraries"]:
+                print(f"{path}: unknown libraries {json.dumps(summary['unknownLibraries'])}", file=sys.stderr)
+            ok = ok and not summary["failed"]
+        return ok
+
+    try:
+        ok = asyncio.run(run())
+    finally:
+        client.close()
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
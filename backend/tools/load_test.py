@@ -0,0 +1,359 @@
+"""Concurrent load-testing harness for the /api/monsters/* routes.
+
+By default the FastAPI app is driven in-process through httpx's ASGI
+transport with the database swapped for an in-memory stand-in, so no
+external services are needed:
+
+    cd backend && python -m tools.load_test --concurrency 32 --duration 20
+
+Pass --base-url to run the same mix against a deployed server instead.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tools.memory_db import InMemoryDatabase
+
+GENERATE_PAYLOAD = {
+    "filters": {"challengeRating": "any", "type": "any", "environment": "any", "count": 3},
+    "algorithm": "balanced",
+    "complexity": "moderate",
+    "includeTreasure": True,
+    "includeLair": True
+}
+
+DEFAULT_MIX = (
+    "generate=6,generate-simple=2,generate-stream=1,libraries=1,save=3,my-collection=1,share=1,shared=1,"
+    "stats=1,delete=1,search=2,import=1,export=1,jobs=1,job-status=1,populate=1,encounter-table=1,"
+    "encounter-distribution=1,encounter-build=1,encounter-roll=1,simulate-combat=1"
+)
+
+SEARCH_TERMS = ("dragon", "undead", "shadow", "giant", "cave", "fire")
+DISTRIBUTION_EXPRESSIONS = ("1d6", "2d4", "1d10", "3d6", "2d6+1", "1d20")
+EXPORT_FORMATS = ("jsonl", "jsonl.gz", "csv")
+
+
+class LoadTestState:
+    """Objects created during the run that later requests refer to"""
+
+    def __init__(self):
+        self.monsters: List[Dict[str, Any]] = []
+        self.saved_ids: List[str] = []
+        self.share_ids: List[str] = []
+        self.job_ids: List[str] = []
+
+
+async def _generate(client: httpx.AsyncClient, state: LoadTestState) -> httpx.Response:
+    response = await client.post("/api/monsters/generate", json=GENERATE_PAYLOAD)
+    if response.status_code == 200:
+        state.monsters.extend(response.json()["monsters"][:1])
+        del state.monsters[:-200]
+    return response
+
+
+async def _generate_simple(client: httpx.AsyncClient, state: LoadTestState) -> httpx.Response:
+    return await client.post("/api/monsters/generate-simple", json=GENERATE_PAYLOAD["filters"])
+
+
+async def _generate_stream(client: httpx.AsyncClient, state: LoadTestState) -> httpx.Response:
+    payload = dict(GENERATE_PAYLOAD, filters=dict(GENERATE_PAYLOAD["filters"], count=250))
+    return await client.post("/api/monsters/generate-stream", json=payload)
+
+
+async def _libraries(client: httpx.AsyncClient, state: LoadTestState) -> httpx.Response:
+    return await client.get("/api/monsters/libraries")
+
+
+async def _save(client: httpx.AsyncClient, state: LoadTestState) -> Optional[httpx.Response]:
+    if not state.monsters:
+        return None
+    # Saved ids are unique, so each save stores a fresh copy
+    monster = dict(random.choice(state.monsters), id=str(uuid.uuid4()))
+    response = await client.post("/api/monsters/save", json={"monster": monster})
+    if response.status_code == 200:
+        state.saved_ids.append(monster["id"])
+    return response
+
+
+async def _my_collection(client: httpx.AsyncClient, state: LoadTestState) -> httpx.Response:
+    return await client.get("/api/monsters/my-collection")
+
+
+async def _share(client: httpx.AsyncClient, state: LoadTestState) -> Optional[httpx.Response]:
+    if not state.saved_ids:
+        return None
+    response = await client.post("/api/monsters/share", json={"monsterId": random.choice(state.saved_ids)})
+    if response.status_code == 200:
+        state.share_ids.append(response.json()["shareId"])
+    return response
+
+
+async def _shared(client: httpx.AsyncClient, state: LoadTestState) -> Optional[httpx.Response]:
+    if not state.share_ids:
+        return None
+    return await client.get(f"/api/monsters/shared/{random.choice(state.share_ids)}")
+
+
+async def _stats(client: httpx.AsyncClient, state: LoadTestState) -> httpx.Response:
+    return await client.get("/api/monsters/stats")
+
+
+async def _delete(client: httpx.AsyncClient, state: LoadTestState) -> Optional[httpx.Response]:
+    if len(state.saved_ids) < 10:
+        return None
+    monster_id = state.saved_ids.pop(random.randrange(len(state.saved_ids)))
+    return await client.delete(f"/api/monsters/saved/{monster_id}")
+
+
+async def _search(client: httpx.AsyncClient, state: LoadTestState) -> httpx.Response:
+    return await client.get("/api/monsters/search", params={"q": random.choice(SEARCH_TERMS), "pageSize": 20})
+
+
+async def _import(client: httpx.AsyncClient, state: LoadTestState) -> Optional[httpx.Response]:
+    if not state.monsters:
+        return None
+    # Fresh ids so repeated imports of the same monsters do not collide
+    rows = [dict(monster, id=str(uuid.uuid4())) for monster in random.sample(state.monsters, min(20, len(state.monsters)))]
+    body = "\n".join(json.dumps(row) for row in rows)
+    response = await client.post("/api/monsters/import", params={"format": "jsonl"}, content=body)
+    if response.status_code == 200:
+        state.saved_ids.extend(row["id"] for row in rows)
+    return response
+
+
+async def _export(client: httpx.AsyncClient, state: LoadTestState) -> httpx.Response:
+    return await client.get("/api/monsters/export", params={"format": random.choice(EXPORT_FORMATS)})
+
+
+async def _jobs(client: httpx.AsyncClient, state: LoadTestState) -> httpx.Response:
+    payload = dict(GENERATE_PAYLOAD, filters=dict(GENERATE_PAYLOAD["filters"], count=100))
+    response = await client.post("/api/monsters/jobs", json=payload)
+    if response.status_code == 200:
+        state.job_ids.append(response.json()["jobId"])
+        del state.job_ids[:-50]
+    return response
+
+
+async def _job_status(client: httpx.AsyncClient, state: LoadTestState) -> Optional[httpx.Response]:
+    if not state.job_ids:
+        return None
+    return await client.get(f"/api/monsters/jobs/{random.choice(state.job_ids)}")
+
+
+async def _populate(client: httpx.AsyncClient, state: LoadTestState) -> httpx.Response:
+    return await client.post("/api/monsters/populate", json={"mapType": "hex", "count": 50})
+
+
+async def _encounter_table(client: httpx.AsyncClient, state: LoadTestState) -> httpx.Response:
+    return await client.get("/api/encounters/table")
+
+
+async def _encounter_distribution(client: httpx.AsyncClient, state: LoadTestState) -> httpx.Response:
+    expressions = random.sample(DISTRIBUTION_EXPRESSIONS, 3)
+    return await client.get("/api/encounters/distribution", params=[("expression", item) for item in expressions])
+
+
+async def _encounter_build(client: httpx.AsyncClient, state: LoadTestState) -> httpx.Response:
+    payload = {"partyLevels": [random.randint(1, 6) for _ in range(4)], "source": "generated", "poolSize": 50}
+    return await client.post("/api/encounters/build", json=payload)
+
+
+async def _encounter_roll(client: httpx.AsyncClient, state: LoadTestState) -> Optional[httpx.Response]:
+    if not state.monsters:
+        return None
+    return await client.post("/api/encounters/roll", json={"monster": random.choice(state.monsters), "groups": 10})
+
+
+async def _simulate_combat(client: httpx.AsyncClient, state: LoadTestState) -> Optional[httpx.Response]:
+    if not state.monsters:
+        return None
+    payload = {"monster": random.choice(state.monsters), "count": 2, "trials": 1000}
+    return await client.post("/api/monsters/simulate-combat", json=payload)
+
+
+SCENARIOS: Dict[str, Callable] = {
+    "generate": _generate,
+    "generate-simple": _generate_simple,
+    "generate-stream": _generate_stream,
+    "libraries": _libraries,
+    "save": _save,
+    "my-collection": _my_collection,
+    "share": _share,
+    "shared": _shared,
+    "stats": _stats,
+    "delete": _delete,
+    "search": _search,
+    "import": _import,
+    "export": _export,
+    "jobs": _jobs,
+    "job-status": _job_status,
+    "populate": _populate,
+    "encounter-table": _encounter_table,
+    "encounter-distribution": _encounter_distribution,
+    "encounter-build": _encounter_build,
+    "encounter-roll": _encounter_roll,
+    "simulate-combat": _simulate_combat,
+}
+
+
+def parse_mix(mix: str) -> Dict[str, int]:
+    """Parse "name=weight,name=weight" into a weight table"""
+    weights = {}
+    for entry in mix.split(","):
+        name, _, weight = entry.strip().partition("=")
+        if name not in SCENARIOS:
+            raise ValueError(f"Unknown scenario '{name}', choose from {', '.join(SCENARIOS)}")
+        weights[name] = int(weight or 1)
+    return weights
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+
+class LoadTestRunner:
+    """Drives weighted scenarios from concurrent clients and records latencies"""
+
+    def __init__(self, client: httpx.AsyncClient, weights: Dict[str, int], concurrency: int,
+                 duration: float, rate: Optional[float], max_requests: Optional[int]):
+        self.client = client
+        self.names = list(weights)
+        self.weights = [weights[name] for name in self.names]
+        self.concurrency = concurrency
+        self.duration = duration
+        self.rate = rate
+        self.max_requests = max_requests
+        self.state = LoadTestState()
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Counter] = defaultdict(Counter)
+        self._issued = 0
+
+    async def _next_slot(self, start: float, deadline: float) -> bool:
+        """Claim the next request slot, pacing to the target rate if set"""
+        if self.max_requests is not None and self._issued >= self.max_requests:
+            return False
+        index = self._issued
+        self._issued += 1
+        if self.rate:
+            delay = start + index / self.rate - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        return time.perf_counter() < deadline
+
+    async def _worker(self, start: float, deadline: float):
+        while await self._next_slot(start, deadline):
+            name = random.choices(self.names, weights=self.weights)[0]
+            request_start = time.perf_counter()
+            try:
+                response = await SCENARIOS[name](self.client, self.state)
+            except httpx.HTTPError as e:
+                self.statuses[name][type(e).__name__] += 1
+                continue
+            if response is None:
+                continue
+            self.latencies[name].append(time.perf_counter() - request_start)
+            self.statuses[name][response.status_code] += 1
+
+    async def run(self) -> float:
+        start = time.perf_counter()
+        deadline = start + self.duration
+        await asyncio.gather(*(self._worker(start, deadline) for _ in range(self.concurrency)))
+        return time.perf_counter() - start
+
+    def report(self, elapsed: float) -> str:
+        lines = [
+            f"{'route':<24}{'requests':>9}{'errors':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}  statuses",
+        ]
+        total = 0
+        for name in self.names:
+            samples = sorted(self.latencies.get(name, []))
+            statuses = self.statuses.get(name, Counter())
+            count = sum(statuses.values())
+            errors = sum(n for status, n in statuses.items() if not isinstance(status, int) or status >= 400)
+            total += count
+            lines.append(
+                f"{name:<24}{count:>9}{errors:>8}{count / elapsed:>9.1f}"
+                f"{percentile(samples, 0.50) * 1000:>9.1f}{percentile(samples, 0.95) * 1000:>9.1f}"
+                f"{percentile(samples, 0.99) * 1000:>9.1f}  "
+                + ", ".join(f"{status}={n}" for status, n in sorted(statuses.items(), key=str))
+            )
+        all_samples = [s for samples in self.latencies.values() for s in samples]
+        lines.append(
+            f"{'total':<24}{total:>9}{'':>8}{total / elapsed:>9.1f}"
+            f"{(statistics.median(all_samples) if all_samples else 0) * 1000:>9.1f}"
+        )
+        return "\n".join(lines)
+
+
+def _in_process_app(db_latency: float):
+    """Import the app with an in-memory database in place of MongoDB"""
+    os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+    os.environ.setdefault("DB_NAME", "load_test")
+    import server
+
+    server.db = InMemoryDatabase(latency=db_latency)
+    # Per-request INFO logging would dominate the measurements
+    logging.getLogger("server").setLevel(logging.WARNING)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    logging.getLogger("services.job_manager").setLevel(logging.WARNING)
+    return server
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    weights = parse_mix(args.mix)
+    server = None
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=60)
+    else:
+        server = _in_process_app(args.db_latency_ms / 1000)
+        # ASGITransport sends no lifespan events: rule packs and the job worker need startup
+        await server.startup_event()
+        transport = httpx.ASGITransport(app=server.app)
+        client = httpx.AsyncClient(transport=transport, base_url="http://load-test", timeout=60)
+    try:
+        async with client:
+            runner = LoadTestRunner(client, weights, args.concurrency, args.duration, args.rate, args.requests)
+            elapsed = await runner.run()
+    finally:
+        if server is not None:
+            await server.shutdown_db_client()
+    print(f"Ran {sum(map(len, runner.latencies.values()))} requests in {elapsed:.2f}s "
+          f"with {args.concurrency} clients")
+    print(runner.report(elapsed))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load test the monster generator API")
+    parser.add_argument("--concurrency", type=int, default=16, help="number of concurrent clients")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds to run")
+    parser.add_argument("--requests", type=int, default=None, help="stop after this many requests")
+    parser.add_argument("--rate", type=float, default=None, help="target total requests per second (open loop)")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"weighted scenarios, default: {DEFAULT_MIX}")
+    parser.add_argument("--db-latency-ms", type=float, default=0.5, help="simulated database round trip")
+    parser.add_argument("--base-url", default=None, help="test a running server instead of the in-process app")
+    parser.add_argument("--seed", type=int, default=None, help="seed for the scenario mix")
+    args = parser.parse_args()
+    if args.seed is not None:
+        random.seed(args.seed)
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
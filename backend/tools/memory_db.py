@@ -0,0 +1,386 @@
+"""In-memory stand-in for the subset of the Motor API used by the server.
+
+Lets the load-test harness drive the real FastAPI app without a MongoDB
+instance. Only the query and update operators and aggregation stages the
+endpoints use are supported; anything else raises NotImplementedError.
+$text matches any search word in a name or description. Single-field
+unique indexes are enforced on insert, raising the same errors as pymongo.
+"""
+import asyncio
+import copy
+import re
+from collections import Counter
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Set
+
+from bson import ObjectId
+from pymongo import InsertOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+_MISSING = object()
+
+
+def _get_path(document: Dict[str, Any], path: str) -> Any:
+    value = document
+    for part in path.split('.'):
+        if isinstance(value, dict) and part in value:
+            value = value[part]
+        else:
+            return _MISSING
+    return value
+
+
+def _compare(value: Any, operator: str, operand: Any) -> bool:
+    values = value if isinstance(value, list) else [value]
+    if operator == '$eq':
+        # As in MongoDB, null also matches a missing field
+        return value == operand or operand in values or (operand is None and value is _MISSING)
+    if operator == '$ne':
+        return not _compare(value, '$eq', operand)
+    if operator == '$in':
+        return any(v in operand for v in values)
+    if operator == '$nin':
+        return not any(v in operand for v in values)
+    if operator == '$exists':
+        return (value is not _MISSING) == bool(operand)
+    if operator == '$all':
+        return all(item in values for item in operand)
+    if value is _MISSING:
+        return False
+    checks = {
+        '$gt': lambda v: v > operand,
+        '$gte': lambda v: v >= operand,
+        '$lt': lambda v: v < operand,
+        '$lte': lambda v: v <= operand,
+    }
+    if operator not in checks:
+        raise NotImplementedError(f"Unsupported query operator: {operator}")
+    return any(v is not None and checks[operator](v) for v in values)
+
+
+def matches(document: Dict[str, Any], query: Optional[Dict[str, Any]]) -> bool:
+    """Evaluate a Mongo-style filter against a document"""
+    for key, condition in (query or {}).items():
+        if key == '$and':
+            if not all(matches(document, sub) for sub in condition):
+                return False
+        elif key == '$or':
+            if not any(matches(document, sub) for sub in condition):
+                return False
+        elif isinstance(condition, dict) and condition and all(k.startswith('$') for k in condition):
+            value = _get_path(document, key)
+            if not all(_compare(value, op, operand) for op, operand in condition.items()):
+                return False
+        elif not _compare(_get_path(document, key), '$eq', condition):
+            return False
+    return True
+
+
+def _project(document: Dict[str, Any], projection: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    document = copy.deepcopy(document)
+    if not projection:
+        return document
+    included = [key for key, flag in projection.items() if flag and key != '_id']
+    if included:
+        result = {key: document[key] for key in included if key in document}
+        if projection.get('_id', 1) and '_id' in document:
+            result['_id'] = document['_id']
+        return result
+    for key, flag in projection.items():
+        if not flag:
+            document.pop(key, None)
+    return document
+
+
+def _apply_update(document: Dict[str, Any], update: Dict[str, Any]) -> None:
+    for operator, fields in update.items():
+        for key, operand in fields.items():
+            if operator == '$set':
+                document[key] = copy.deepcopy(operand)
+            elif operator == '$inc':
+                document[key] = document.get(key, 0) + operand
+            elif operator == '$addToSet':
+                items = operand['$each'] if isinstance(operand, dict) and '$each' in operand else [operand]
+                target = document.setdefault(key, [])
+                for item in items:
+                    if item not in target:
+                        target.append(item)
+            elif operator == '$push':
+                items = operand['$each'] if isinstance(operand, dict) and '$each' in operand else [operand]
+                document.setdefault(key, []).extend(items)
+            elif operator == '$pull':
+                document[key] = [item for item in document.get(key, []) if item != operand]
+            elif operator == '$unset':
+                document.pop(key, None)
+            else:
+                raise NotImplementedError(f"Unsupported update operator: {operator}")
+
+
+_TEXT_SCORE = '__textScore'
+# Weights of the text index the search endpoint creates
+_TEXT_FIELDS = {'name': 10, 'description': 1}
+
+
+def _text_score(document: Dict[str, Any], search: str) -> float:
+    words = set(re.findall(r'\w+', search.lower()))
+    score = 0.0
+    for field, weight in _TEXT_FIELDS.items():
+        text = re.findall(r'\w+', str(document.get(field) or '').lower())
+        score += weight * sum(1 for word in text if word in words)
+    return score
+
+
+def _match_stage(documents: List[Dict[str, Any]], query: Dict[str, Any]) -> List[Dict[str, Any]]:
+    query = dict(query)
+    text = query.pop('$text', None)
+    selected = [copy.deepcopy(d) for d in documents if matches(d, query)]
+    if text is None:
+        return selected
+    scored = []
+    for document in selected:
+        document[_TEXT_SCORE] = _text_score(document, text['$search'])
+        if document[_TEXT_SCORE]:
+            scored.append(document)
+    return scored
+
+
+def _sort_stage(documents: List[Dict[str, Any]], keys: Dict[str, Any]) -> List[Dict[str, Any]]:
+    for field, order in reversed(list(keys.items())):
+        if isinstance(order, dict):
+            field, order = _TEXT_SCORE, -1
+        documents.sort(key=lambda d: (_get_path(d, field) is _MISSING, _get_path(d, field)), reverse=order < 0)
+    return documents
+
+
+def _run_pipeline(documents: List[Dict[str, Any]], pipeline: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    for stage in pipeline:
+        (operator, spec), = stage.items()
+        if operator == '$match':
+            documents = _match_stage(documents, spec)
+        elif operator == '$facet':
+            documents = [{name: _run_pipeline([copy.deepcopy(d) for d in documents], stages)
+                          for name, stages in spec.items()}]
+        elif operator == '$addFields':
+            for document in documents:
+                for field, value in spec.items():
+                    document[field] = document.get(_TEXT_SCORE, 0.0) if isinstance(value, dict) else value
+        elif operator == '$sort':
+            documents = _sort_stage(documents, spec)
+        elif operator == '$skip':
+            documents = documents[spec:]
+        elif operator == '$limit':
+            documents = documents[:spec]
+        elif operator == '$project':
+            documents = [_project(d, spec) for d in documents]
+        elif operator == '$count':
+            documents = [{spec: len(documents)}] if documents else []
+        elif operator == '$unwind':
+            field = spec.lstrip('$')
+            documents = [dict(d, **{field: item}) for d in documents for item in (_get_path(d, field) or [])
+                         if isinstance(_get_path(d, field), list)]
+        elif operator == '$sortByCount':
+            counts = Counter(_get_path(d, spec.lstrip('$')) for d in documents)
+            documents = [{'_id': None if value is _MISSING else value, 'count': count}
+                         for value, count in counts.most_common()]
+        else:
+            raise NotImplementedError(f"Unsupported aggregation stage: {operator}")
+    for document in documents:
+        document.pop(_TEXT_SCORE, None)
+    return documents
+
+
+class InMemoryCursor:
+    """Async cursor over a snapshot of matching documents"""
+
+    def __init__(self, documents: List[Dict[str, Any]], projection: Optional[Dict[str, Any]], latency: float):
+        self._documents = documents
+        self._projection = projection
+        self._latency = latency
+        self._skip = 0
+        self._limit = 0
+
+    def sort(self, key, direction: int = 1):
+        keys = key if isinstance(key, list) else [(key, direction)]
+        for field, order in reversed(keys):
+            self._documents.sort(key=lambda d: (_get_path(d, field) is _MISSING, _get_path(d, field)), reverse=order < 0)
+        return self
+
+    def skip(self, count: int):
+        self._skip = count
+        return self
+
+    def limit(self, count: int):
+        self._limit = count
+        return self
+
+    def batch_size(self, size: int):
+        return self
+
+    def _selected(self) -> List[Dict[str, Any]]:
+        documents = self._documents[self._skip:]
+        if self._limit:
+            documents = documents[:self._limit]
+        return [_project(d, self._projection) for d in documents]
+
+    async def to_list(self, length: Optional[int] = None) -> List[Dict[str, Any]]:
+        await asyncio.sleep(self._latency)
+        documents = self._selected()
+        return documents[:length] if length else documents
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        await asyncio.sleep(self._latency)
+        for document in self._selected():
+            yield document
+
+
+class InMemoryCollection:
+    """Collection holding plain dict documents in insertion order"""
+
+    def __init__(self, name: str, latency: float = 0.0):
+        self.name = name
+        self.latency = latency
+        self.documents: List[Dict[str, Any]] = []
+        # Unique index field -> values in use (a missing field counts as null, as in MongoDB)
+        self._unique: Dict[str, Set[Any]] = {}
+
+    async def _round_trip(self):
+        await asyncio.sleep(self.latency)
+
+    def _unique_value(self, document: Dict[str, Any], field: str) -> Any:
+        value = _get_path(document, field)
+        return None if value is _MISSING else value
+
+    def _store(self, document: Dict[str, Any]) -> ObjectId:
+        for field, values in self._unique.items():
+            value = self._unique_value(document, field)
+            if value in values:
+                raise DuplicateKeyError(
+                    f"E11000 duplicate key error collection: {self.name} index: {field}_1 dup key: {{ {field}: {value!r} }}",
+                    11000
+                )
+        document.setdefault('_id', ObjectId())
+        self.documents.append(copy.deepcopy(document))
+        for field, values in self._unique.items():
+            values.add(self._unique_value(document, field))
+        return document['_id']
+
+    def _store_many(self, documents: List[Dict[str, Any]], ordered: bool) -> List[ObjectId]:
+        inserted, write_errors = [], []
+        for index, document in enumerate(documents):
+            try:
+                inserted.append(self._store(document))
+            except DuplicateKeyError as e:
+                write_errors.append({"index": index, "code": e.code, "errmsg": str(e), "op": document})
+                if ordered:
+                    break
+        if write_errors:
+            raise BulkWriteError({"writeErrors": write_errors, "writeConcernErrors": [], "nInserted": len(inserted),
+                                  "nUpserted": 0, "nMatched": 0, "nModified": 0, "nRemoved": 0, "upserted": []})
+        return inserted
+
+    async def insert_one(self, document: Dict[str, Any]):
+        await self._round_trip()
+        return SimpleNamespace(inserted_id=self._store(document))
+
+    async def insert_many(self, documents: List[Dict[str, Any]], ordered: bool = True):
+        await self._round_trip()
+        return SimpleNamespace(inserted_ids=self._store_many(documents, ordered))
+
+    async def bulk_write(self, requests: List[Any], ordered: bool = True):
+        await self._round_trip()
+        for request in requests:
+            if not isinstance(request, InsertOne):
+                raise NotImplementedError(f"Unsupported bulk operation: {type(request).__name__}")
+        inserted = self._store_many([request._doc for request in requests], ordered)
+        return SimpleNamespace(inserted_count=len(inserted))
+
+    async def find_one(self, query: Optional[Dict[str, Any]] = None, projection: Optional[Dict[str, Any]] = None):
+        await self._round_trip()
+        for document in self.documents:
+            if matches(document, query):
+                return _project(document, projection)
+        return None
+
+    def find(self, query: Optional[Dict[str, Any]] = None, projection: Optional[Dict[str, Any]] = None) -> InMemoryCursor:
+        selected = [d for d in self.documents if matches(d, query)]
+        return InMemoryCursor(selected, projection, self.latency)
+
+    def aggregate(self, pipeline: List[Dict[str, Any]]) -> InMemoryCursor:
+        return InMemoryCursor(_run_pipeline(self.documents, pipeline), None, self.latency)
+
+    async def count_documents(self, query: Dict[str, Any]) -> int:
+        await self._round_trip()
+        return sum(1 for d in self.documents if matches(d, query))
+
+    async def _update(self, query, update, many: bool, upsert: bool = False):
+        await self._round_trip()
+        matched = 0
+        for document in self.documents:
+            if matches(document, query):
+                _apply_update(document, update)
+                matched += 1
+                if not many:
+                    break
+        upserted_id = None
+        if not matched and upsert:
+            document = {k: v for k, v in query.items() if not k.startswith('$')}
+            _apply_update(document, update)
+            upserted_id = self._store(document)
+        return SimpleNamespace(matched_count=matched, modified_count=matched, upserted_id=upserted_id)
+
+    async def update_one(self, query, update, upsert: bool = False):
+        return await self._update(query, update, many=False, upsert=upsert)
+
+    async def update_many(self, query, update, upsert: bool = False):
+        return await self._update(query, update, many=True, upsert=upsert)
+
+    async def _delete(self, query, many: bool):
+        await self._round_trip()
+        kept, deleted = [], 0
+        for document in self.documents:
+            if (many or not deleted) and matches(document, query):
+                deleted += 1
+            else:
+                kept.append(document)
+        self.documents = kept
+        for field in self._unique:
+            self._unique[field] = {self._unique_value(document, field) for document in kept}
+        return SimpleNamespace(deleted_count=deleted)
+
+    async def delete_one(self, query):
+        return await self._delete(query, many=False)
+
+    async def delete_many(self, query):
+        return await self._delete(query, many=True)
+
+    async def create_index(self, keys, unique: bool = False, **kwargs):
+        if unique:
+            fields = [keys] if isinstance(keys, str) else [field for field, _ in keys]
+            if len(fields) != 1:
+                raise NotImplementedError("Only single-field unique indexes are supported")
+            values = [self._unique_value(document, fields[0]) for document in self.documents]
+            if len(set(map(repr, values))) < len(values):
+                raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.name} index: {fields[0]}_1", 11000)
+            self._unique[fields[0]] = set(values)
+        return kwargs.get('name', str(keys))
+
+
+class InMemoryDatabase:
+    """Database whose collections are created on first access"""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self._collections: Dict[str, InMemoryCollection] = {}
+
+    def __getattr__(self, name: str) -> InMemoryCollection:
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return self[name]
+
+    def __getitem__(self, name: str) -> InMemoryCollection:
+        if name not in self._collections:
+            self._collections[name] = InMemoryCollection(name, self.latency)
+        return self._collections[name]
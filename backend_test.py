@@ -5,11 +5,18 @@ Tests all API endpoints with various scenarios and edge cases.
 """
 
 import requests
+import asyncio
 import json
 import sys
 import os
+import time
 from datetime import datetime
 
+# Service-level checks import the backend modules directly
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend")
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
 # Get the backend URL from frontend .env file
 def get_backend_url():
     try:
@@ -482,6 +489,725 @@ class MonsterAPITester:
             self.log_test("Lair Generation Validation", False, f"Error: {str(e)}")
         return False
     
+    def test_metrics_endpoint(self):
+        """Test Prometheus metrics exposition"""
+        print("🔍 Testing Metrics Endpoint...")
+        try:
+            response = requests.get(f"{API_URL}/metrics", timeout=10)
+            
+            if response.status_code == 200:
+                body = response.text
+                required_metrics = ["http_requests_total", "http_request_duration_seconds", "generation_stage_duration_seconds"]
+                missing_metrics = [metric for metric in required_metrics if metric not in body]
+                if not missing_metrics:
+                    self.log_test("Metrics Endpoint", True, f"Exposed {len(body.splitlines())} metric lines")
+                    return True
+                else:
+                    self.log_test("Metrics Endpoint", False, f"Missing metrics: {missing_metrics}")
+            else:
+                self.log_test("Metrics Endpoint", False, f"HTTP {response.status_code}: {response.text}")
+        except Exception as e:
+            self.log_test("Metrics Endpoint", False, f"Error: {str(e)}")
+        return False
+    
+    def test_generation_profiling(self):
+        """Test the opt-in profile report of a generation request"""
+        print("🔍 Testing Generation Profiling...")
+        try:
+            response = requests.post(f"{API_URL}/monsters/generate", params={"profile": "true"},
+                                     json={"filters": {"count": 20}}, timeout=30)
+            if response.status_code != 200:
+                self.log_test("Generation Profiling", False, f"HTTP {response.status_code}: {response.text}")
+                return False
+            
+            profile_id = response.headers.get("X-Profile-Generation-Id")
+            if not profile_id:
+                # ENABLE_GENERATION_PROFILING is off: the request is served unprofiled
+                monsters = response.json()["monsters"]
+                self.log_test("Generation Profiling", len(monsters) == 20,
+                            f"Profiling disabled on the server; {len(monsters)} monsters generated unprofiled")
+                return len(monsters) == 20
+            
+            report = requests.get(f"{API_URL}/monsters/profiles/{profile_id}", timeout=10).json()["report"]
+            hot = report["hotFunctions"]
+            allocations = report["allocations"]
+            if (report["wallSeconds"] > 0 and hot and
+                    {"function", "module", "line", "calls", "totalSeconds", "cumulativeSeconds"} <= set(hot[0]) and
+                    allocations["peakBytes"] >= allocations["currentBytes"] >= 0 and isinstance(allocations["topSites"], list)):
+                self.log_test("Generation Profiling", True,
+                            f"{report['wallSeconds']}s, hottest {hot[0]['module']}:{hot[0]['function']}, "
+                            f"peak {allocations['peakBytes']} bytes")
+                return True
+            else:
+                self.log_test("Generation Profiling", False, f"Unexpected report: {report}")
+        except Exception as e:
+            self.log_test("Generation Profiling", False, f"Error: {str(e)}")
+        return False
+    
+    def test_treasure_simulation(self):
+        """Test Monte Carlo treasure hoard simulation"""
+        print("🔍 Testing Treasure Simulation...")
+        try:
+            response = requests.get(f"{API_URL}/monsters/treasure/simulate",
+                                    params={"treasureType": "F", "trials": 100000}, timeout=30)
+            
+            if response.status_code == 200:
+                result = response.json()["results"]["F"]
+                total = result["totalValueGp"]
+                if total["mean"] > 0 and total["percentiles"]["p5"] <= total["percentiles"]["p95"]:
+                    self.log_test("Treasure Simulation", True,
+                                f"Type F mean {total['mean']} gp, p50 {total['percentiles']['p50']} gp")
+                    return True
+                else:
+                    self.log_test("Treasure Simulation", False, f"Inconsistent distribution: {total}")
+            else:
+                self.log_test("Treasure Simulation", False, f"HTTP {response.status_code}: {response.text}")
+        except Exception as e:
+            self.log_test("Treasure Simulation", False, f"Error: {str(e)}")
+        return False
+    
+    def test_generation_jobs(self):
+        """Test background generation job submission, polling and results"""
+        print("🔍 Testing Generation Jobs...")
+        try:
+            response = requests.post(f"{API_URL}/monsters/jobs",
+                                     json={"filters": {"count": 250}}, timeout=10)
+            if response.status_code != 200:
+                self.log_test("Generation Jobs", False, f"HTTP {response.status_code}: {response.text}")
+                return False
+            job_id = response.json()["jobId"]
+            
+            job = {}
+            for _ in range(60):
+                job = requests.get(f"{API_URL}/monsters/jobs/{job_id}", timeout=10).json()
+                if job["status"] not in ("queued", "running"):
+                    break
+                time.sleep(0.5)
+            
+            if job.get("status") != "completed":
+                self.log_test("Generation Jobs", False, f"Job ended as {job.get('status')}: {job.get('error')}")
+                return False
+            
+            page = requests.get(f"{API_URL}/monsters/jobs/{job_id}/results",
+                                params={"page": 3, "pageSize": 100}, timeout=10).json()
+            if len(page["monsters"]) == 50:
+                self.log_test("Generation Jobs", True, f"Job {job_id} completed {job['completed']} monsters")
+                return True
+            else:
+                self.log_test("Generation Jobs", False, f"Expected 50 monsters on last page, got {len(page['monsters'])}")
+        except Exception as e:
+            self.log_test("Generation Jobs", False, f"Error: {str(e)}")
+        return False
+    
+    def test_map_population(self):
+        """Test streamed dungeon population"""
+        print("🔍 Testing Map Population...")
+        try:
+            payload = {
+                "mapType": "dungeon",
+                "count": 30,
+                "defaults": {"stockingChance": 0.5, "minChallengeRating": "1", "maxChallengeRating": "3"}
+            }
+            response = requests.post(f"{API_URL}/monsters/populate", json=payload, timeout=30)
+            
+            if response.status_code == 200:
+                lines = [json.loads(line) for line in response.text.splitlines() if line]
+                areas, summary = lines[:-1], lines[-1].get("summary")
+                stocked = [area for area in areas if area["stocked"]]
+                if (len(areas) == 30 and summary and summary["stocked"] == len(stocked) and
+                        all(area["group"]["size"] >= 1 and area["monster"]["challengeRating"] in ("1", "2", "3") for area in stocked)):
+                    self.log_test("Map Population", True, f"Stocked {len(stocked)} of 30 rooms")
+                    return True
+                else:
+                    self.log_test("Map Population", False, f"Unexpected population result: {summary}")
+            else:
+                self.log_test("Map Population", False, f"HTTP {response.status_code}: {response.text}")
+        except Exception as e:
+            self.log_test("Map Population", False, f"Error: {str(e)}")
+        return False
+    
+    def test_monster_search(self):
+        """Test faceted search over saved monsters"""
+        print("🔍 Testing Monster Search...")
+        try:
+            response = requests.get(f"{API_URL}/monsters/search",
+                                    params={"type": "humanoid", "pageSize": 10}, timeout=10)
+            
+            if response.status_code == 200:
+                data = response.json()
+                facets = data["facets"]
+                if (all(monster["type"] == "humanoid" for monster in data["monsters"]) and
+                        sum(bucket["count"] for bucket in facets["type"]) == data["total"]):
+                    self.log_test("Monster Search", True, f"Found {data['total']} humanoids, facets: {list(facets)}")
+                    return True
+                else:
+                    self.log_test("Monster Search", False, f"Inconsistent search result: {data}")
+            else:
+                self.log_test("Monster Search", False, f"HTTP {response.status_code}: {response.text}")
+        except Exception as e:
+            self.log_test("Monster Search", False, f"Error: {str(e)}")
+        return False
+    
+    def test_rule_packs(self):
+        """Test rule pack listing and per-request rule pack selection"""
+        print("🔍 Testing Rule Packs...")
+        try:
+            packs = requests.get(f"{API_URL}/rule-packs", timeout=10).json()["rulePacks"]
+            names = [pack["name"] for pack in packs]
+            if "core" not in names:
+                self.log_test("Rule Packs", False, f"Core pack missing: {names}")
+                return False
+            
+            payload = {
+                "filters": {"count": 3, "type": "aberration", "environment": "underground"},
+                "algorithm": "template-based",
+                "customRules": {"rulePack": "underdark"}
+            }
+            response = requests.post(f"{API_URL}/monsters/generate", json=payload, timeout=10)
+            unknown = requests.post(f"{API_URL}/monsters/generate",
+                                    json={"customRules": {"rulePack": "no-such-pack"}}, timeout=10)
+            
+            if "underdark" in names and response.status_code == 200 and unknown.status_code == 400:
+                monsters = response.json()["monsters"]
+                self.log_test("Rule Packs", True, f"Loaded {names}, generated {[m['name'] for m in monsters]}")
+                return True
+            else:
+                self.log_test("Rule Packs", False, f"Packs {names}, HTTP {response.status_code}/{unknown.status_code}")
+        except Exception as e:
+            self.log_test("Rule Packs", False, f"Error: {str(e)}")
+        return False
+    
+    def test_encounter_table(self):
+        """Test the encounter table export"""
+        print("🔍 Testing Encounter Table...")
+        try:
+            response = requests.get(f"{API_URL}/encounters/table", timeout=10)
+            
+            if response.status_code == 200:
+                data = response.json()
+                table = data["table"]
+                complete = all(
+                    set(table[structure][cr]) >= set(data["environments"])
+                    for structure in data["socialStructures"] for cr in data["challengeRatings"]
+                )
+                if complete and table["horde"]["0"]["dungeon"]["lairChance"] <= 95:
+                    self.log_test("Encounter Table", True, f"{len(data['socialStructures'])} structures x "
+                                  f"{len(data['challengeRatings'])} CRs x {len(data['environments'])} environments")
+                    return True
+                else:
+                    self.log_test("Encounter Table", False, f"Incomplete table: {list(table)}")
+            else:
+                self.log_test("Encounter Table", False, f"HTTP {response.status_code}: {response.text}")
+        except Exception as e:
+            self.log_test("Encounter Table", False, f"Error: {str(e)}")
+        return False
+    
+    def test_encounter_distribution(self):
+        """Test exact encounter size distributions"""
+        print("🔍 Testing Encounter Distribution...")
+        try:
+            response = requests.get(f"{API_URL}/encounters/distribution",
+                                    params={"expression": ["3d6", "10d10"]}, timeout=10)
+            
+            if response.status_code == 200:
+                three_d6, horde = response.json()["distributions"]
+                total = sum(entry["probability"] for entry in horde["pmf"])
+                if (three_d6["min"] == 3 and three_d6["max"] == 18 and three_d6["mean"] == 10.5 and
+                        horde["percentiles"]["p50"] == 55 and abs(total - 1) < 1e-9):
+                    self.log_test("Encounter Distribution", True, f"10d10 percentiles: {horde['percentiles']}")
+                    return True
+                else:
+                    self.log_test("Encounter Distribution", False, f"Unexpected distributions: {three_d6}, {horde['percentiles']}")
+            else:
+                self.log_test("Encounter Distribution", False, f"HTTP {response.status_code}: {response.text}")
+        except Exception as e:
+            self.log_test("Encounter Distribution", False, f"Error: {str(e)}")
+        return False
+    
+    def test_encounter_builder(self):
+        """Test XP-budget encounter building from a generated pool"""
+        print("🔍 Testing Encounter Builder...")
+        try:
+            payload = {"partyLevels": [3, 3, 4, 4], "source": "generated", "poolSize": 100, "topK": 3, "tolerance": 0.2}
+            response = requests.post(f"{API_URL}/encounters/build", json=payload, timeout=30)
+            
+            if response.status_code == 200:
+                data = response.json()
+                budget = data["budget"]
+                within = all(
+                    abs(composition["totalXp"] - budget) <= budget * 0.2 and
+                    composition["totalXp"] == sum(group["xp"] for group in composition["groups"]) and
+                    len(composition["groups"]) <= 3
+                    for composition in data["compositions"]
+                )
+                if data["compositions"] and within:
+                    best = data["compositions"][0]
+                    self.log_test("Encounter Builder", True, f"Budget {budget} XP, best total {best['totalXp']} XP "
+                                  f"from {[(g['monster']['name'], g['count']) for g in best['groups']]}")
+                    return True
+                else:
+                    self.log_test("Encounter Builder", False, f"Compositions off budget {budget}: {data['compositions']}")
+            else:
+                self.log_test("Encounter Builder", False, f"HTTP {response.status_code}: {response.text}")
+        except Exception as e:
+            self.log_test("Encounter Builder", False, f"Error: {str(e)}")
+        return False
+    
+    def test_combat_simulation(self):
+        """Test Monte Carlo combat simulation against an inline monster"""
+        print("🔍 Testing Combat Simulation...")
+        try:
+            monster = requests.post(f"{API_URL}/monsters/generate", json={"filters": {"count": 1}}, timeout=30).json()["monsters"][0]
+            payload = {"monster": monster, "count": 2, "party": [{"level": 3}] * 4, "trials": 2000, "seed": 1}
+            response = requests.post(f"{API_URL}/monsters/simulate-combat", json=payload, timeout=30)
+            
+            if response.status_code == 200:
+                data = response.json()
+                outcomes = data["winRate"] + data["lossRate"] + data["mutualDefeatRate"] + data["unresolvedRate"]
+                repeat = requests.post(f"{API_URL}/monsters/simulate-combat", json=payload, timeout=30).json()
+                if abs(outcomes - 1) < 0.001 and data["expectedRounds"] >= 1 and repeat == data:
+                    self.log_test("Combat Simulation", True, f"{monster['name']} x2: party wins {data['winRate']:.0%}, "
+                                  f"{data['expectedRounds']} rounds, morale breaks {data['moraleBreakRate']:.0%}")
+                    return True
+                else:
+                    self.log_test("Combat Simulation", False, f"Inconsistent results: {data}")
+            else:
+                self.log_test("Combat Simulation", False, f"HTTP {response.status_code}: {response.text}")
+        except Exception as e:
+            self.log_test("Combat Simulation", False, f"Error: {str(e)}")
+        return False
+    
+    def test_cr_calibration(self):
+        """Test that reject-mode CR calibration keeps the requested challenge rating"""
+        print("🔍 Testing CR Calibration...")
+        try:
+            payload = {
+                "filters": {"count": 20, "challengeRating": "3"},
+                "complexity": "complex",
+                "customRules": {"crCalibration": "reject", "crTolerance": 0.5}
+            }
+            response = requests.post(f"{API_URL}/monsters/generate", json=payload, timeout=30)
+            invalid = requests.post(f"{API_URL}/monsters/generate", json={"customRules": {"crCalibration": "sometimes"}}, timeout=30)
+            
+            if response.status_code == 422 and invalid.status_code == 400 and "effectively" in response.json()["detail"]:
+                # Reject mode never relabels: when attempts run out the request fails with the effective CR
+                self.log_test("CR Calibration", True, f"Reject mode gave up without relabeling: {response.json()['detail']}")
+                return True
+            elif response.status_code == 200 and invalid.status_code == 400:
+                monsters = response.json()["monsters"]
+                labels = {monster["challengeRating"] for monster in monsters}
+                if len(monsters) == 20 and labels == {"3"}:
+                    self.log_test("CR Calibration", True, "20 calibrated CR 3 monsters, invalid mode rejected")
+                    return True
+                else:
+                    self.log_test("CR Calibration", False, f"Got {len(monsters)} monsters labeled {labels}")
+            else:
+                self.log_test("CR Calibration", False, f"HTTP {response.status_code}/{invalid.status_code}: {response.text}")
+        except Exception as e:
+            self.log_test("CR Calibration", False, f"Error: {str(e)}")
+        return False
+    
+    def test_unique_names(self):
+        """Test that uniqueNames stays distinct across the chunks of a job and a stream"""
+        print("🔍 Testing Unique Names...")
+        try:
+            payload = {
+                "filters": {"count": 1200},
+                "algorithm": "template-based",
+                "customRules": {"uniqueNames": True, "nameSeed": 42}
+            }
+            response = requests.post(f"{API_URL}/monsters/jobs", json=payload, timeout=10)
+            if response.status_code != 200:
+                self.log_test("Unique Names", False, f"HTTP {response.status_code}: {response.text}")
+                return False
+            job_id = response.json()["jobId"]
+            
+            job = {}
+            for _ in range(120):
+                job = requests.get(f"{API_URL}/monsters/jobs/{job_id}", timeout=10).json()
+                if job["status"] not in ("queued", "running"):
+                    break
+                time.sleep(0.5)
+            if job.get("status") != "completed":
+                self.log_test("Unique Names", False, f"Job ended as {job.get('status')}: {job.get('error')}")
+                return False
+            
+            job_names = []
+            for page in (1, 2):
+                results = requests.get(f"{API_URL}/monsters/jobs/{job_id}/results",
+                                       params={"page": page, "pageSize": 1000}, timeout=30).json()
+                job_names.extend(monster["name"] for monster in results["monsters"])
+            
+            stream = requests.post(f"{API_URL}/monsters/generate-stream",
+                                   json=dict(payload, filters={"count": 600}), timeout=60)
+            stream_names = [json.loads(line)["name"] for line in stream.text.splitlines() if line]
+            
+            if (len(job_names) == 1200 and len(set(job_names)) == 1200 and
+                    len(stream_names) == 600 and len(set(stream_names)) == 600):
+                self.log_test("Unique Names", True, "1200 job names and 600 streamed names, all distinct")
+                return True
+            else:
+                self.log_test("Unique Names", False,
+                            f"Job {len(set(job_names))}/{len(job_names)}, stream {len(set(stream_names))}/{len(stream_names)} distinct")
+        except Exception as e:
+            self.log_test("Unique Names", False, f"Error: {str(e)}")
+        return False
+    
+    def test_admission_control(self):
+        """Test 413 for over-budget requests and 429 with Retry-After when slots run out"""
+        print("🔍 Testing Admission Control...")
+        streams = []
+        try:
+            too_large = requests.post(f"{API_URL}/monsters/generate",
+                                      json={"filters": {"count": 5000}, "complexity": "complex"}, timeout=10)
+            
+            # Unread streams hold their slots until closed
+            saturated = None
+            for _ in range(32):
+                response = requests.post(f"{API_URL}/monsters/generate-stream",
+                                         json={"filters": {"count": 10000}}, stream=True, timeout=30)
+                if response.status_code != 200:
+                    saturated = response
+                    break
+                streams.append(response)
+            
+            if (too_large.status_code == 413 and saturated is not None and saturated.status_code == 429 and
+                    saturated.headers.get("Retry-After")):
+                self.log_test("Admission Control", True,
+                            f"Over-budget request got 413, stream {len(streams) + 1} got 429 "
+                            f"(Retry-After {saturated.headers['Retry-After']})")
+                return True
+            else:
+                self.log_test("Admission Control", False,
+                            f"Got {too_large.status_code} for over-budget request and "
+                            f"{saturated.status_code if saturated is not None else 'no rejection'} after {len(streams)} streams")
+        except Exception as e:
+            self.log_test("Admission Control", False, f"Error: {str(e)}")
+        finally:
+            for response in streams:
+                response.close()
+        return False
+    
+    def test_algorithm_weights_validation(self):
+        """Test that malformed customRules.algorithmWeights are rejected with 400"""
+        print("🔍 Testing Algorithm Weights Validation...")
+        try:
+            valid = requests.post(f"{API_URL}/monsters/generate",
+                                  json={"filters": {"count": 5}, "customRules": {"algorithmWeights": {"random": 1, "template-based": 0}}},
+                                  timeout=15)
+            invalid_weights = [{"magic": 1}, {"random": -1}, {"random": "heavy"}, {"random": 0, "template-based": 0}, [7, 3]]
+            statuses = [
+                requests.post(f"{API_URL}/monsters/generate",
+                              json={"filters": {"count": 5}, "customRules": {"algorithmWeights": weights}}, timeout=15).status_code
+                for weights in invalid_weights
+            ]
+            
+            if valid.status_code == 200 and statuses == [400] * len(invalid_weights):
+                self.log_test("Algorithm Weights Validation", True, f"Valid weights accepted, {len(statuses)} malformed rejected")
+                return True
+            else:
+                self.log_test("Algorithm Weights Validation", False, f"Valid {valid.status_code}, invalid {statuses}")
+        except Exception as e:
+            self.log_test("Algorithm Weights Validation", False, f"Error: {str(e)}")
+        return False
+    
+    def test_load_test_harness(self):
+        """Test the load-test mix, the in-memory database and a short run against the API"""
+        print("🔍 Testing Load-Test Harness...")
+        try:
+            import httpx
+            from pymongo.errors import DuplicateKeyError
+            from tools.load_test import DEFAULT_MIX, SCENARIOS, LoadTestRunner, parse_mix
+            from tools.memory_db import InMemoryDatabase
+            
+            mix = parse_mix(DEFAULT_MIX)
+            uncovered = sorted(set(SCENARIOS) - set(mix))
+            
+            async def exercise_memory_db():
+                collection = InMemoryDatabase().saved_monsters
+                await collection.create_index("id", unique=True)
+                await collection.insert_many([
+                    {"id": "a", "type": "beast", "xp": 10}, {"id": "b", "type": "undead", "xp": 30},
+                    {"id": "c", "type": "beast", "xp": 20}
+                ])
+                await collection.update_one({"id": "c"}, {"$set": {"xp": 5}})
+                found = await collection.find({"type": {"$in": ["beast"]}}, {"_id": 0}).sort("xp", 1).to_list(None)
+                counts = await collection.aggregate([{"$sortByCount": "$type"}]).to_list(None)
+                try:
+                    await collection.insert_one({"id": "a"})
+                    duplicate_rejected = False
+                except DuplicateKeyError:
+                    duplicate_rejected = True
+                return [doc["id"] for doc in found], counts[0], duplicate_rejected
+            
+            async def short_run():
+                async with httpx.AsyncClient(base_url=BASE_URL, timeout=60) as client:
+                    runner = LoadTestRunner(client, parse_mix("generate=2,search=1,libraries=1"), 4, 30, None, 12)
+                    await runner.run()
+                    return runner.statuses
+            
+            found, top_type, duplicate_rejected = asyncio.run(exercise_memory_db())
+            statuses = asyncio.run(short_run())
+            failed = {name: dict(counts) for name, counts in statuses.items() if set(counts) != {200}}
+            
+            if (not uncovered and all(weight > 0 for weight in mix.values()) and found == ["c", "a"] and
+                    top_type == {"_id": "beast", "count": 2} and duplicate_rejected and
+                    sum(sum(counts.values()) for counts in statuses.values()) == 12 and not failed):
+                self.log_test("Load-Test Harness", True, f"Default mix covers {len(mix)} scenarios, 12 requests all 200")
+                return True
+            else:
+                self.log_test("Load-Test Harness", False,
+                            f"Uncovered {uncovered}, memory db {found}/{top_type}/{duplicate_rejected}, failed {failed}")
+        except Exception as e:
+            self.log_test("Load-Test Harness", False, f"Error: {str(e)}")
+        return False
+    
+    def test_prefork_runtime(self):
+        """Test that shared tables freeze before fork and forked workers get fresh random state"""
+        print("🔍 Testing Pre-Fork Runtime...")
+        if not hasattr(os, "fork"):
+            self.log_test("Pre-Fork Runtime", True, "Skipped: os.fork is not available on this platform")
+            return True
+        try:
+            import gc
+            import random
+            import numpy as np
+            from services import runtime
+            from services.rule_packs import rule_packs
+            
+            runtime.freeze_shared_tables()
+            frozen = gc.get_freeze_count()
+            
+            # Same state on both sides of the fork unless the child is reseeded
+            random.seed(1234)
+            np.random.seed(1234)
+            read_end, write_end = os.pipe()
+            pid = os.fork()
+            if pid == 0:
+                os.close(read_end)
+                os.write(write_end, json.dumps([random.random(), float(np.random.random())]).encode())
+                os._exit(0)
+            os.close(write_end)
+            with os.fdopen(read_end) as pipe:
+                child_draws = json.loads(pipe.read())
+            os.waitpid(pid, 0)
+            parent_draws = [random.random(), float(np.random.random())]
+            gc.unfreeze()
+            
+            if frozen > 0 and rule_packs.loaded and child_draws[0] != parent_draws[0] and child_draws[1] != parent_draws[1]:
+                self.log_test("Pre-Fork Runtime", True, f"Froze {frozen} objects; the forked child drew different numbers")
+                return True
+            else:
+                self.log_test("Pre-Fork Runtime", False,
+                            f"Frozen {frozen}, packs loaded {rule_packs.loaded}, parent {parent_draws}, child {child_draws}")
+        except Exception as e:
+            self.log_test("Pre-Fork Runtime", False, f"Error: {str(e)}")
+        return False
+    
+    def test_ability_registry(self):
+        """Test ability bitmask round-trips and the masks stored on generated monsters"""
+        print("🔍 Testing Ability Registry...")
+        try:
+            from services.abilities import AbilityRegistry
+            
+            abilities = ["Flight", "Regeneration", "Poison", "Infravision 60'"]
+            mask = AbilityRegistry.to_mask(abilities + ["Not a registered ability"])
+            round_trip = AbilityRegistry.from_mask(mask)
+            in_id_order = sorted(abilities, key=AbilityRegistry.id_of)
+            
+            response = requests.post(f"{API_URL}/monsters/generate",
+                                     json={"filters": {"count": 10}, "complexity": "complex"}, timeout=30)
+            if response.status_code != 200:
+                self.log_test("Ability Registry", False, f"HTTP {response.status_code}: {response.text}")
+                return False
+            mismatched = [
+                monster["name"] for monster in response.json()["monsters"]
+                if monster["abilityMask"] != AbilityRegistry.to_mask(monster["specialAbilities"])
+            ]
+            
+            if round_trip == in_id_order and len(AbilityRegistry.ABILITIES) <= 63 and not mismatched:
+                self.log_test("Ability Registry", True, f"Mask {mask} round-trips to {round_trip}; 10 generated masks match")
+                return True
+            else:
+                self.log_test("Ability Registry", False, f"Round trip {round_trip}, mismatched masks on {mismatched}")
+        except Exception as e:
+            self.log_test("Ability Registry", False, f"Error: {str(e)}")
+        return False
+    
+    def test_template_store(self):
+        """Test writing the built-in templates to a store and reading them back"""
+        print("🔍 Testing Template Store...")
+        try:
+            import tempfile
+            from services.advanced_generator import AdvancedMonsterGenerator
+            from services.template_store import TemplateStore
+            
+            templates = AdvancedMonsterGenerator.MONSTER_TEMPLATES
+            with tempfile.TemporaryDirectory() as directory:
+                written = TemplateStore.write(templates, directory)
+                store = TemplateStore(directory)
+                round_trip = [store.template_at(row) for row in range(len(store))]
+                sample = templates[0]
+                rows = store.candidates(sample["challengeRating"], sample["type"], "any")
+                expected = [
+                    row for row, template in enumerate(templates)
+                    if template["challengeRating"] == sample["challengeRating"] and template["type"] == sample["type"]
+                ]
+                missing = store.pick("no such CR", "any", "any")
+                del store
+            
+            if written == len(templates) and round_trip == templates and list(rows) == expected and missing is None:
+                self.log_test("Template Store", True, f"{written} templates round-trip; {len(expected)} match {sample['challengeRating']}/{sample['type']}")
+                return True
+            else:
+                self.log_test("Template Store", False, f"Wrote {written}, candidates {list(rows)} vs {expected}, unmatched pick {missing}")
+        except Exception as e:
+            self.log_test("Template Store", False, f"Error: {str(e)}")
+        return False
+    
+    def test_template_variant(self):
+        """Test that template variants overlay changes without touching the shared base"""
+        print("🔍 Testing Template Variant...")
+        try:
+            import copy
+            from services.advanced_generator import AdvancedMonsterGenerator
+            from services.template_variation import TemplateVariant
+            
+            base = AdvancedMonsterGenerator.MONSTER_TEMPLATES[0]
+            snapshot = copy.deepcopy(base)
+            variant = TemplateVariant(base)
+            variant["hp"] = base["hp"] + 5
+            variant["name"] = "Variant " + base["name"]
+            added = variant.add_ability("Regeneration")
+            repeated = variant.add_ability("Regeneration")
+            try:
+                variant["specialAbilities"] = []
+                guarded = False
+            except KeyError:
+                guarded = True
+            
+            overlaid = variant["hp"] == snapshot["hp"] + 5 and variant["name"] == "Variant " + snapshot["name"]
+            abilities_ok = variant["specialAbilities"] == snapshot["specialAbilities"] + ["Regeneration"]
+            shape_ok = list(variant) == list(base) and len(variant) == len(base)
+            
+            if base == snapshot and overlaid and abilities_ok and added and not repeated and guarded and shape_ok:
+                self.log_test("Template Variant", True, f"Overlay {sorted(variant.overlay)} and added abilities leave the base unchanged")
+                return True
+            else:
+                self.log_test("Template Variant", False, f"Base unchanged: {base == snapshot}, overlay {variant.overlay}, "
+                              f"abilities {variant['specialAbilities']}, add {added}/{repeated}, guarded {guarded}")
+        except Exception as e:
+            self.log_test("Template Variant", False, f"Error: {str(e)}")
+        return False
+    
+    def test_lair_generation_cache(self):
+        """Test memoized lair candidates and reproducible seeded lair batches"""
+        print("🔍 Testing Lair Generation Cache...")
+        try:
+            import random
+            from models.monster import Monster
+            from services.lair_generator import LairGenerator
+            
+            response = requests.post(f"{API_URL}/monsters/generate",
+                                     json={"filters": {"count": 20}, "complexity": "complex"}, timeout=30)
+            if response.status_code != 200:
+                self.log_test("Lair Generation Cache", False, f"HTTP {response.status_code}: {response.text}")
+                return False
+            monsters = [Monster(**monster) for monster in response.json()["monsters"]]
+            
+            hits_before = LairGenerator._feature_candidates.cache_info().hits
+            first = [lair.model_dump() for lair in LairGenerator.generate_lairs(monsters, rng=random.Random(7))]
+            second = [lair.model_dump() for lair in LairGenerator.generate_lairs(monsters, rng=random.Random(7))]
+            hits_gained = LairGenerator._feature_candidates.cache_info().hits - hits_before
+            
+            monster = monsters[0]
+            mask = monster.abilityMask & LairGenerator.FEATURE_ABILITY_MASK
+            shared = LairGenerator._feature_candidates(monster.type, mask) is LairGenerator._feature_candidates(monster.type, mask)
+            
+            if first == second and len(first) == len(monsters) and hits_gained >= len(monsters) and shared:
+                self.log_test("Lair Generation Cache", True, f"Seeded batches of {len(first)} lairs match; {hits_gained} candidate cache hits")
+                return True
+            else:
+                self.log_test("Lair Generation Cache", False, f"Batches match: {first == second}, cache hits {hits_gained}, shared candidates {shared}")
+        except Exception as e:
+            self.log_test("Lair Generation Cache", False, f"Error: {str(e)}")
+        return False
+    
+    def test_encounter_roller(self):
+        """Test rolling concrete encounter groups with per-member HP"""
+        print("🔍 Testing Encounter Roller...")
+        try:
+            monster = requests.post(f"{API_URL}/monsters/generate", json={"filters": {"count": 1, "type": "humanoid"}}, timeout=30).json()["monsters"][0]
+            payload = {"monster": monster, "groups": 3, "numberAppearing": "10d10", "seed": 7}
+            response = requests.post(f"{API_URL}/encounters/roll", json=payload, timeout=30)
+            
+            if response.status_code == 200:
+                data = response.json()
+                groups = data["groups"]
+                consistent = all(
+                    10 <= group["count"] <= 100 and len(group["hp"]) == group["count"] and
+                    min(group["hp"]) >= 1 and sum(group["hp"]) == group["totalHp"] and
+                    len(group["leaders"]) >= group["count"] // 10
+                    for group in groups
+                )
+                repeat = requests.post(f"{API_URL}/encounters/roll", json=payload, timeout=30).json()
+                if len(groups) == 3 and consistent and repeat == data:
+                    self.log_test("Encounter Roller", True, f"{monster['name']} groups of {[group['count'] for group in groups]} "
+                                  f"with {[len(group['leaders']) for group in groups]} leaders")
+                    return True
+                else:
+                    self.log_test("Encounter Roller", False, f"Inconsistent groups: {groups}")
+            else:
+                self.log_test("Encounter Roller", False, f"HTTP {response.status_code}: {response.text}")
+        except Exception as e:
+            self.log_test("Encounter Roller", False, f"Error: {str(e)}")
+        return False
+    
+    def test_bulk_import(self):
+        """Test streaming JSONL bulk import with per-row errors"""
+        print("🔍 Testing Bulk Import...")
+        try:
+            monsters = requests.post(f"{API_URL}/monsters/generate", json={"filters": {"count": 2}}, timeout=30).json()["monsters"]
+            body = "\n".join([json.dumps(monsters[0]), "{not json", json.dumps(monsters[1]), json.dumps({"name": "Nameless"})])
+            response = requests.post(f"{API_URL}/monsters/import?format=jsonl", data=body.encode(), timeout=30)
+            
+            if response.status_code == 200:
+                data = response.json()
+                error_rows = [error["row"] for error in data["errors"]]
+                if data["imported"] == 2 and data["failed"] == 2 and error_rows == [2, 4]:
+                    self.log_test("Bulk Import", True, f"Imported {data['imported']} of {data['rows']} rows, "
+                                  f"errors on rows {error_rows}")
+                    return True
+                else:
+                    self.log_test("Bulk Import", False, f"Unexpected summary: {data}")
+            else:
+                self.log_test("Bulk Import", False, f"HTTP {response.status_code}: {response.text}")
+        except Exception as e:
+            self.log_test("Bulk Import", False, f"Error: {str(e)}")
+        return False
+    
+    def test_streaming_export(self):
+        """Test streaming export of saved monsters as JSONL and CSV"""
+        print("🔍 Testing Streaming Export...")
+        try:
+            jsonl = requests.get(f"{API_URL}/monsters/export?format=jsonl", stream=True, timeout=60)
+            csv_export = requests.get(f"{API_URL}/monsters/export?format=csv", timeout=60)
+            
+            if jsonl.status_code == 200 and csv_export.status_code == 200:
+                monsters = [json.loads(line) for line in jsonl.iter_lines() if line]
+                csv_lines = csv_export.text.splitlines()
+                if monsters and all("name" in monster and "_id" not in monster for monster in monsters) and \
+                        csv_lines[0].startswith("id,name,type") and len(csv_lines) >= len(monsters) + 1:
+                    self.log_test("Streaming Export", True, f"Exported {len(monsters)} saved monsters as JSONL and CSV")
+                    return True
+                else:
+                    self.log_test("Streaming Export", False, f"Unexpected export: {len(monsters)} JSONL rows, CSV header {csv_lines[:1]}")
+            else:
+                self.log_test("Streaming Export", False, f"HTTP {jsonl.status_code}/{csv_export.status_code}")
+        except Exception as e:
+            self.log_test("Streaming Export", False, f"Error: {str(e)}")
+        return False
+    
     def run_all_tests(self):
         """Run all tests in sequence"""
         print("🚀 Starting Labyrinth Lord Monster Generator Backend API Tests")
@@ -509,6 +1235,34 @@ class MonsterAPITester:
         self.test_monster_collection()
         self.test_monster_libraries()
         self.test_monster_stats()
+        self.test_bulk_import()
+        self.test_streaming_export()
+        
+        # Operational feature tests
+        self.test_metrics_endpoint()
+        self.test_generation_profiling()
+        self.test_treasure_simulation()
+        self.test_generation_jobs()
+        self.test_map_population()
+        self.test_monster_search()
+        self.test_rule_packs()
+        self.test_encounter_table()
+        self.test_encounter_distribution()
+        self.test_encounter_builder()
+        self.test_encounter_roller()
+        self.test_combat_simulation()
+        self.test_cr_calibration()
+        self.test_unique_names()
+        self.test_algorithm_weights_validation()
+        self.test_admission_control()
+        
+        # Service-level checks (import the backend modules)
+        self.test_load_test_harness()
+        self.test_prefork_runtime()
+        self.test_ability_registry()
+        self.test_template_store()
+        self.test_template_variant()
+        self.test_lair_generation_cache()
         
         # Print summary
         print("=" * 80)